@@ -1,9 +1,9 @@
 import os
 from typing import Optional, Dict, Any
 import ollama
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
 from dotenv import load_dotenv
+from app.inference import load_causal_lm, resolve_backend
+from app.skills import extract_skills
 
 load_dotenv()
 
@@ -14,14 +14,13 @@ class AIModelHandler:
         self.use_ollama_backup = os.getenv("USE_OLLAMA_AS_BACKUP", "true").lower() == "true"
         self.hf_token = os.getenv("HUGGINGFACE_API_KEY")
         
-        # Initialize Hugging Face model
+        # Initialize Hugging Face model (backend selected by AI_INFERENCE_BACKEND)
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(self.hf_model_name, token=self.hf_token)
-            self.model = AutoModelForCausalLM.from_pretrained(
+            self.backend = resolve_backend()
+            self.model, self.tokenizer = load_causal_lm(
                 self.hf_model_name,
-                token=self.hf_token,
-                torch_dtype=torch.float16,
-                device_map="auto"
+                backend=self.backend,
+                token=self.hf_token
             )
             self.use_hf = True
         except Exception as e:
@@ -66,19 +65,22 @@ class AIModelHandler:
         return response['response']
 
     async def analyze_resume(self, resume_text: str) -> Dict[str, Any]:
+        skills = extract_skills(resume_text)
         prompt = f"""Analyze the following resume and provide insights:
         {resume_text}
         
+        Skills found in the resume: {', '.join(skills) or 'none listed'}
+        
         Please provide:
-        1. Key skills
-        2. Experience level
-        3. Education background
-        4. Potential job matches
-        5. Areas for improvement
+        1. Experience level
+        2. Education background
+        3. Potential job matches
+        4. Areas for improvement
         """
         
         analysis = await self.generate_response(prompt)
         return {
+            "skills": skills,
             "raw_analysis": analysis,
             "model_used": "ollama" if not self.use_hf else "huggingface"
         }
@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+import numpy as np
+from core.config import settings
+from app.matching import top_k_indices
+from app.skills import extract_experience_years, extract_skills
+
+logger = logging.getLogger(__name__)
+
+# Documents being parsed at once; the upload is not read further ahead than this
+BULK_PARSE_WINDOW = settings.BULK_PARSE_WINDOW
+# Parsed resumes scored against the job per sparse matrix product
+BULK_SCORE_BATCH = settings.BULK_SCORE_BATCH
+BULK_TOP_K = 20
+
+# (data, kind, sha256) -> text
+Extractor = Callable[[bytes, str, str], Awaitable[str]]
+# (sha256, data, kind) -> storage key
+Store = Callable[[str, bytes, str], Awaitable[str]]
+
+def _document_event(filename: str, status: str, **fields) -> dict:
+    return {"event": "document", "filename": filename, "status": status, **fields}
+
+def _score_batch(batch: List[dict], score_texts: Callable[[List[str]], np.ndarray]) -> List[dict]:
+    texts = [event.pop("text") for event in batch]
+    scores = score_texts(texts)
+    for event, text, score in zip(batch, texts, scores):
+        event["skills"] = extract_skills(text)
+        event["experience_years"] = extract_experience_years(text)
+        event["match_score"] = round(float(score), 2)
+    return batch
+
+async def ingest_documents(
+    documents: AsyncIterator,
+    extract: Extractor,
+    score_texts: Callable[[List[str]], np.ndarray],
+    store: Optional[Store] = None,
+    window: int = BULK_PARSE_WINDOW,
+    batch_size: int = BULK_SCORE_BATCH,
+    top_k: int = BULK_TOP_K
+) -> AsyncIterator[dict]:
+    """
+    Parse, deduplicate and score a stream of uploaded resumes
+    (core.uploads.IncomingDocument), yielding one "document" event per file as
+    soon as it is settled and a "summary" event with the top_k matches last.
+
+    Up to `window` files are parsed concurrently (the extractor's process pool
+    does the work); files with the same SHA-256 are parsed once and reported
+    as duplicates of the first. Parsed texts are scored in batches of
+    `batch_size` with one vectorized call, off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    seen: Dict[str, str] = {}
+    counts = {"scored": 0, "duplicate": 0, "rejected": 0, "failed": 0}
+    ranked: List[dict] = []
+    parsed: List[dict] = []
+    pending: Set[asyncio.Task] = set()
+
+    async def process(document, sha256: str) -> dict:
+        try:
+            text, key = await asyncio.gather(
+                extract(document.data, document.kind, sha256),
+                store(sha256, document.data, document.kind) if store else asyncio.sleep(0)
+            )
+        except Exception as e:
+            logger.warning(f"Could not ingest {document.filename}: {str(e)}")
+            return _document_event(document.filename, "failed", sha256=sha256, error="Could not read document")
+        if not text.strip():
+            return _document_event(document.filename, "failed", sha256=sha256, error="No text could be extracted")
+        return _document_event(document.filename, "scored", sha256=sha256, resume_key=key, text=text)
+
+    async def settle(done: Set[asyncio.Task], flush: bool = False) -> List[dict]:
+        events = []
+        for task in done:
+            event = task.result()
+            if event["status"] == "scored":
+                parsed.append(event)
+            else:
+                events.append(event)
+        while len(parsed) >= batch_size or (flush and parsed):
+            batch = parsed[:batch_size]
+            del parsed[:batch_size]
+            scored = await loop.run_in_executor(None, _score_batch, batch, score_texts)
+            ranked.extend(scored)
+            events.extend(scored)
+        for event in events:
+            counts[event["status"]] += 1
+        return events
+
+    try:
+        async for document in documents:
+            if document.error:
+                counts["rejected"] += 1
+                yield _document_event(document.filename, "rejected", error=document.error)
+                continue
+            sha256 = hashlib.sha256(document.data).hexdigest()
+            if sha256 in seen:
+                counts["duplicate"] += 1
+                yield _document_event(document.filename, "duplicate", sha256=sha256, duplicate_of=seen[sha256])
+                continue
+            seen[sha256] = document.filename
+            pending.add(asyncio.create_task(process(document, sha256)))
+
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for event in await settle(done):
+                    yield event
+
+        while pending or parsed:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED) if pending else (set(), set())
+            for event in await settle(done, flush=not pending):
+                yield event
+    finally:
+        for task in pending:
+            task.cancel()
+
+    scores = np.array([event["match_score"] for event in ranked])
+    yield {
+        "event": "summary",
+        "total": sum(counts.values()),
+        **counts,
+        "top": [
+            {key: ranked[i][key] for key in ("filename", "sha256", "resume_key", "match_score", "skills")}
+            for i in top_k_indices(scores, top_k)
+        ]
+    }
@@ -0,0 +1,209 @@
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a band,
+# pairs below ~0.4 almost never do
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 5
+# Estimated Jaccard similarity above which two resumes count as the same document
+DUPLICATE_THRESHOLD = settings.DUPLICATE_THRESHOLD
+# A claim on generating an analysis not finished by then is presumed abandoned
+ANALYSIS_CLAIM_SECONDS = 300
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Fixed seed: signatures are persisted and compared across processes
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Stable 32-bit hashes of the text's word `size`-grams (case and punctuation ignored)"""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams],
+        dtype=np.uint64
+    )
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM min-hashes of the text's shingles; None for empty text"""
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    # a < 2^31 and x < 2^32 keep a * x + b inside uint64
+    permuted = ((np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+def lsh_bands(signature: np.ndarray) -> List[str]:
+    """One bucket key per band; documents sharing any key are duplicate candidates"""
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(LSH_BANDS)
+    ]
+
+def similarity(a: Iterable[int], b: Iterable[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(np.asarray(a, dtype=np.uint32) == np.asarray(b, dtype=np.uint32)))
+
+def signature_fields(text: str) -> dict:
+    """Fields stored on a document so it can be found by duplicate lookups"""
+    signature = minhash_signature(text)
+    if signature is None:
+        return {"minhash": None, "lsh_bands": []}
+    return {"minhash": signature.tolist(), "lsh_bands": lsh_bands(signature)}
+
+def duplicate_clusters(signatures: Dict[str, List[int]], threshold: float = DUPLICATE_THRESHOLD) -> List[List[str]]:
+    """
+    Group documents into clusters of near-duplicates (transitively, via
+    union-find over LSH candidate pairs). Singletons are left out.
+    """
+    parent = {doc_id: doc_id for doc_id in signatures}
+
+    def find(doc_id: str) -> str:
+        while parent[doc_id] != doc_id:
+            parent[doc_id] = parent[parent[doc_id]]
+            doc_id = parent[doc_id]
+        return doc_id
+
+    buckets: Dict[str, List[str]] = {}
+    for doc_id, signature in signatures.items():
+        for key in lsh_bands(np.asarray(signature, dtype=np.uint32)):
+            buckets.setdefault(key, []).append(doc_id)
+
+    checked = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if (a, b) in checked:
+                    continue
+                checked.add((a, b))
+                if find(a) != find(b) and similarity(signatures[a], signatures[b]) >= threshold:
+                    parent[find(a)] = find(b)
+
+    clusters: Dict[str, List[str]] = {}
+    for doc_id in signatures:
+        clusters.setdefault(find(doc_id), []).append(doc_id)
+    return [members for members in clusters.values() if len(members) > 1]
+
+_indexes_created = False
+
+async def _ensure_indexes(db) -> None:
+    global _indexes_created
+    if not _indexes_created:
+        # Multikey indexes: one entry per band bucket
+        await db.users.create_index("lsh_bands")
+        await db.resume_analyses.create_index("lsh_bands")
+        # Sparse: rows stored before texts were hashed have no sha256
+        await db.resume_analyses.create_index("sha256", unique=True, sparse=True)
+        _indexes_created = True
+
+async def find_duplicate_candidates(
+    db,
+    signature: List[int],
+    exclude_id: Optional[str] = None,
+    threshold: float = DUPLICATE_THRESHOLD
+) -> List[Tuple[str, float]]:
+    """(candidate_id, similarity) for candidates whose resume is a near-duplicate, most similar first"""
+    await _ensure_indexes(db)
+    query = {"lsh_bands": {"$in": lsh_bands(np.asarray(signature, dtype=np.uint32))}}
+    duplicates = []
+    async for user in db.users.find(query, {"minhash": 1}):
+        candidate_id = str(user["_id"])
+        if candidate_id == exclude_id or not user.get("minhash"):
+            continue
+        score = similarity(signature, user["minhash"])
+        if score >= threshold:
+            duplicates.append((candidate_id, round(score, 3)))
+    return sorted(duplicates, key=lambda d: -d[1])
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+async def find_cached_analysis(db, text: str, owner_id: Optional[str] = None) -> Optional[dict]:
+    """
+    A stored analysis to reuse for this resume: one of the exact same text
+    (whoever submitted it), else the most similar near-identical resume
+    submitted by the same owner. Near-duplicates of other users' resumes are
+    never reused, since the narrative describes their resume, not this one.
+    """
+    await _ensure_indexes(db)
+    cached = await db.resume_analyses.find_one({"sha256": text_sha256(text), "result": {"$exists": True}})
+    if cached is not None:
+        logger.info(f"Reusing resume analysis {cached['_id']} (identical text)")
+        cached["similarity"] = 1.0
+        return cached
+    if owner_id is None:
+        return None
+
+    signature = minhash_signature(text)
+    if signature is None:
+        return None
+    best, best_score = None, DUPLICATE_THRESHOLD
+    async for cached in db.resume_analyses.find({"lsh_bands": {"$in": lsh_bands(signature)}, "owner_id": owner_id}):
+        score = similarity(signature, cached["minhash"])
+        if score >= best_score:
+            best, best_score = cached, score
+    if best is not None:
+        logger.info(f"Reusing resume analysis {best['_id']} (similarity {best_score:.2f})")
+        best["similarity"] = round(best_score, 3)
+    return best
+
+async def claim_analysis(db, text: str, owner_id: Optional[str] = None) -> bool:
+    """
+    Claim generating the analysis of this exact text, across all workers.
+    False while another claim is live or once the analysis is stored; a claim
+    older than ANALYSIS_CLAIM_SECONDS is taken over.
+    """
+    await _ensure_indexes(db)
+    now = datetime.utcnow()
+    try:
+        # Inserts the claim if there is no row for the text yet; the unique
+        # index turns a live claim or a stored analysis into a duplicate key
+        await db.resume_analyses.update_one(
+            {
+                "sha256": text_sha256(text),
+                "status": "pending",
+                "claimed_at": {"$lt": now - timedelta(seconds=ANALYSIS_CLAIM_SECONDS)}
+            },
+            {"$set": {"claimed_at": now, "owner_id": owner_id}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+async def release_analysis(db, text: str) -> None:
+    """Drop an unfinished claim so a waiting worker can generate the analysis instead"""
+    await db.resume_analyses.delete_one({"sha256": text_sha256(text), "status": "pending"})
+
+async def store_analysis(db, text: str, result: dict, owner_id: Optional[str] = None) -> None:
+    """Store the analysis, completing this text's claim if there is one"""
+    fields = signature_fields(text)
+    if fields["minhash"] is None:
+        await release_analysis(db, text)
+        return
+    await _ensure_indexes(db)
+    await db.resume_analyses.update_one(
+        {"sha256": text_sha256(text)},
+        {
+            "$set": {**fields, "owner_id": owner_id, "result": result, "status": "done", "created_at": datetime.utcnow()},
+            "$unset": {"claimed_at": ""}
+        },
+        upsert=True
+    )
@@ -0,0 +1,518 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import scipy.sparse as sp
+from core.config import settings
+from app.matching import RECONCILE_INTERVAL, ResumeTextLoader, acquire_leader_lock, changed_documents, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("brute", "ivf", "hnsw")
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+def token_windows(ids: List[int], window: int, overlap: int, max_windows: int) -> List[List[int]]:
+    """Overlapping windows of at most `window` token ids covering the whole text (up to `max_windows`)"""
+    step = max(window - overlap, 1)
+    windows = [ids[start:start + window] for start in range(0, max(len(ids) - overlap, 1), step)]
+    return windows[:max_windows]
+
+def pool_windows(vectors: np.ndarray, owners: List[int], weights: List[int], count: int) -> np.ndarray:
+    """One unit vector per text: the mean of its window embeddings, weighted by window length"""
+    pooled = np.zeros((count, vectors.shape[1]), dtype=np.float64)
+    np.add.at(pooled, owners, vectors * np.asarray(weights, dtype=np.float64)[:, np.newaxis])
+    return normalize_rows(pooled)
+
+class SentenceEmbedder:
+    """
+    Mean-pooled, L2-normalised sentence embeddings from a transformer encoder, loaded on first use.
+
+    Texts longer than the encoder's `max_length` are split into overlapping
+    windows that are embedded separately and averaged, so a skills section on
+    page two of a resume counts as much as the first paragraph.
+    """
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        max_length: int = 256,
+        batch_size: int = 32,
+        window_overlap: int = 32,
+        max_windows: int = 16
+    ):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.window_overlap = window_overlap
+        self.max_windows = max_windows
+        self._model = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._model is None:
+                from app.inference import load_encoder
+                self._model, self._tokenizer = load_encoder(self.model_name, self.backend)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self._load()
+        token_ids = self._tokenizer(texts, add_special_tokens=False, verbose=False)["input_ids"]
+        window = self.max_length - self._tokenizer.num_special_tokens_to_add()
+        windows, owners = [], []
+        for owner, ids in enumerate(token_ids):
+            for chunk in token_windows(ids, window, self.window_overlap, self.max_windows):
+                windows.append(chunk)
+                owners.append(owner)
+        vectors = self._encode_windows(windows)
+        return pool_windows(vectors, owners, [max(len(chunk), 1) for chunk in windows], len(texts))
+
+    def _encode_windows(self, windows: List[List[int]]) -> np.ndarray:
+        """Mean-pooled last hidden states of token id windows (special tokens added here)"""
+        import torch
+
+        batches = []
+        for start in range(0, len(windows), self.batch_size):
+            inputs = self._tokenizer.pad(
+                [self._tokenizer.prepare_for_model(ids, add_special_tokens=True) for ids in windows[start:start + self.batch_size]],
+                padding=True,
+                return_tensors="pt"
+            ).to(self._model.device)
+            with torch.no_grad():
+                hidden = self._model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            batches.append(pooled.float().cpu().numpy())
+        return normalize_rows(np.vstack(batches))
+
+class EmbeddingMatrix:
+    """
+    Contiguous float32 matrix with one unit vector per document.
+
+    Rows keep their position for the lifetime of a document, so ANN indexes can use
+    row numbers as labels; deleted rows are zeroed and reused. Each row remembers the
+    content hash it was embedded from, so unchanged documents are never re-embedded.
+    """
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024):
+        self.dim = dim
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32) if dim else None
+        self.ids: List[Optional[str]] = []
+        self.hashes: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def size(self) -> int:
+        """Number of allocated rows, including free ones"""
+        return len(self.ids)
+
+    def hash_of(self, doc_id: str) -> Optional[str]:
+        row = self.rows.get(doc_id)
+        return None if row is None else self.hashes[row]
+
+    def vector(self, doc_id: str) -> Optional[np.ndarray]:
+        row = self.rows.get(doc_id)
+        return None if row is None else self.vectors[row]
+
+    def live_rows(self) -> np.ndarray:
+        return np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))
+
+    def _allocate_row(self) -> int:
+        if self.free:
+            return self.free.pop()
+        if self.size == self.capacity:
+            self.capacity *= 2
+            grown = np.zeros((self.capacity, self.dim), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+        self.ids.append(None)
+        self.hashes.append(None)
+        return self.size - 1
+
+    def upsert(self, doc_id: str, vector: np.ndarray, digest: str) -> int:
+        if self.vectors is None:
+            self.dim = len(vector)
+            self.vectors = np.zeros((self.capacity, self.dim), dtype=np.float32)
+        row = self.rows.get(doc_id)
+        if row is None:
+            row = self._allocate_row()
+            self.rows[doc_id] = row
+            self.ids[row] = doc_id
+        self.vectors[row] = vector
+        self.hashes[row] = digest
+        return row
+
+    def remove(self, doc_id: str) -> Optional[int]:
+        row = self.rows.pop(doc_id, None)
+        if row is not None:
+            self.vectors[row] = 0
+            self.ids[row] = None
+            self.hashes[row] = None
+            self.free.append(row)
+        return row
+
+class BruteForceIndex:
+    """Exact search: one matrix-vector product over every live row"""
+    def __init__(self, matrix: EmbeddingMatrix):
+        self.matrix = matrix
+
+    def rebuild(self) -> None:
+        pass
+
+    def update(self, row: int) -> None:
+        pass
+
+    def remove(self, row: int) -> None:
+        pass
+
+    def exact(self, query: np.ndarray, top_k: int, rows: np.ndarray) -> List[Tuple[int, float]]:
+        if not len(rows):
+            return []
+        scores = self.matrix.vectors[rows] @ query
+        return [(int(rows[i]), float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        if not len(self.matrix):
+            return []
+        # Scan the contiguous block rather than gathering live rows into a copy
+        scores = self.matrix.vectors[:self.matrix.size] @ query
+        scores[self.matrix.free] = -np.inf
+        return [(int(row), float(scores[row])) for row in top_k_indices(scores, min(top_k, len(self.matrix)))]
+
+def train_spherical_kmeans(vectors: np.ndarray, n_clusters: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means on the unit sphere (cosine similarity); returns unit-norm centroids"""
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        one_hot = sp.csr_matrix(
+            (np.ones(len(vectors), dtype=np.float32), (assignments, np.arange(len(vectors)))),
+            shape=(n_clusters, len(vectors))
+        )
+        sums = np.asarray(one_hot @ vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty clusters from random points
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+class IVFIndex(BruteForceIndex):
+    """
+    Inverted-file index: rows are bucketed by their nearest k-means centroid and a
+    query only scans the `nprobe` closest buckets.
+
+    The coarse quantizer is trained on a sample and retrained once the collection
+    has grown fourfold; in between, rows are assigned to their nearest centroid.
+    """
+    def __init__(
+        self,
+        matrix: EmbeddingMatrix,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        iterations: int = 10,
+        sample_per_list: int = 64,
+        seed: int = 0
+    ):
+        super().__init__(matrix)
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.sample_per_list = sample_per_list
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Dict[int, int] = {}
+        self.lists: List[Set[int]] = []
+        self._arrays: Dict[int, np.ndarray] = {}
+        self.trained_size = 0
+
+    def rebuild(self) -> None:
+        rows = self.matrix.live_rows()
+        # Too few rows to be worth clustering: fall back to exact search
+        if len(rows) < 256:
+            self.centroids = None
+            return
+        n_lists = self.n_lists or int(np.sqrt(len(rows)))
+        sample = rows if len(rows) <= n_lists * self.sample_per_list else self.rng.choice(rows, n_lists * self.sample_per_list, replace=False)
+        self.centroids = train_spherical_kmeans(self.matrix.vectors[sample], n_lists, self.iterations, self.rng)
+
+        assignments = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), 8192):
+            batch = self.matrix.vectors[rows[start:start + 8192]]
+            assignments[start:start + 8192] = np.argmax(batch @ self.centroids.T, axis=1)
+        self.assignments = dict(zip(rows.tolist(), assignments.tolist()))
+        self.lists = [set() for _ in range(n_lists)]
+        for row, bucket in self.assignments.items():
+            self.lists[bucket].add(row)
+        self._arrays = {}
+        self.trained_size = len(rows)
+
+    def update(self, row: int) -> None:
+        if self.centroids is None or len(self.matrix) > 4 * self.trained_size:
+            if len(self.matrix) >= 256:
+                self.rebuild()
+            return
+        self.remove(row)
+        bucket = int(np.argmax(self.centroids @ self.matrix.vectors[row]))
+        self.assignments[row] = bucket
+        self.lists[bucket].add(row)
+        self._arrays.pop(bucket, None)
+
+    def remove(self, row: int) -> None:
+        bucket = self.assignments.pop(row, None)
+        if bucket is not None:
+            self.lists[bucket].discard(row)
+            self._arrays.pop(bucket, None)
+
+    def _bucket_rows(self, bucket: int) -> np.ndarray:
+        if bucket not in self._arrays:
+            self._arrays[bucket] = np.fromiter(self.lists[bucket], dtype=np.int64, count=len(self.lists[bucket]))
+        return self._arrays[bucket]
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        if self.centroids is None:
+            return super().search(query, top_k)
+        probe = top_k_indices(self.centroids @ query, min(self.nprobe, len(self.centroids)))
+        return self.exact(query, top_k, np.concatenate([self._bucket_rows(b) for b in probe]))
+
+class HNSWIndex(BruteForceIndex):
+    """Hierarchical navigable small-world graph (optional dependency: hnswlib)"""
+    def __init__(self, matrix: EmbeddingMatrix, m: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        try:
+            import hnswlib
+        except ImportError:
+            raise RuntimeError("The hnsw embedding index requires `hnswlib` to be installed")
+        super().__init__(matrix)
+        self.hnswlib = hnswlib
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.index = None
+        self.deleted: Set[int] = set()
+
+    def rebuild(self) -> None:
+        if self.matrix.dim is None:
+            return
+        index = self.hnswlib.Index(space="ip", dim=self.matrix.dim)
+        index.init_index(max_elements=self.matrix.capacity, ef_construction=self.ef_construction, M=self.m)
+        index.set_ef(self.ef_search)
+        rows = self.matrix.live_rows()
+        if len(rows):
+            index.add_items(self.matrix.vectors[rows], rows)
+        self.index = index
+        self.deleted = set()
+
+    def update(self, row: int) -> None:
+        if self.index is None:
+            self.rebuild()
+            return
+        if row >= self.index.get_max_elements():
+            self.index.resize_index(self.matrix.capacity)
+        if row in self.deleted:
+            self.index.unmark_deleted(row)
+            self.deleted.discard(row)
+        # Adding an existing label replaces its vector
+        self.index.add_items(self.matrix.vectors[row][np.newaxis], [row])
+
+    def remove(self, row: int) -> None:
+        if self.index is not None and row not in self.deleted:
+            self.index.mark_deleted(row)
+            self.deleted.add(row)
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        top_k = min(top_k, len(self.matrix))
+        if self.index is None or top_k == 0:
+            return []
+        self.index.set_ef(max(self.ef_search, top_k))
+        labels, distances = self.index.knn_query(query, k=top_k)
+        # hnswlib's inner-product distance is 1 - dot product
+        return [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+def create_index(index_type: str, matrix: EmbeddingMatrix) -> BruteForceIndex:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown embedding index '{index_type}'. Expected one of: {', '.join(INDEX_TYPES)}")
+    if index_type == "hnsw":
+        return HNSWIndex(matrix)
+    if index_type == "ivf":
+        return IVFIndex(matrix)
+    return BruteForceIndex(matrix)
+
+class SemanticIndex:
+    """
+    Sentence embeddings for every resume and job, served by an ANN index per kind.
+
+    Embedding is CPU-bound: call the mutating and searching methods from a worker
+    thread (run_in_threadpool). A lock keeps matrix and index updates consistent.
+    """
+    def __init__(self, embedder: Optional[SentenceEmbedder] = None, index_type: Optional[str] = None):
+        self.embedder = embedder or SentenceEmbedder()
+        self.index_type = index_type or settings.EMBEDDING_INDEX
+        self.matrices = {kind: EmbeddingMatrix() for kind in ("resume", "job")}
+        self.indexes = {kind: create_index(self.index_type, matrix) for kind, matrix in self.matrices.items()}
+        self.synced_at: Optional[datetime] = None
+        self._lock = threading.RLock()
+
+    def upsert_many(self, kind: str, documents: Dict[str, str]) -> int:
+        """Embed new or changed documents (by content hash); returns how many were embedded"""
+        matrix, index = self.matrices[kind], self.indexes[kind]
+        digests = {doc_id: content_hash(text) for doc_id, text in documents.items()}
+        changed = [doc_id for doc_id, digest in digests.items() if matrix.hash_of(doc_id) != digest]
+        if not changed:
+            return 0
+        vectors = self.embedder.encode([documents[doc_id] for doc_id in changed])
+        with self._lock:
+            for doc_id, vector in zip(changed, vectors):
+                index.update(matrix.upsert(doc_id, vector, digests[doc_id]))
+        return len(changed)
+
+    def upsert(self, kind: str, doc_id: str, text: str) -> None:
+        self.upsert_many(kind, {doc_id: text})
+
+    def remove(self, kind: str, doc_id: str) -> None:
+        with self._lock:
+            row = self.matrices[kind].remove(doc_id)
+            if row is not None:
+                self.indexes[kind].remove(row)
+
+    def rebuild(self) -> None:
+        with self._lock:
+            for index in self.indexes.values():
+                index.rebuild()
+
+    def _search(self, kind: str, query: Optional[np.ndarray], top_k: int, restrict_to: Optional[Iterable[str]]) -> List[Tuple[str, float]]:
+        if query is None:
+            return []
+        matrix, index = self.matrices[kind], self.indexes[kind]
+        with self._lock:
+            if restrict_to is None:
+                hits = index.search(query, top_k)
+            else:
+                # Small candidate sets (e.g. a job's applicants) are cheaper to scan exactly
+                rows = np.array([matrix.rows[d] for d in restrict_to if d in matrix.rows], dtype=np.int64)
+                hits = index.exact(query, top_k, rows)
+            return [(matrix.ids[row], round(max(score, 0.0) * 100, 2)) for row, score in hits]
+
+    def top_candidates_for_job(self, job_id: str, top_k: int = 10, candidate_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        return self._search("resume", self.matrices["job"].vector(job_id), top_k, candidate_ids)
+
+    def top_jobs_for_candidate(self, candidate_id: str, top_k: int = 10, job_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        return self._search("job", self.matrices["resume"].vector(candidate_id), top_k, job_ids)
+
+    def similarity(self, text_a: str, text_b: str) -> float:
+        """Cosine similarity (0-100) of two texts"""
+        vectors = self.embedder.encode([text_a, text_b])
+        return round(max(float(vectors[0] @ vectors[1]), 0.0) * 100, 2)
+
+    def save(self, directory: Path) -> None:
+        """Persist the embedding cache so restarts only embed new or changed documents"""
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            for kind, matrix in self.matrices.items():
+                if matrix.vectors is None:
+                    continue
+                np.save(directory / f"{kind}_vectors.tmp.npy", matrix.vectors[:matrix.size])
+                with open(directory / f"{kind}_meta.tmp.json", "w") as f:
+                    json.dump({"model": self.embedder.model_name, "ids": matrix.ids, "hashes": matrix.hashes}, f)
+                os.replace(directory / f"{kind}_vectors.tmp.npy", directory / f"{kind}_vectors.npy")
+                os.replace(directory / f"{kind}_meta.tmp.json", directory / f"{kind}_meta.json")
+
+    def load(self, directory: Path) -> None:
+        """Load a saved embedding cache (from the same model) and rebuild the ANN indexes"""
+        with self._lock:
+            for kind in self.matrices:
+                meta_path = directory / f"{kind}_meta.json"
+                if not meta_path.exists():
+                    continue
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                if meta["model"] != self.embedder.model_name:
+                    logger.info(f"Ignoring {kind} embeddings computed with {meta['model']}")
+                    continue
+                vectors = np.load(directory / f"{kind}_vectors.npy")
+                matrix = EmbeddingMatrix(vectors.shape[1], capacity=max(1024, 2 * len(vectors)))
+                matrix.vectors[:len(vectors)] = vectors
+                matrix.ids, matrix.hashes = meta["ids"], meta["hashes"]
+                matrix.rows = {doc_id: row for row, doc_id in enumerate(matrix.ids) if doc_id is not None}
+                matrix.free = [row for row, doc_id in enumerate(matrix.ids) if doc_id is None]
+                self.matrices[kind] = matrix
+                self.indexes[kind] = create_index(self.index_type, matrix)
+            self.rebuild()
+
+# Shared index; the encoder is only loaded when something is embedded
+semantic_index = SemanticIndex()
+
+def embeddings_enabled() -> bool:
+    return settings.EMBEDDING_ENABLED
+
+async def sync_semantic_index(db, load_resume_text: ResumeTextLoader, directory: Path, reconcile: bool = False) -> None:
+    """
+    Embed documents changed since the last sync and drop deleted ones; the first
+    sync loads the saved cache and reconciles it, as does `reconcile`
+    """
+    if semantic_index.synced_at is None:
+        await run_in_threadpool(semantic_index.load, directory)
+        # The cache may hold documents deleted while no process was syncing
+        reconcile = True
+    synced_at = datetime.utcnow()
+
+    indexed_ids = {kind: list(matrix.rows) for kind, matrix in semantic_index.matrices.items()} if reconcile else None
+    batches = {"resume": {}, "job": {}}
+    async for op, kind, doc_id, text in changed_documents(db, load_resume_text, semantic_index.synced_at, indexed_ids):
+        if op == "remove":
+            await run_in_threadpool(semantic_index.remove, kind, doc_id)
+            continue
+        batches[kind][doc_id] = text
+        if len(batches[kind]) >= 256:
+            await run_in_threadpool(semantic_index.upsert_many, kind, batches[kind])
+            batches[kind] = {}
+    for kind, documents in batches.items():
+        if documents:
+            await run_in_threadpool(semantic_index.upsert_many, kind, documents)
+
+    semantic_index.synced_at = synced_at
+    await run_in_threadpool(semantic_index.save, directory)
+
+async def maintain_semantic_index(db, load_resume_text: ResumeTextLoader, directory: Path, interval: float) -> None:
+    """
+    Background loop: the leader embeds changed documents and saves the cache; the
+    other processes reload the saved cache whenever it changes, and take over
+    as leader once the leader's lock is released.
+    """
+    leader = None
+    loaded_mtime = None
+    reconciled_at = time.monotonic()
+    while True:
+        try:
+            if not leader:
+                leader = acquire_leader_lock(directory)
+            if leader:
+                reconcile = time.monotonic() - reconciled_at >= RECONCILE_INTERVAL
+                await sync_semantic_index(db, load_resume_text, directory, reconcile)
+                if reconcile:
+                    reconciled_at = time.monotonic()
+            else:
+                meta = directory / "resume_meta.json"
+                mtime = meta.stat().st_mtime if meta.exists() else None
+                if mtime != loaded_mtime:
+                    await run_in_threadpool(semantic_index.load, directory)
+                    loaded_mtime = mtime
+        except Exception as e:
+            logger.error(f"Semantic index maintenance failed: {str(e)}")
+        await asyncio.sleep(interval)
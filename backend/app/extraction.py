@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for parsing; 0 parses in the default thread pool instead
+EXTRACTION_WORKERS = settings.EXTRACTION_WORKERS
+# PDFs with more pages than this are split across workers by page range
+PARALLEL_PDF_PAGES = settings.EXTRACTION_PARALLEL_PDF_PAGES
+# Extracted text kept in process memory, in characters
+EXTRACTION_CACHE_CHARS = settings.EXTRACTION_CACHE_CHARS
+
+KINDS = {".pdf": "pdf", ".docx": "docx"}
+
+def kind_from_path(path: str) -> Optional[str]:
+    return KINDS.get(os.path.splitext(path)[1].lower())
+
+# Parsers run in worker processes: module-level, bytes in, str out
+
+def pdf_page_count(data: bytes) -> int:
+    from PyPDF2 import PdfReader
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+def pdf_text(data: bytes, start: int = 0, stop: Optional[int] = None) -> str:
+    from PyPDF2 import PdfReader
+    pages = PdfReader(io.BytesIO(data)).pages
+    stop = len(pages) if stop is None else min(stop, len(pages))
+    return "".join(pages[i].extract_text() or "" for i in range(start, stop))
+
+def docx_text(data: bytes) -> str:
+    import docx
+    return "".join(paragraph.text + "\n" for paragraph in docx.Document(io.BytesIO(data)).paragraphs)
+
+def parse_document(data: bytes, kind: str) -> str:
+    """Extract text in the calling process; PDF or DOCX only"""
+    if kind == "pdf":
+        return pdf_text(data)
+    if kind == "docx":
+        return docx_text(data)
+    raise ValueError(f"Unsupported document type: {kind}")
+
+class TextCache:
+    """LRU of extracted text keyed by the SHA-256 of the source file, bounded by total characters"""
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.chars = 0
+        self.entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        text = self.entries.get(key)
+        if text is not None:
+            self.entries.move_to_end(key)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        if key in self.entries:
+            self.chars -= len(self.entries.pop(key))
+        if len(text) > self.max_chars:
+            return
+        self.entries[key] = text
+        self.chars += len(text)
+        while self.chars > self.max_chars:
+            _, evicted = self.entries.popitem(last=False)
+            self.chars -= len(evicted)
+
+class TextExtractor:
+    """
+    Extract resume text from in-memory PDF/DOCX files off the event loop.
+
+    Parsing runs in a process pool (PyPDF2 is pure Python and holds the GIL);
+    large PDFs are split into page ranges parsed in parallel. Results are
+    cached by SHA-256 of the file in process memory and, when a database is
+    passed, in the `parsed_documents` collection shared by all workers.
+    Concurrent requests for the same file share one parse.
+    """
+    def __init__(self, workers: int = EXTRACTION_WORKERS, cache_chars: int = EXTRACTION_CACHE_CHARS):
+        self.workers = workers
+        self.cache = TextCache(cache_chars)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.parses = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def _page_ranges(self, pages: int) -> List[Tuple[int, int]]:
+        step = -(-pages // max(self.workers, 1))
+        return [(start, min(start + step, pages)) for start in range(0, pages, step)]
+
+    async def _parse(self, data: bytes, kind: str) -> str:
+        self.parses += 1
+        if kind == "pdf" and self.workers > 1:
+            pages = await self._run(pdf_page_count, data)
+            if pages > PARALLEL_PDF_PAGES:
+                parts = await asyncio.gather(*(
+                    self._run(pdf_text, data, start, stop) for start, stop in self._page_ranges(pages)
+                ))
+                return "".join(parts)
+        return await self._run(parse_document, data, kind)
+
+    async def extract(self, data: bytes, kind: str, sha256: Optional[str] = None, db=None) -> str:
+        """Text of an in-memory document, parsed at most once per distinct file"""
+        key = sha256 or hashlib.sha256(data).hexdigest()
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+        if key in self.in_flight:
+            return await asyncio.shield(self.in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            stored = await db.parsed_documents.find_one({"_id": key}, {"text": 1}) if db is not None else None
+            if stored is not None:
+                text = stored["text"]
+            else:
+                text = await self._parse(data, kind)
+                if db is not None:
+                    await db.parsed_documents.update_one(
+                        {"_id": key},
+                        {"$set": {"text": text, "kind": kind, "created_at": datetime.utcnow()}},
+                        upsert=True
+                    )
+            self.cache.put(key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+
+    async def extract_stored(self, storage, key: str, sha256: Optional[str] = None, db=None) -> str:
+        """
+        Text of a document in a storage backend (core.storage); with a known
+        hash it is only downloaded on a cache miss
+        """
+        if sha256 is not None:
+            text = self.cache.get(sha256)
+            if text is not None:
+                return text
+        kind = kind_from_path(key)
+        if kind is None:
+            return ""
+        data = await storage.get_bytes(key)
+        return await self.extract(data, kind, sha256, db)
+
+text_extractor = TextExtractor()
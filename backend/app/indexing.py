@@ -0,0 +1,57 @@
+from datetime import datetime
+from bson import ObjectId
+from starlette.concurrency import run_in_threadpool
+from app.duplicates import signature_fields
+from app.embeddings import embeddings_enabled, semantic_index
+from app.matching import ResumeTextLoader, job_document_text, matching_engine
+from app.recommendations import refresh_candidate_recommendations, refresh_job_recommendations
+from app.skill_search import skill_index
+from app.skills import extract_experience_years, extract_skills
+
+async def index_candidate_resume(db, candidate_id: str, user: dict, load_resume_text: ResumeTextLoader) -> None:
+    """
+    Parse a newly uploaded resume once, then store its text, skills, experience
+    and MinHash signature on the user and update the skill, match and
+    recommendation indexes (run as a background task).
+    """
+    text = await load_resume_text(user)
+    if not text:
+        return
+    skills = extract_skills(text)
+    experience_years = extract_experience_years(text)
+    # Everything downstream (scoring, search, interview questions) reads these fields instead of the file
+    await db.users.update_one(
+        {"_id": ObjectId(candidate_id)},
+        {"$set": {
+            "resume_text": text,
+            "skills": skills,
+            "experience_years": experience_years,
+            "resume_indexed_at": datetime.utcnow(),
+            **signature_fields(text),
+        }}
+    )
+    skill_index.upsert(candidate_id, skills, experience_years)
+    matching_engine.add_resume(candidate_id, text)
+    if embeddings_enabled():
+        await run_in_threadpool(semantic_index.upsert, "resume", candidate_id, text)
+    await refresh_candidate_recommendations(db, candidate_id)
+
+def job_index_fields(job: dict) -> dict:
+    """Fields derived from a job's text, stored on it when it is created or updated"""
+    return {"skills": extract_skills(job_document_text(job))}
+
+def index_job_inline(job_id: str, job: dict) -> None:
+    """Cheap per-request index update for a job, once it has been written"""
+    matching_engine.add_job(job_id, job_document_text(job))
+
+async def index_job(db, job_id: str, job: dict) -> None:
+    """Embed a created or updated job and fold it into the recommendation feeds (background task)"""
+    if embeddings_enabled():
+        await run_in_threadpool(semantic_index.upsert, "job", job_id, job_document_text(job))
+    await refresh_job_recommendations(db, job_id)
+
+async def unindex_job(db, job_id: str) -> None:
+    """Drop a deleted job from the match indexes and recommendation feeds (background task)"""
+    matching_engine.remove_job(job_id)
+    await run_in_threadpool(semantic_index.remove, "job", job_id)
+    await refresh_job_recommendations(db, job_id)
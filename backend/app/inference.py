@@ -0,0 +1,147 @@
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Any
+import torch
+from transformers import (
+    AutoModel, AutoModelForCausalLM, AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SUMMARIZER_MODEL = "facebook/bart-large-cnn"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# "auto" picks "cuda" when a GPU is present and "cpu-fp32" otherwise
+INFERENCE_BACKENDS = ("auto", "cuda", "cpu-fp32", "cpu-int8", "onnx")
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Resolve the configured inference backend (AI_INFERENCE_BACKEND) to a concrete one"""
+    backend = (backend or os.getenv("AI_INFERENCE_BACKEND", "auto")).lower()
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{backend}'. Expected one of: {', '.join(INFERENCE_BACKENDS)}"
+        )
+    if backend == "auto":
+        backend = "cuda" if torch.cuda.is_available() else "cpu-fp32"
+
+    if backend != "cuda":
+        threads = int(os.getenv("AI_CPU_THREADS", "0"))
+        if threads > 0:
+            torch.set_num_threads(threads)
+    return backend
+
+def _onnx_export_dir(model_name: str) -> Path:
+    return Path(os.getenv("ONNX_EXPORT_DIR", "onnx_models")) / model_name.replace("/", "--")
+
+def _load_onnx(ort_class_name: str, model_name: str, token: Optional[str]) -> Any:
+    """Load an ONNX Runtime model, exporting and caching it on first use"""
+    try:
+        import optimum.onnxruntime as ort
+    except ImportError:
+        raise RuntimeError("The onnx backend requires `optimum[onnxruntime]` to be installed")
+
+    ort_class = getattr(ort, ort_class_name)
+    export_dir = _onnx_export_dir(model_name)
+    if export_dir.exists():
+        return ort_class.from_pretrained(export_dir)
+
+    model = ort_class.from_pretrained(model_name, export=True, token=token)
+    model.save_pretrained(export_dir)
+    return model
+
+def _quantize_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """Apply dynamic int8 quantization to the Linear layers of a fp32 model"""
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_causal_lm(
+    model_name: str,
+    backend: Optional[str] = None,
+    token: Optional[str] = None,
+    use_safetensors: Optional[bool] = None
+) -> Tuple[Any, Any]:
+    """
+    Load a causal LM and its tokenizer for the given inference backend.
+
+    use_safetensors=True requires safetensors weights, which transformers
+    memory-maps instead of reading the whole checkpoint into memory.
+    """
+    backend = resolve_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+
+    if backend == "cuda":
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            token=token,
+            torch_dtype=torch.float16,
+            device_map="auto",
+            use_safetensors=use_safetensors
+        )
+    elif backend == "onnx":
+        model = _load_onnx("ORTModelForCausalLM", model_name, token)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            token=token,
+            torch_dtype=torch.float32,
+            low_cpu_mem_usage=True,
+            use_safetensors=use_safetensors
+        )
+        if backend == "cpu-int8":
+            model = _quantize_int8(model)
+    return model, tokenizer
+
+def load_seq2seq_lm(
+    model_name: str,
+    backend: Optional[str] = None,
+    token: Optional[str] = None
+) -> Tuple[Any, Any]:
+    """Load an encoder-decoder model (e.g. the BART summarizer) for the given backend"""
+    backend = resolve_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+
+    if backend == "cuda":
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_name, token=token, torch_dtype=torch.float16
+        ).to("cuda")
+    elif backend == "onnx":
+        model = _load_onnx("ORTModelForSeq2SeqLM", model_name, token)
+    else:
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_name, token=token, torch_dtype=torch.float32, low_cpu_mem_usage=True
+        )
+        if backend == "cpu-int8":
+            model = _quantize_int8(model)
+    return model, tokenizer
+
+def load_encoder(
+    model_name: str = EMBEDDING_MODEL,
+    backend: Optional[str] = None,
+    token: Optional[str] = None
+) -> Tuple[Any, Any]:
+    """Load a sentence-embedding encoder (last hidden states, no head) for the given backend"""
+    backend = resolve_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+
+    if backend == "cuda":
+        model = AutoModel.from_pretrained(model_name, token=token).to("cuda")
+    elif backend == "onnx":
+        model = _load_onnx("ORTModelForFeatureExtraction", model_name, token)
+    else:
+        model = AutoModel.from_pretrained(model_name, token=token, torch_dtype=torch.float32)
+        if backend == "cpu-int8":
+            model = _quantize_int8(model)
+    return model, tokenizer
+
+def load_summarizer(backend: Optional[str] = None, model_name: str = SUMMARIZER_MODEL):
+    """Build the summarization pipeline on the configured backend"""
+    backend = resolve_backend(backend)
+    model, tokenizer = load_seq2seq_lm(model_name, backend)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+def load_text_generator(model_name: str, backend: Optional[str] = None, token: Optional[str] = None):
+    """Build the text-generation pipeline on the configured backend"""
+    backend = resolve_backend(backend)
+    model, tokenizer = load_causal_lm(model_name, backend, token)
+    return pipeline("text-generation", model=model, tokenizer=tokenizer)
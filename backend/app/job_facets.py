@@ -0,0 +1,50 @@
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job fields the search UI shows counts for
+JOB_FACETS = ("type", "location", "experience_level")
+# Values returned per facet, most common first
+FACET_LIMIT = 20
+
+def facet_stages(facets=JOB_FACETS, limit: int = FACET_LIMIT) -> Dict[str, list]:
+    """One $facet sub-pipeline per field counting jobs by value (missing and empty values left out)"""
+    return {
+        field: [
+            {"$match": {field: {"$nin": [None, ""]}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        for field in facets
+    }
+
+async def find_jobs_with_facets(
+    db,
+    query: dict,
+    projection: Dict[str, int],
+    skip: int,
+    limit: int,
+    facets=JOB_FACETS
+) -> Tuple[int, List[dict], Dict[str, List[dict]]]:
+    """
+    A page of jobs, the total and the facet counts for `query` in a single
+    aggregation: the filter runs once and $facet fans its matches out to the
+    page, the count and every facet.
+    """
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "jobs": [{"$skip": skip}, {"$limit": limit}, {"$project": projection}],
+            "total": [{"$count": "count"}],
+            **facet_stages(facets),
+        }},
+    ]
+    result = (await db.jobs.aggregate(pipeline).to_list(length=1))[0]
+    total = result["total"][0]["count"] if result["total"] else 0
+    counts = {
+        field: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in result[field]]
+        for field in facets
+    }
+    return total, result["jobs"], counts
@@ -0,0 +1,553 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space; large enough that collisions are negligible for resumes
+N_FEATURES = 2 ** 20
+# Writes are stamped before they commit, and by other machines' clocks, so an
+# incremental sync re-reads this far back from the time of the previous one
+SYNC_OVERLAP = timedelta(seconds=60)
+# Deletions made outside the app leave no tombstone; a periodic reconciliation
+# against the live _ids removes them
+RECONCILE_INTERVAL = settings.MATCHING_RECONCILE_INTERVAL
+# Tombstones outlive any realistic gap between two syncs of a running index
+DELETION_TTL_SECONDS = 30 * 86400
+
+ResumeTextLoader = Callable[[dict], Awaitable[str]]
+
+def job_document_text(job: dict) -> str:
+    """Text used to represent a job in the matching corpus"""
+    requirements = job.get("requirements") or []
+    if isinstance(requirements, list):
+        requirements = " ".join(str(r) for r in requirements)
+    return " ".join(filter(None, [
+        job.get("title", ""),
+        job.get("description", ""),
+        str(requirements),
+    ]))
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first, without sorting the whole array"""
+    if top_k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    return candidates[np.argsort(-scores[candidates])]
+
+def _empty_matrix() -> sp.csr_matrix:
+    return sp.csr_matrix((0, N_FEATURES), dtype=np.float32)
+
+class DocumentStore:
+    """
+    Sparse rows for one kind of document (resumes or jobs).
+
+    `tf` holds sublinear term frequencies, kept so IDF can be re-estimated, and
+    `vectors` the L2-normalised TF-IDF rows used for scoring. Rows added since the
+    last compaction live in a small in-memory delta segment; replaced or deleted
+    rows are tombstoned until compaction drops them.
+    """
+    def __init__(
+        self,
+        ids: Optional[List[str]] = None,
+        tf: Optional[sp.csr_matrix] = None,
+        vectors: Optional[sp.csr_matrix] = None
+    ):
+        self.ids: List[str] = list(ids or [])
+        self.tf = tf if tf is not None else _empty_matrix()
+        self.vectors = vectors if vectors is not None else _empty_matrix()
+        self.rows: Dict[str, int] = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self.dead: Set[int] = set()
+        self.delta_tf: List[sp.csr_matrix] = []
+        self.delta_vectors: List[sp.csr_matrix] = []
+        self._stacked_delta: Optional[sp.csr_matrix] = None
+
+    @property
+    def base_size(self) -> int:
+        return self.tf.shape[0]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.rows
+
+    def _row(self, base: sp.csr_matrix, delta: List[sp.csr_matrix], doc_id: str) -> Optional[sp.csr_matrix]:
+        row = self.rows.get(doc_id)
+        if row is None:
+            return None
+        return base[row] if row < self.base_size else delta[row - self.base_size]
+
+    def tf_row(self, doc_id: str) -> Optional[sp.csr_matrix]:
+        return self._row(self.tf, self.delta_tf, doc_id)
+
+    def vector_row(self, doc_id: str) -> Optional[sp.csr_matrix]:
+        return self._row(self.vectors, self.delta_vectors, doc_id)
+
+    def remove(self, doc_id: str) -> Optional[sp.csr_matrix]:
+        """Tombstone a document and return its TF row"""
+        tf_row = self.tf_row(doc_id)
+        if tf_row is not None:
+            self.dead.add(self.rows.pop(doc_id))
+        return tf_row
+
+    def append(self, doc_id: str, tf_row: sp.csr_matrix, vector_row: sp.csr_matrix) -> None:
+        self.rows[doc_id] = len(self.ids)
+        self.ids.append(doc_id)
+        self.delta_tf.append(tf_row)
+        self.delta_vectors.append(vector_row)
+        self._stacked_delta = None
+
+    def _delta(self) -> sp.csr_matrix:
+        if self._stacked_delta is None:
+            self._stacked_delta = (
+                sp.vstack(self.delta_vectors, format="csr") if self.delta_vectors else _empty_matrix()
+            )
+        return self._stacked_delta
+
+    def scores(self, vector: sp.csr_matrix) -> np.ndarray:
+        """Cosine similarity of every row with a 1 x N_FEATURES query row; tombstones score -inf"""
+        query = vector.T.tocsc()
+        scores = np.concatenate([
+            (self.vectors @ query).toarray().ravel(),
+            (self._delta() @ query).toarray().ravel(),
+        ])
+        if self.dead:
+            scores[list(self.dead)] = -np.inf
+        return scores
+
+    def frozen(self) -> tuple:
+        """Cheap copy of the current rows for compaction on another thread"""
+        return list(self.ids), self.tf, list(self.delta_tf), set(self.dead)
+
+    @staticmethod
+    def live_rows(frozen: tuple) -> Tuple[List[str], sp.csr_matrix]:
+        ids, base_tf, delta_tf, dead = frozen
+        tf = sp.vstack([base_tf] + delta_tf, format="csr") if delta_tf else base_tf
+        keep = [row for row in range(len(ids)) if row not in dead]
+        return [ids[row] for row in keep], tf[keep]
+
+class MatchingEngine:
+    """
+    Incrementally maintained TF-IDF index of resumes and jobs.
+
+    Documents are hashed into a fixed feature space, so new resumes and jobs are
+    appended without refitting a vocabulary. Document frequencies are updated on
+    every append; IDF weights are re-estimated and tombstoned rows dropped when the
+    index is compacted. Compacted indexes are saved as memory-mapped snapshots so
+    worker processes share one copy and start without recomputing.
+
+    Rows are L2-normalised, so cosine similarity is a dot product and ranking every
+    applicant for a job is a single sparse matrix-vector product.
+    """
+    def __init__(self):
+        self.hasher = HashingVectorizer(
+            n_features=N_FEATURES,
+            stop_words="english",
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32
+        )
+        self.resumes = DocumentStore()
+        self.jobs = DocumentStore()
+        self.doc_freq = np.zeros(N_FEATURES, dtype=np.int32)
+        self.n_docs = 0
+        self.idf: Optional[np.ndarray] = None
+        self.fitted_at: Optional[float] = None
+        # Database changes up to this time are reflected in the index
+        self.synced_at: Optional[datetime] = None
+        self.snapshot_version: Optional[str] = None
+        # (time, op, kind, doc_id, text) applied since the last compaction or snapshot load
+        self.pending_ops: List[tuple] = []
+
+    @property
+    def fitted(self) -> bool:
+        return self.idf is not None
+
+    def _tf(self, texts: List[str]) -> sp.csr_matrix:
+        tf = self.hasher.transform(texts).tocsr()
+        tf.data = 1 + np.log(tf.data)
+        return tf
+
+    def _tfidf(self, tf: sp.csr_matrix) -> sp.csr_matrix:
+        vectors = tf.copy()
+        vectors.data = vectors.data * self.idf[vectors.indices]
+        return normalize(vectors, copy=False)
+
+    def _estimate_idf(self) -> None:
+        # Same smoothing as sklearn's TfidfTransformer
+        self.idf = (np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1).astype(np.float32)
+
+    def _build(self, resume_ids: List[str], resume_tf: sp.csr_matrix, job_ids: List[str], job_tf: sp.csr_matrix) -> None:
+        self.n_docs = len(resume_ids) + len(job_ids)
+        self.doc_freq = (
+            np.bincount(resume_tf.indices, minlength=N_FEATURES)
+            + np.bincount(job_tf.indices, minlength=N_FEATURES)
+        ).astype(np.int32)
+        self._estimate_idf()
+        self.resumes = DocumentStore(resume_ids, resume_tf, self._tfidf(resume_tf))
+        self.jobs = DocumentStore(job_ids, job_tf, self._tfidf(job_tf))
+        self.fitted_at = time.time()
+
+    def fit(self, resumes: Dict[str, str], jobs: Dict[str, str]) -> None:
+        """Index all resumes and jobs from scratch"""
+        resume_tf = self._tf(list(resumes.values())) if resumes else _empty_matrix()
+        job_tf = self._tf(list(jobs.values())) if jobs else _empty_matrix()
+        self._build(list(resumes), resume_tf, list(jobs), job_tf)
+
+    def load_from(self, other: "MatchingEngine") -> None:
+        """Swap in the state of another engine (no awaits, so atomic for coroutines)"""
+        self.__dict__.update(other.__dict__)
+
+    def apply(self, op: str, kind: str, doc_id: str, text: Optional[str] = None, record: bool = True) -> None:
+        """Add or replace ("add") or delete ("remove") a "resume" or "job" document"""
+        if record:
+            self.pending_ops.append((datetime.utcnow(), op, kind, doc_id, text))
+        if not self.fitted:
+            # Replayed by ensure_matching_engine once the index is loaded
+            return
+        store = self.resumes if kind == "resume" else self.jobs
+        old_tf = store.remove(doc_id)
+        if old_tf is not None:
+            self.doc_freq[old_tf.indices] -= 1
+            self.n_docs -= 1
+        if op == "add":
+            # New documents are weighted with the current IDF until the next compaction
+            tf = self._tf([text])
+            self.doc_freq[tf.indices] += 1
+            self.n_docs += 1
+            store.append(doc_id, tf, self._tfidf(tf))
+
+    def add_resume(self, candidate_id: str, text: str) -> None:
+        self.apply("add", "resume", candidate_id, text)
+
+    def add_job(self, job_id: str, text: str) -> None:
+        self.apply("add", "job", job_id, text)
+
+    def remove_job(self, job_id: str) -> None:
+        self.apply("remove", "job", job_id)
+
+    def _job_vector(self, job_id: Optional[str], job_text: Optional[str]) -> sp.csr_matrix:
+        vector = self.jobs.vector_row(job_id) if job_id is not None else None
+        if vector is None:
+            if job_text is None:
+                raise KeyError(f"Job {job_id} is not in the matching index")
+            vector = self._tfidf(self._tf([job_text]))
+        return vector
+
+    def score(self, resume_text: str, job_text: str) -> float:
+        """Cosine similarity (0-100) between two documents using the corpus IDF weights"""
+        vectors = self._tfidf(self._tf([resume_text, job_text]))
+        return round(float(vectors[0].multiply(vectors[1]).sum()) * 100, 2)
+
+    def score_texts(self, texts: List[str], job_id: Optional[str] = None, job_text: Optional[str] = None) -> np.ndarray:
+        """Match scores (0-100) of unindexed resume texts against a job, one sparse product per batch"""
+        if not texts:
+            return np.zeros(0)
+        vectors = self._tfidf(self._tf(texts))
+        scores = np.asarray((vectors @ self._job_vector(job_id, job_text).T).todense()).ravel()
+        return np.round(scores * 100, 2)
+
+    def rank_applicants(
+        self,
+        job_id: Optional[str] = None,
+        job_text: Optional[str] = None,
+        candidate_ids: Optional[Iterable[str]] = None,
+        top_k: int = 10
+    ) -> List[Tuple[str, float]]:
+        """Return the top_k (candidate_id, score) pairs for a job, best first"""
+        scores = self.resumes.scores(self._job_vector(job_id, job_text))
+        return self._top(self.resumes, scores, candidate_ids, top_k)
+
+    def applicant_scores(self, candidate_ids: List[str], job_id: Optional[str] = None, job_text: Optional[str] = None) -> np.ndarray:
+        """Match scores (0-100) for the given candidates, in order; 0 for candidates not indexed"""
+        scores = self.resumes.scores(self._job_vector(job_id, job_text))
+        rows = [self.resumes.rows.get(candidate_id) for candidate_id in candidate_ids]
+        result = np.zeros(len(candidate_ids), dtype=np.float64)
+        found = [i for i, row in enumerate(rows) if row is not None]
+        result[found] = scores[[rows[i] for i in found]] * 100
+        return np.round(np.where(np.isfinite(result), result, 0.0), 2)
+
+    def rank_jobs(
+        self,
+        candidate_id: str,
+        job_ids: Optional[Iterable[str]] = None,
+        top_k: int = 10
+    ) -> List[Tuple[str, float]]:
+        """Return the top_k (job_id, score) pairs for an indexed candidate, best first"""
+        vector = self.resumes.vector_row(candidate_id)
+        if vector is None:
+            return []
+        return self._top(self.jobs, self.jobs.scores(vector), job_ids, top_k)
+
+    @staticmethod
+    def _top(store: DocumentStore, scores: np.ndarray, doc_ids: Optional[Iterable[str]], top_k: int) -> List[Tuple[str, float]]:
+        if doc_ids is None:
+            rows = np.arange(len(scores))
+        else:
+            rows = np.array([store.rows[d] for d in doc_ids if d in store], dtype=np.int64)
+        if not len(rows):
+            return []
+
+        ranked = []
+        # Tombstoned rows score -inf; over-fetch so they never crowd out live ones
+        for i in top_k_indices(scores[rows], min(top_k + len(store.dead), len(rows))):
+            row = rows[i]
+            if np.isfinite(scores[row]):
+                ranked.append((store.ids[row], round(float(scores[row]) * 100, 2)))
+        return ranked[:top_k]
+
+    @classmethod
+    def compacted(cls, resumes: tuple, jobs: tuple, synced_at: Optional[datetime]) -> "MatchingEngine":
+        """Rebuild from the live rows of frozen stores, re-estimating IDF"""
+        engine = cls()
+        engine._build(*DocumentStore.live_rows(resumes), *DocumentStore.live_rows(jobs))
+        engine.synced_at = synced_at
+        return engine
+
+    def save_snapshot(self, directory: Path, keep: int = 2) -> str:
+        """Write a compacted engine as .npy files and atomically point CURRENT at them"""
+        directory.mkdir(parents=True, exist_ok=True)
+        version = f"v{int(time.time() * 1000)}"
+        tmp = directory / f".{version}.tmp"
+        tmp.mkdir()
+        for kind, store in (("resume", self.resumes), ("job", self.jobs)):
+            for name, matrix in (("tf", store.tf), ("vectors", store.vectors)):
+                for part in ("data", "indices", "indptr"):
+                    np.save(tmp / f"{kind}_{name}_{part}.npy", getattr(matrix, part))
+        np.save(tmp / "doc_freq.npy", self.doc_freq)
+        np.save(tmp / "idf.npy", self.idf)
+        with open(tmp / "meta.json", "w") as f:
+            json.dump({
+                "resume_ids": self.resumes.ids,
+                "job_ids": self.jobs.ids,
+                "n_docs": self.n_docs,
+                "fitted_at": self.fitted_at,
+                "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            }, f)
+        os.replace(tmp, directory / version)
+
+        pointer = directory / "CURRENT.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, directory / "CURRENT")
+
+        versions = sorted(p.name for p in directory.iterdir() if p.is_dir() and p.name.startswith("v"))
+        for old in versions[:-keep]:
+            shutil.rmtree(directory / old, ignore_errors=True)
+        return version
+
+    @classmethod
+    def load_snapshot(cls, directory: Path) -> Optional["MatchingEngine"]:
+        """Load the CURRENT snapshot with its matrices memory-mapped read-only"""
+        pointer = directory / "CURRENT"
+        if not pointer.exists():
+            return None
+        version = pointer.read_text().strip()
+        path = directory / version
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+
+        def load_matrix(kind: str, name: str, rows: int) -> sp.csr_matrix:
+            parts = tuple(
+                np.load(path / f"{kind}_{name}_{part}.npy", mmap_mode="r")
+                for part in ("data", "indices", "indptr")
+            )
+            return sp.csr_matrix(parts, shape=(rows, N_FEATURES), copy=False)
+
+        engine = cls()
+        for kind, attr in (("resume", "resumes"), ("job", "jobs")):
+            ids = meta[f"{kind}_ids"]
+            setattr(engine, attr, DocumentStore(ids, load_matrix(kind, "tf", len(ids)), load_matrix(kind, "vectors", len(ids))))
+        # Document frequencies change on every append, so they are copied out of the mapping
+        engine.doc_freq = np.array(np.load(path / "doc_freq.npy"))
+        engine.idf = np.load(path / "idf.npy", mmap_mode="r")
+        engine.n_docs = meta["n_docs"]
+        engine.fitted_at = meta["fitted_at"]
+        engine.synced_at = datetime.fromisoformat(meta["synced_at"]) if meta["synced_at"] else None
+        engine.snapshot_version = version
+        return engine
+
+async def build_matching_engine(db, load_resume_text: ResumeTextLoader) -> MatchingEngine:
+    """Index every job and every candidate with a resume"""
+    synced_at = datetime.utcnow()
+    documents = {"resume": {}, "job": {}}
+    async for _, kind, doc_id, text in changed_documents(db, load_resume_text, None):
+        documents[kind][doc_id] = text
+
+    engine = MatchingEngine()
+    # Vectorizing the corpus is CPU-bound; keep it off the event loop
+    await run_in_threadpool(engine.fit, documents["resume"], documents["job"])
+    engine.synced_at = synced_at
+    return engine
+
+_deletions_index_created = False
+
+async def record_deletion(db, kind: str, doc_id: str) -> None:
+    """Leave a tombstone so every worker's next sync drops the deleted "job" or "resume" from its indexes"""
+    global _deletions_index_created
+    if not _deletions_index_created:
+        await db.deleted_documents.create_index("deleted_at", expireAfterSeconds=DELETION_TTL_SECONDS)
+        _deletions_index_created = True
+    await db.deleted_documents.insert_one({"kind": kind, "doc_id": doc_id, "deleted_at": datetime.utcnow()})
+
+async def changed_documents(
+    db,
+    load_resume_text: ResumeTextLoader,
+    since: Optional[datetime],
+    indexed_ids: Optional[Dict[str, Iterable[str]]] = None
+) -> AsyncIterator[Tuple[str, str, str, Optional[str]]]:
+    """
+    Yield (op, kind, doc_id, text) for jobs and resumes created or changed since
+    `since` (everything when None) and a "remove" for each one deleted since.
+    With `indexed_ids` ({"job": ids, "resume": ids}), also a "remove" for every
+    indexed document that no longer exists, however it was deleted.
+    """
+    since = since - SYNC_OVERLAP if since is not None else None
+
+    def time_filter(*fields: str) -> dict:
+        return {} if since is None else {"$or": [{field: {"$gt": since}} for field in fields]}
+
+    async for job in db.jobs.find(time_filter("created_at", "updated_at"), {"title": 1, "description": 1, "requirements": 1}):
+        yield "add", "job", str(job["_id"]), job_document_text(job)
+
+    resume_filter = {"role": "candidate", "resume_path": {"$exists": True}}
+    async for user in db.users.find(
+        # resume_indexed_at: the stored text changed, so workers re-read it without parsing
+        {**resume_filter, **time_filter("created_at", "resume_updated_at", "resume_indexed_at")},
+        {"resume_path": 1, "resume_sha256": 1, "resume_text": 1}
+    ):
+        text = await load_resume_text(user)
+        if text:
+            yield "add", "resume", str(user["_id"]), text
+
+    if since is not None:
+        async for deletion in db.deleted_documents.find({"deleted_at": {"$gt": since}}):
+            yield "remove", deletion["kind"], deletion["doc_id"], None
+
+    if indexed_ids:
+        for kind, collection, query in (("job", db.jobs, {}), ("resume", db.users, resume_filter)):
+            indexed = list(indexed_ids.get(kind, ()))
+            if not indexed:
+                continue
+            live = set()
+            async for document in collection.find(query, {"_id": 1}):
+                live.add(str(document["_id"]))
+            for doc_id in indexed:
+                if doc_id not in live:
+                    yield "remove", kind, doc_id, None
+
+async def sync_from_db(engine: MatchingEngine, db, load_resume_text: ResumeTextLoader, reconcile: bool = False) -> None:
+    """
+    Apply resumes and jobs changed or deleted since the last sync, including
+    those handled by other workers; `reconcile` also drops documents deleted
+    without a tombstone
+    """
+    synced_at = datetime.utcnow()
+    indexed_ids = {"job": list(engine.jobs.rows), "resume": list(engine.resumes.rows)} if reconcile else None
+    async for op, kind, doc_id, text in changed_documents(db, load_resume_text, engine.synced_at, indexed_ids):
+        engine.apply(op, kind, doc_id, text, record=False)
+    engine.synced_at = synced_at
+
+async def compact_matching_engine(engine: MatchingEngine, directory: Optional[Path] = None) -> None:
+    """
+    Re-estimate IDF and drop tombstones off the event loop, optionally snapshot the
+    result, then replay changes made while compacting and swap it in.
+    """
+    replay_from = len(engine.pending_ops)
+    compacted = await run_in_threadpool(
+        MatchingEngine.compacted,
+        engine.resumes.frozen(),
+        engine.jobs.frozen(),
+        engine.synced_at
+    )
+    if directory is not None:
+        compacted.snapshot_version = await run_in_threadpool(compacted.save_snapshot, directory)
+    for _, op, kind, doc_id, text in engine.pending_ops[replay_from:]:
+        compacted.apply(op, kind, doc_id, text, record=False)
+    engine.load_from(compacted)
+
+# Shared engine for the routers
+matching_engine = MatchingEngine()
+_load_lock: Optional[asyncio.Lock] = None
+
+async def ensure_matching_engine(db, load_resume_text: ResumeTextLoader, directory: Path) -> MatchingEngine:
+    """Load the shared engine from the latest snapshot, or build it from the database"""
+    global _load_lock
+    if matching_engine.fitted:
+        return matching_engine
+    if _load_lock is None:
+        _load_lock = asyncio.Lock()
+
+    async with _load_lock:
+        if not matching_engine.fitted:
+            engine = await run_in_threadpool(MatchingEngine.load_snapshot, directory)
+            if engine is None:
+                engine = await build_matching_engine(db, load_resume_text)
+            # Keep uploads indexed while the engine was loading
+            for _, op, kind, doc_id, text in matching_engine.pending_ops:
+                engine.apply(op, kind, doc_id, text)
+            matching_engine.load_from(engine)
+    return matching_engine
+
+def acquire_leader_lock(directory: Path):
+    """One process per snapshot directory compacts and writes snapshots; the rest reload them"""
+    directory.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        return True
+    lock_file = open(directory / "leader.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file  # the lock is held for as long as the handle is open
+    except OSError:
+        lock_file.close()
+        return None
+
+async def maintain_matching_index(db, load_resume_text: ResumeTextLoader, directory: Path, interval: float) -> None:
+    """
+    Background loop: the leader syncs, compacts and snapshots; followers reload
+    new snapshots, and take over as leader once the leader's lock is released.
+    """
+    leader = None
+    reconciled_at = time.monotonic()
+    while True:
+        try:
+            if not leader:
+                leader = acquire_leader_lock(directory)
+            await ensure_matching_engine(db, load_resume_text, directory)
+            if leader:
+                if matching_engine.snapshot_version is not None:
+                    reconcile = time.monotonic() - reconciled_at >= RECONCILE_INTERVAL
+                    await sync_from_db(matching_engine, db, load_resume_text, reconcile)
+                    if reconcile:
+                        reconciled_at = time.monotonic()
+                await compact_matching_engine(matching_engine, directory)
+            else:
+                pointer = directory / "CURRENT"
+                if pointer.exists() and pointer.read_text().strip() != matching_engine.snapshot_version:
+                    snapshot = await run_in_threadpool(MatchingEngine.load_snapshot, directory)
+                    # Re-apply local changes the leader had not synced when it wrote the snapshot
+                    synced_at = snapshot.synced_at or datetime.min
+                    for changed_at, op, kind, doc_id, text in matching_engine.pending_ops:
+                        if changed_at > synced_at:
+                            snapshot.apply(op, kind, doc_id, text)
+                    matching_engine.load_from(snapshot)
+        except Exception as e:
+            logger.error(f"Matching index maintenance failed: {str(e)}")
+        await asyncio.sleep(interval)
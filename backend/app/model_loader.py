@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from typing import Any, Optional, Tuple
+from app.inference import load_causal_lm
+
+logger = logging.getLogger(__name__)
+
+class FallbackModelLoader:
+    """
+    Load a causal LM at most once per process.
+
+    Loading happens on a background thread so callers never block on it: `get()`
+    returns the (model, tokenizer) pair once it is ready and None while it is still
+    loading. Failed loads are retried with exponential backoff, up to
+    `max_attempts` times; after that the loader stays "failed" (see `status`)
+    until `retry()` is called. Weights are read from safetensors, which are
+    memory-mapped instead of copied into the heap.
+    """
+    def __init__(
+        self,
+        model_name: str,
+        token: Optional[str] = None,
+        backend: Optional[str] = None,
+        initial_backoff: float = 5.0,
+        max_backoff: float = 600.0,
+        max_attempts: int = 5
+    ):
+        self.model_name = model_name
+        self.token = token
+        self.backend = backend
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.attempts = 0
+        self.failed = False
+        self.last_error: Optional[str] = None
+        self._loaded: Optional[Tuple[Any, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded is not None
+
+    @property
+    def status(self) -> str:
+        """"ready", "loading", "failed" (gave up after max_attempts) or "idle" (never started)"""
+        if self._loaded is not None:
+            return "ready"
+        if self.failed:
+            return "failed"
+        if self._thread is not None:
+            return "loading"
+        return "idle"
+
+    def start(self) -> None:
+        """Start the background loader unless the model is loaded, already loading or failed"""
+        with self._lock:
+            if self._loaded is not None or self.failed or (self._thread and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(
+                target=self._load_with_backoff,
+                name=f"model-loader-{self.model_name}",
+                daemon=True
+            )
+            self._thread.start()
+
+    def retry(self) -> None:
+        """Start over after the loader gave up, with a fresh attempt budget"""
+        with self._lock:
+            if not self.failed:
+                return
+            self.failed = False
+            self.attempts = 0
+        self.start()
+
+    def get(self) -> Optional[Tuple[Any, Any]]:
+        """Return (model, tokenizer) if loaded, otherwise kick off loading and return None"""
+        if self._loaded is None:
+            self.start()
+        return self._loaded
+
+    def _load(self) -> Tuple[Any, Any]:
+        try:
+            return load_causal_lm(self.model_name, self.backend, self.token, use_safetensors=True)
+        except EnvironmentError:
+            # The repository only ships pickled (.bin) weights
+            logger.warning(f"No safetensors weights for {self.model_name}, loading .bin weights")
+            return load_causal_lm(self.model_name, self.backend, self.token)
+
+    def _load_with_backoff(self) -> None:
+        backoff = self.initial_backoff
+        while self._loaded is None:
+            self.attempts += 1
+            start_time = time.monotonic()
+            try:
+                self._loaded = self._load()
+                self.last_error = None
+                logger.info(
+                    f"Loaded fallback model {self.model_name} in {time.monotonic() - start_time:.1f}s "
+                    f"(attempt {self.attempts})"
+                )
+            except Exception as e:
+                self.last_error = str(e)
+                if self.attempts >= self.max_attempts:
+                    self.failed = True
+                    logger.error(
+                        f"Failed to load fallback model {self.model_name} (attempt {self.attempts}): {str(e)}. "
+                        "Giving up"
+                    )
+                    return
+                logger.error(
+                    f"Failed to load fallback model {self.model_name} (attempt {self.attempts}): {str(e)}. "
+                    f"Retrying in {backoff:.0f}s"
+                )
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
@@ -0,0 +1,141 @@
+import logging
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+from core.config import settings
+from app.embeddings import embeddings_enabled, semantic_index
+from app.matching import matching_engine
+
+logger = logging.getLogger(__name__)
+
+# Length of each candidate's precomputed feed
+RECOMMENDATIONS_PER_CANDIDATE = settings.RECOMMENDATIONS_PER_CANDIDATE
+# How many best-matching candidates a new or updated job is offered to
+RECOMMENDATIONS_JOB_FANOUT = settings.RECOMMENDATIONS_JOB_FANOUT
+
+JOB_FIELDS = {"title": 1, "company": 1, "location": 1, "type": 1, "status": 1}
+HIDDEN_JOB_STATUSES = ("closed", "draft")
+
+_indexes_created = False
+
+async def _ensure_indexes(db) -> None:
+    global _indexes_created
+    if not _indexes_created:
+        # Finds the feeds containing a job when it changes
+        await db.job_recommendations.create_index("jobs.job_id")
+        _indexes_created = True
+
+# Cosine similarities and TF-IDF percentages are not comparable, so every feed
+# is scored by a single source, stored with it
+Ranking = Tuple[str, List[Tuple[str, float]]]
+
+def _top_jobs(candidate_id: str, top_k: int) -> Optional[Ranking]:
+    """(source, best jobs) for a candidate; None when the candidate is not indexed yet"""
+    if embeddings_enabled() and candidate_id in semantic_index.matrices["resume"].rows:
+        return "semantic", semantic_index.top_jobs_for_candidate(candidate_id, top_k)
+    if candidate_id in matching_engine.resumes:
+        return "tfidf", matching_engine.rank_jobs(candidate_id, top_k=top_k)
+    return None
+
+def _top_candidates(job_id: str, top_k: int) -> Optional[Ranking]:
+    """(source, best candidates) for a job; None when the job is not indexed yet"""
+    if embeddings_enabled() and job_id in semantic_index.matrices["job"].rows:
+        return "semantic", semantic_index.top_candidates_for_job(job_id, top_k)
+    if job_id in matching_engine.jobs:
+        return "tfidf", matching_engine.rank_applicants(job_id=job_id, top_k=top_k)
+    return None
+
+def _entry(job: dict, score: float) -> dict:
+    return {
+        "job_id": str(job["_id"]),
+        "score": score,
+        "title": job.get("title"),
+        "company": job.get("company"),
+        "location": job.get("location"),
+        "type": job.get("type"),
+    }
+
+def _visible(job: Optional[dict]) -> bool:
+    return job is not None and job.get("status") not in HIDDEN_JOB_STATUSES
+
+async def refresh_candidate_recommendations(db, candidate_id: str) -> Optional[List[dict]]:
+    """Recompute one candidate's feed (after a resume upload); None if they are not indexed"""
+    # Over-fetch so closed and draft jobs can be dropped
+    ranking = await run_in_threadpool(_top_jobs, candidate_id, 2 * RECOMMENDATIONS_PER_CANDIDATE)
+    if ranking is None:
+        return None
+    source, ranked = ranking
+
+    jobs = {}
+    async for job in db.jobs.find({"_id": {"$in": [ObjectId(job_id) for job_id, _ in ranked]}}, JOB_FIELDS):
+        jobs[str(job["_id"])] = job
+    entries = [
+        _entry(jobs[job_id], score) for job_id, score in ranked if _visible(jobs.get(job_id))
+    ][:RECOMMENDATIONS_PER_CANDIDATE]
+
+    await _ensure_indexes(db)
+    await db.job_recommendations.update_one(
+        {"_id": candidate_id},
+        {"$set": {"jobs": entries, "source": source, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return entries
+
+async def refresh_job_recommendations(db, job_id: str) -> None:
+    """
+    Fold a created, updated or deleted job into the existing feeds.
+
+    The job is removed from every feed that lists it and offered to the
+    candidates it matches best; each feed keeps its top entries by score. Feeds
+    that lose the job without getting it back, or that are scored by another
+    source than the job's, are recomputed in full.
+    """
+    await _ensure_indexes(db)
+    listed_in = set()
+    async for feed in db.job_recommendations.find({"jobs.job_id": job_id}, {"_id": 1}):
+        listed_in.add(feed["_id"])
+    if listed_in:
+        await db.job_recommendations.update_many(
+            {"_id": {"$in": list(listed_in)}},
+            {"$pull": {"jobs": {"job_id": job_id}}}
+        )
+
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)}, JOB_FIELDS)
+    ranking = await run_in_threadpool(_top_candidates, job_id, RECOMMENDATIONS_JOB_FANOUT) if _visible(job) else None
+    offered_to = set()
+    stale = set()
+    if ranking and ranking[1]:
+        source, ranked = ranking
+        now = datetime.utcnow()
+        await db.job_recommendations.bulk_write([
+            # No upsert: candidates without a feed get a full one on first read
+            UpdateOne(
+                {"_id": candidate_id, "source": source},
+                {
+                    "$push": {"jobs": {
+                        "$each": [_entry(job, score)],
+                        "$sort": {"score": -1},
+                        "$slice": RECOMMENDATIONS_PER_CANDIDATE,
+                    }},
+                    "$set": {"updated_at": now},
+                }
+            )
+            for candidate_id, score in ranked
+        ], ordered=False)
+        offered_to = {candidate_id for candidate_id, _ in ranked}
+        async for feed in db.job_recommendations.find(
+            {"_id": {"$in": list(offered_to)}, "source": {"$ne": source}}, {"_id": 1}
+        ):
+            stale.add(feed["_id"])
+
+    for candidate_id in (listed_in - offered_to) | stale:
+        await refresh_candidate_recommendations(db, candidate_id)
+
+async def get_recommendations(db, candidate_id: str, limit: int) -> List[dict]:
+    """Serve a candidate's precomputed feed, building it on first request"""
+    feed = await db.job_recommendations.find_one({"_id": candidate_id}, {"jobs": {"$slice": limit}})
+    if feed is not None:
+        return feed["jobs"]
+    return (await refresh_candidate_recommendations(db, candidate_id) or [])[:limit]
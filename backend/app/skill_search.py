@@ -0,0 +1,328 @@
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from app.matching import SYNC_OVERLAP, top_k_indices
+from app.skills import _normalize, skill_lookup
+
+logger = logging.getLogger(__name__)
+
+# Deleted candidates leave nothing to sync from; a periodic full reload drops them
+FULL_SYNC_INTERVAL = 600.0
+
+# Query syntax tree: a canonical skill name, or (operator, operand, ...) with
+# operator one of "and", "or", "not"
+QueryNode = Union[str, tuple]
+
+_TOKEN_PATTERN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+class QueryError(ValueError):
+    """A skill query that cannot be parsed or names an unknown skill"""
+
+class _QueryParser:
+    """
+    Recursive descent parser for boolean skill queries.
+
+    OR binds loosest, then AND, then NOT; adjacent terms are ANDed together.
+    Bare words are read as the longest skill name they spell ("machine learning")
+    and quotes group words explicitly. Names resolve through the alias dictionary.
+    """
+    def __init__(self, text: str, lookup: Dict[str, str]):
+        self.tokens = _TOKEN_PATTERN.findall(text)
+        self.position = 0
+        self.lookup = lookup
+
+    def parse(self) -> QueryNode:
+        if not self.tokens:
+            raise QueryError("Empty skill query")
+        node = self._or()
+        if self.position < len(self.tokens):
+            raise QueryError(f"Unexpected '{self.tokens[self.position]}'")
+        return node
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _keyword(self) -> Optional[str]:
+        token = self._peek()
+        return token.upper() if token and token.upper() in _OPERATORS else None
+
+    def _or(self) -> QueryNode:
+        operands = [self._and()]
+        while self._keyword() == "OR":
+            self.position += 1
+            operands.append(self._and())
+        return operands[0] if len(operands) == 1 else ("or", *operands)
+
+    def _and(self) -> QueryNode:
+        operands = [self._not()]
+        while True:
+            if self._keyword() == "AND":
+                self.position += 1
+            elif self._peek() in (None, ")") or self._keyword() == "OR":
+                break
+            operands.append(self._not())
+        return operands[0] if len(operands) == 1 else ("and", *operands)
+
+    def _not(self) -> QueryNode:
+        if self._keyword() == "NOT":
+            self.position += 1
+            return ("not", self._not())
+        return self._term()
+
+    def _term(self) -> QueryNode:
+        token = self._peek()
+        if token is None:
+            raise QueryError("Query ends where a skill was expected")
+        if token == "(":
+            self.position += 1
+            node = self._or()
+            if self._peek() != ")":
+                raise QueryError("Missing ')'")
+            self.position += 1
+            return node
+        if token == ")" or self._keyword():
+            raise QueryError(f"Unexpected '{token}'")
+
+        if token.startswith('"'):
+            self.position += 1
+            name = _normalize(token.strip('"')).strip()
+            if name not in self.lookup:
+                raise QueryError(f"Unknown skill {token}")
+            return self.lookup[name]
+
+        words = []
+        while self.position + len(words) < len(self.tokens):
+            word = self.tokens[self.position + len(words)]
+            if word in ("(", ")") or word.startswith('"') or word.upper() in _OPERATORS:
+                break
+            words.append(word)
+        # Longest run of words naming a skill, so "machine learning python" is two skills
+        for length in range(len(words), 0, -1):
+            name = _normalize(" ".join(words[:length]))
+            if name in self.lookup:
+                self.position += length
+                return self.lookup[name]
+        raise QueryError(f"Unknown skill '{words[0]}'")
+
+def parse_skill_query(text: str) -> QueryNode:
+    return _QueryParser(text, _LOOKUP).parse()
+
+def positive_skills(node: QueryNode) -> List[str]:
+    """Skills a matching candidate is rewarded for having (those not under a NOT)"""
+    if isinstance(node, str):
+        return [node]
+    if node[0] == "not":
+        return []
+    return list(dict.fromkeys(skill for operand in node[1:] for skill in positive_skills(operand)))
+
+_LOOKUP = skill_lookup()
+
+def _bits_at(bitmap: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    return ((bitmap[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+class SkillIndex:
+    """
+    Skill -> candidate posting lists stored as bitmaps.
+
+    Candidates get dense row numbers and every skill keeps one bit per row in
+    uint64 words, so AND/OR/NOT are word-wise numpy operations: a query over
+    half a million candidates touches ~60KB per skill it mentions. Rows of
+    removed candidates are cleared in the `alive` bitmap and reused on the next
+    insert.
+    """
+    def __init__(self):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.row_skills: List[List[str]] = []
+        self.free: List[int] = []
+        self.postings: Dict[str, np.ndarray] = {}
+        self.alive = np.zeros(0, dtype=np.uint64)
+        self.experience = np.zeros(0, dtype=np.float32)
+        self.synced_at: Optional[datetime] = None
+        self.fully_synced_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, candidate_id: str) -> bool:
+        return candidate_id in self.rows
+
+    def _grow(self, n_rows: int) -> None:
+        words = len(self.alive)
+        if n_rows <= words * 64:
+            return
+        new_words = max(2 * words, (n_rows + 63) // 64, 16)
+        pad = new_words - words
+        self.alive = np.concatenate([self.alive, np.zeros(pad, dtype=np.uint64)])
+        for skill, bitmap in self.postings.items():
+            self.postings[skill] = np.concatenate([bitmap, np.zeros(pad, dtype=np.uint64)])
+        self.experience = np.concatenate([self.experience, np.full(pad * 64, np.nan, dtype=np.float32)])
+
+    @staticmethod
+    def _set(bitmap: np.ndarray, row: int, value: bool) -> None:
+        mask = np.uint64(1 << (row & 63))
+        if value:
+            bitmap[row >> 6] |= mask
+        else:
+            bitmap[row >> 6] &= ~mask
+
+    def upsert(self, candidate_id: str, skills: Iterable[str], experience_years: Optional[float] = None) -> None:
+        skills = list(dict.fromkeys(skills))
+        row = self.rows.get(candidate_id)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+                self.ids[row] = candidate_id
+                self.row_skills[row] = []
+            else:
+                row = len(self.ids)
+                self.ids.append(candidate_id)
+                self.row_skills.append([])
+                self._grow(row + 1)
+            self.rows[candidate_id] = row
+
+        for skill in self.row_skills[row]:
+            self._set(self.postings[skill], row, False)
+        for skill in skills:
+            if skill not in self.postings:
+                self.postings[skill] = np.zeros(len(self.alive), dtype=np.uint64)
+            self._set(self.postings[skill], row, True)
+        self.row_skills[row] = skills
+        self._set(self.alive, row, True)
+        self.experience[row] = np.nan if experience_years is None else experience_years
+
+    def remove(self, candidate_id: str) -> None:
+        row = self.rows.pop(candidate_id, None)
+        if row is None:
+            return
+        for skill in self.row_skills[row]:
+            self._set(self.postings[skill], row, False)
+        self.row_skills[row] = []
+        self._set(self.alive, row, False)
+        self.experience[row] = np.nan
+        self.free.append(row)
+
+    def evaluate(self, node: QueryNode) -> np.ndarray:
+        """Bitmap of the candidates matching a parsed query"""
+        if isinstance(node, str):
+            bitmap = self.postings.get(node)
+            return bitmap if bitmap is not None else np.zeros_like(self.alive)
+        operator, *operands = node
+        if operator == "not":
+            return self.alive & ~self.evaluate(operands[0])
+        bitmaps = [self.evaluate(operand) for operand in operands]
+        combine = np.bitwise_and if operator == "and" else np.bitwise_or
+        result = bitmaps[0].copy()
+        for bitmap in bitmaps[1:]:
+            combine(result, bitmap, out=result)
+        return result
+
+    def candidate_rows(
+        self,
+        node: QueryNode,
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None
+    ) -> np.ndarray:
+        """Rows matching the query and the experience range (unknown experience fails any bound)"""
+        bitmap = self.evaluate(node) & self.alive
+        rows = np.flatnonzero(np.unpackbits(bitmap.astype("<u8").view(np.uint8), bitorder="little"))
+        if min_experience is not None:
+            rows = rows[self.experience[rows] >= min_experience]
+        if max_experience is not None:
+            rows = rows[self.experience[rows] <= max_experience]
+        return rows
+
+    def coverage(self, rows: np.ndarray, skills: List[str]) -> np.ndarray:
+        """Fraction of `skills` each row has"""
+        if not skills:
+            return np.ones(len(rows), dtype=np.float32)
+        held = np.zeros(len(rows), dtype=np.float32)
+        for skill in skills:
+            bitmap = self.postings.get(skill)
+            if bitmap is not None:
+                held += _bits_at(bitmap, rows)
+        return held / len(skills)
+
+    def search(
+        self,
+        query: str,
+        min_experience: Optional[float] = None,
+        max_experience: Optional[float] = None,
+        match_scores: Optional[Callable[[List[str]], np.ndarray]] = None,
+        top_k: int = 20
+    ) -> Tuple[int, List[Tuple[str, float]]]:
+        """
+        Return (total matches, top_k (candidate_id, score) pairs). Candidates are
+        ranked by `match_scores(candidate_ids)` when given (e.g. resume-to-job
+        similarity) and otherwise by the share of the query's skills they have,
+        then experience.
+        """
+        node = parse_skill_query(query)
+        rows = self.candidate_rows(node, min_experience, max_experience)
+        if match_scores is not None:
+            scores = match_scores([self.ids[row] for row in rows]) if len(rows) else np.zeros(0)
+            order = top_k_indices(scores, top_k)
+        else:
+            scores = np.round(self.coverage(rows, positive_skills(node)) * 100, 2)
+            # Coverage moves in steps of at least 0.05 points, so experience (at most
+            # 50 years) only breaks ties
+            order = top_k_indices(scores + np.nan_to_num(self.experience[rows], nan=0.0) / 1000, top_k)
+        return len(rows), [(self.ids[rows[i]], float(scores[i])) for i in order]
+
+skill_index = SkillIndex()
+
+_indexes_created = False
+
+async def sync_skill_index(db, index: Optional[SkillIndex] = None) -> SkillIndex:
+    """
+    Load candidates whose skills changed since the last sync, picking up changes
+    made by other workers. Every FULL_SYNC_INTERVAL seconds all candidates are
+    reloaded instead, and those no longer found are removed.
+    """
+    global _indexes_created
+    index = index or skill_index
+    if not _indexes_created:
+        await db.users.create_index("resume_indexed_at")
+        _indexes_created = True
+
+    full = index.fully_synced_at is None or time.monotonic() - index.fully_synced_at >= FULL_SYNC_INTERVAL
+    query = {"role": "candidate", "resume_indexed_at": {"$exists": True}}
+    if not full and index.synced_at is not None:
+        # Re-reading documents already loaded is harmless
+        query["resume_indexed_at"] = {"$gte": index.synced_at - SYNC_OVERLAP}
+    projection = {"skills": 1, "experience_years": 1, "resume_indexed_at": 1}
+    started = time.monotonic()
+    seen = set()
+    async for user in db.users.find(query, projection):
+        candidate_id = str(user["_id"])
+        index.upsert(candidate_id, user.get("skills") or [], user.get("experience_years"))
+        if index.synced_at is None or user["resume_indexed_at"] > index.synced_at:
+            index.synced_at = user["resume_indexed_at"]
+        seen.add(candidate_id)
+
+    removed = 0
+    if full:
+        for candidate_id in [candidate_id for candidate_id in index.rows if candidate_id not in seen]:
+            index.remove(candidate_id)
+            removed += 1
+        index.fully_synced_at = started
+    if seen or removed:
+        logger.info(f"Skill index synced {len(seen)} and removed {removed} candidates ({len(index)} total)")
+    return index
+
+async def maintain_skill_index(db, interval: float) -> None:
+    """
+    Background loop: each process keeps its own index in sync, so searches
+    only read memory and never wait on the database
+    """
+    while True:
+        try:
+            await sync_skill_index(db)
+        except Exception as e:
+            logger.error(f"Skill index sync failed: {str(e)}")
+        await asyncio.sleep(interval)
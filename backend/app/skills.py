@@ -0,0 +1,277 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Canonical skill name -> aliases, matched case-insensitively on word boundaries.
+# Canonical names are matched too, except the ambiguous ones in AMBIGUOUS_NAMES,
+# which are only found through their aliases. Aliases that are everyday words or
+# name other things too ("lambda", "oracle", "ml", "github") only appear in a
+# qualifying phrase.
+SKILLS: Dict[str, List[str]] = {
+    # Programming languages
+    "Python": ["python3"],
+    "Java": ["java8", "java 8", "java 11", "java 17"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": [],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rustlang", "rust programming", "rust language", "rust developer"],
+    "C": ["ansi c", "c language", "c programming"],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["csharp", "c sharp"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": ["swiftui", "swift ui", "swift programming", "swift language", "swift developer"],
+    "Scala": [],
+    "R": ["r programming", "r language", "rstudio"],
+    "MATLAB": [],
+    "Perl": [],
+    "Dart": ["dartlang", "dart programming", "dart language"],
+    "Bash": ["shell scripting", "shell script", "bash scripting"],
+    "SQL": ["t-sql", "tsql", "pl/sql", "plsql"],
+    # Web frameworks and front end
+    "React": ["react.js", "reactjs"],
+    "React Native": ["react-native"],
+    "Angular": ["angular.js", "angularjs"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Next.js": ["nextjs", "next js"],
+    "Svelte": [],
+    "Redux": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "Sass": ["scss"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Bootstrap": ["twitter bootstrap", "bootstrap css", "bootstrap framework", "bootstrap 4", "bootstrap 5"],
+    "jQuery": [],
+    "Node.js": ["nodejs", "node js"],
+    "Express.js": ["expressjs", "express js"],
+    "Django": [],
+    "Flask": ["python flask", "flask framework", "flask api", "flask-restful"],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["springboot", "spring framework", "spring mvc"],
+    "Ruby on Rails": ["ruby-on-rails", "ror"],
+    "Laravel": [],
+    ".NET": ["dotnet", "dot net", "asp.net", ".net core"],
+    "GraphQL": [],
+    "REST APIs": ["restful", "rest api", "restful api", "restful apis"],
+    "gRPC": [],
+    "WebSockets": ["websocket"],
+    # Data stores
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "SQLite": [],
+    "Oracle Database": ["oracle db", "oracle sql", "oracle 19c", "oracle 12c"],
+    "SQL Server": ["mssql", "ms sql", "microsoft sql server"],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Cassandra": [],
+    "DynamoDB": [],
+    "Elasticsearch": ["elastic search", "elk"],
+    "Neo4j": [],
+    "Snowflake": ["snowflake data warehouse", "snowflake db", "snowflake database", "snowflake sql", "snowflakedb"],
+    "BigQuery": ["big query"],
+    # Cloud and infrastructure
+    "AWS": ["amazon web services", "ec2", "amazon s3", "aws s3", "aws lambda"],
+    "Azure": ["microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": ["docker compose", "dockerfile"],
+    "Kubernetes": ["k8s", "kubectl", "eks", "gke", "aks"],
+    "Helm": ["helm charts", "helm chart", "kubernetes helm", "helm 3"],
+    "Terraform": [],
+    "Ansible": [],
+    "Linux": ["unix", "ubuntu", "centos", "rhel"],
+    "Nginx": [],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": [],
+    "GitHub Actions": [],
+    "GitLab CI": [],
+    "Git": ["gitlab", "bitbucket"],
+    "Prometheus": [],
+    "Grafana": [],
+    "Microservices": ["microservice", "micro services"],
+    "Serverless": [],
+    # Data and machine learning
+    "Machine Learning": ["machine-learning", "ml models", "ml engineer", "ml engineering", "ml pipelines"],
+    "Deep Learning": ["deep-learning"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": ["opencv"],
+    "Data Analysis": ["data analytics", "data analyst"],
+    "Data Engineering": ["data pipelines", "etl"],
+    "Statistics": ["statistical analysis"],
+    "Pandas": [],
+    "NumPy": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "TensorFlow": [],
+    "PyTorch": [],
+    "Keras": [],
+    "Hugging Face": ["huggingface", "hugging face transformers"],
+    "LLMs": ["llm", "large language models", "large language model"],
+    "Apache Spark": ["pyspark", "spark sql", "spark streaming"],
+    "Apache Kafka": ["kafka"],
+    "Apache Airflow": ["airflow"],
+    "Hadoop": [],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Microsoft Excel": ["ms excel", "excel spreadsheets", "advanced excel"],
+    # Mobile
+    "Android": [],
+    "iOS": [],
+    "Flutter": [],
+    # Security and quality
+    "Cybersecurity": ["cyber security", "information security", "infosec"],
+    "OAuth": ["oauth2", "openid connect", "oidc"],
+    "Unit Testing": ["unit tests", "pytest", "junit", "jest"],
+    "Test Automation": ["selenium", "cypress", "playwright"],
+    # Design
+    "Figma": [],
+    "Adobe Photoshop": ["photoshop"],
+    "Adobe Illustrator": ["illustrator"],
+    "UI/UX Design": ["ui/ux", "ux design", "ui design", "user experience", "user interface design"],
+    # Practices and soft skills
+    "Agile": ["scrum", "kanban"],
+    "Project Management": ["project manager", "pmp"],
+    "Leadership": ["team lead", "led a team"],
+    "Communication": ["communication skills"],
+    "Problem Solving": ["problem-solving"],
+}
+
+AMBIGUOUS_NAMES = {"Go", "C", "R", "Swift", "Rust", "Dart", "Helm", "Flask", "Bootstrap", "Snowflake"}
+# Short names that are too common as words to find in free text, but that
+# unambiguously name the skill in a search query
+QUERY_ALIASES: Dict[str, List[str]] = {
+    "Ruby on Rails": ["rails"],
+    "Apache Spark": ["spark"],
+}
+
+MAX_EXPERIENCE_YEARS = 50
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower())
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class SkillAutomaton:
+    """
+    Aho-Corasick automaton over every skill alias.
+
+    `extract` scans the text once, whatever the dictionary size. Matches must sit on
+    word boundaries ("java" does not match inside "javascript"); overlapping matches
+    are resolved leftmost-longest ("react native" wins over "react").
+    """
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        # Trie as parallel lists indexed by state; state 0 is the root
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # (pattern length, canonical skill) for every pattern ending at a state
+        self.output: List[List[Tuple[int, str]]] = [[]]
+
+        for pattern, skill in patterns:
+            pattern = _normalize(pattern).strip()
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append((len(pattern), skill))
+        self._build_failure_links()
+
+    @classmethod
+    def from_dictionary(cls, skills: Dict[str, List[str]]) -> "SkillAutomaton":
+        return cls(
+            (pattern, skill)
+            for skill, aliases in skills.items()
+            for pattern in ([] if skill in AMBIGUOUS_NAMES else [skill]) + aliases
+        )
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # Patterns that are suffixes of this one also end here
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, skill) for every alias occurrence on word boundaries"""
+        text = _normalize(text)
+        found = []
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, skill in self.output[state]:
+                start = end - length
+                if (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end])):
+                    found.append((start, end, skill))
+        return found
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in the text, in order of first mention"""
+        skills = []
+        seen = set()
+        covered_until = 0
+        for start, end, skill in sorted(self.matches(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start < covered_until:
+                continue
+            covered_until = end
+            if skill not in seen:
+                seen.add(skill)
+                skills.append(skill)
+        return skills
+
+skill_extractor = SkillAutomaton.from_dictionary(SKILLS)
+
+def extract_skills(text: str) -> List[str]:
+    return skill_extractor.extract(text or "")
+
+# "7 years", "5+ yrs", "10 years of experience"
+_EXPERIENCE_PATTERN = re.compile(r"\b(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+# A mention followed by one of these, within a few words, is a claim of total experience
+_EXPERIENCE_ANCHOR = re.compile(
+    r"^['’]?\s*(?:of\s+|in\s+)?(?:[\w+#./-]+\s+){0,3}?(?:experience|exp\b|overall|total|professional)",
+    re.IGNORECASE
+)
+# Durations that are not experience: "founded 40 years ago", "a 10 year old codebase"
+_NOT_EXPERIENCE = re.compile(r"^[\s-]*(?:ago|old)\b", re.IGNORECASE)
+
+def extract_experience_years(text: str) -> Optional[float]:
+    """
+    Years of experience claimed in the text; None when it never says. Mentions
+    anchored on "experience" (or "overall", "total", ...) win, the largest of
+    them; otherwise the first mention counts, as resumes lead with the headline
+    figure.
+    """
+    text = text or ""
+    anchored, other = [], []
+    for match in _EXPERIENCE_PATTERN.finditer(text):
+        years = float(match.group(1))
+        after = text[match.end():match.end() + 60]
+        if years > MAX_EXPERIENCE_YEARS or _NOT_EXPERIENCE.match(after):
+            continue
+        if _EXPERIENCE_ANCHOR.match(after) or "experience" in text[max(match.start() - 25, 0):match.start()].lower():
+            anchored.append(years)
+        else:
+            other.append(years)
+    if anchored:
+        return max(anchored)
+    return other[0] if other else None
+
+def skill_lookup() -> Dict[str, str]:
+    """Normalized canonical name or alias -> canonical name, for resolving query terms"""
+    lookup = {}
+    for skill, aliases in SKILLS.items():
+        for name in [skill] + aliases + QUERY_ALIASES.get(skill, []):
+            lookup[_normalize(name).strip()] = skill
+    return lookup
@@ -0,0 +1,173 @@
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resume headings that start a new section when they appear on a line of their own
+SECTION_HEADING = re.compile(
+    r"^\s*(summary|professional summary|profile|objective|experience|work experience|"
+    r"professional experience|employment history|education|skills|technical skills|"
+    r"projects|certifications|awards|publications|languages|interests|volunteering|"
+    r"volunteer experience|references)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+def approximate_token_count(text: str) -> int:
+    """Cheap token estimate for backends without a local tokenizer"""
+    return int(len(text.split()) * 1.3) + 1
+
+def split_sections(text: str) -> List[str]:
+    """Split a resume into sections at recognised headings, keeping each heading with its body"""
+    starts = [match.start() for match in SECTION_HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(text))
+    sections = [text[start:end].strip() for start, end in zip(starts, starts[1:])]
+    return [section for section in sections if section]
+
+def _split_oversized(text: str, count_tokens: Callable[[str], int], max_tokens: int) -> List[str]:
+    """Split a section that is too long on its own by lines, or by words for a single long line"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    units, separator = (lines, "\n") if len(lines) > 1 else (text.split(), " ")
+    parts: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = count_tokens(unit)
+        if separator == "\n" and unit_tokens > max_tokens:
+            if current:
+                parts.append(separator.join(current))
+                current, current_tokens = [], 0
+            parts.extend(_split_oversized(unit, count_tokens, max_tokens))
+            continue
+        if current and current_tokens + unit_tokens > max_tokens:
+            parts.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        parts.append(separator.join(current))
+    return parts
+
+def chunk_text(text: str, count_tokens: Callable[[str], int], max_tokens: int) -> List[str]:
+    """Pack resume sections into as few chunks as possible, each at most max_tokens long"""
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for section in split_sections(text):
+        section_tokens = count_tokens(section)
+        if section_tokens > max_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(section, count_tokens, max_tokens))
+            continue
+        if current and current_tokens + section_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(section)
+        current_tokens += section_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def truncate_tokens(text: str, count_tokens: Callable[[str], int], max_tokens: int) -> str:
+    """The longest prefix of whole words that fits in max_tokens"""
+    words = text.split(" ")
+    if count_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle])) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+class SummaryCache:
+    """LRU cache of chunk summaries keyed by the SHA-256 of the chunk text"""
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def key(stage: str, text: str) -> str:
+        return f"{stage}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        return None
+
+    def set(self, key: str, summary: str) -> None:
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class MapReduceSummarizer:
+    """
+    Summarize text longer than the model's input window.
+
+    The text is split by resume section into token-bounded chunks, all chunks are
+    summarized in one batch (map), and the joined summaries are summarized again
+    (reduce) until a single chunk remains. If more than one is left after
+    max_depth rounds, each is cut to an equal share of the input window for the
+    final reduce. Chunk summaries are cached by content hash, so re-analysing
+    an edited resume only summarizes the changed sections.
+    """
+    def __init__(
+        self,
+        map_batch: Callable[[List[str]], List[str]],
+        count_tokens: Callable[[str], int],
+        max_tokens: int,
+        reduce_batch: Optional[Callable[[List[str]], List[str]]] = None,
+        cache: Optional[SummaryCache] = None,
+        max_depth: int = 3
+    ):
+        self.map_batch = map_batch
+        self.reduce_batch = reduce_batch or map_batch
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.cache = cache if cache is not None else SummaryCache()
+        self.max_depth = max_depth
+
+    def _summarize_chunks(self, stage: str, chunks: List[str], batch: Callable[[List[str]], List[str]]) -> List[str]:
+        keys = [SummaryCache.key(stage, chunk) for chunk in chunks]
+        summaries = [self.cache.get(key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            results = batch([chunks[i] for i in missing])
+            for i, summary in zip(missing, results):
+                summaries[i] = summary
+                # Failed generations come back empty and are retried next time
+                if summary:
+                    self.cache.set(keys[i], summary)
+        return summaries
+
+    def summarize(self, text: str) -> str:
+        chunks = chunk_text(text, self.count_tokens, self.max_tokens)
+        if not chunks:
+            return ""
+
+        depth = 0
+        while len(chunks) > 1 and depth < self.max_depth:
+            summaries = self._summarize_chunks("map", chunks, self.map_batch)
+            chunks = chunk_text("\n\n".join(summaries), self.count_tokens, self.max_tokens)
+            depth += 1
+
+        if len(chunks) > 1:
+            # Summaries still do not fit after max_depth rounds: keep the start of every one
+            logger.warning(
+                f"Summaries still span {len(chunks)} chunks after {self.max_depth} rounds; "
+                "truncating them for the final reduce"
+            )
+            share = max(self.max_tokens // len(chunks), 1)
+            joined = "\n\n".join(truncate_tokens(chunk, self.count_tokens, share) for chunk in chunks)
+            chunks = [truncate_tokens(joined, self.count_tokens, self.max_tokens)]
+        return self._summarize_chunks("reduce", chunks, self.reduce_batch)[0]
@@ -0,0 +1,81 @@
+"""
+Compare the approximate-nearest-neighbour embedding indexes against brute force:
+recall@k (overlap with the exact top k) and query latency.
+
+Vectors are synthetic clustered unit vectors with the dimensionality of the
+default sentence encoder, so no model is needed.
+
+Usage (from the backend directory):
+    python benchmarks/ann_benchmark.py --vectors 100000 --dim 384
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.embeddings import BruteForceIndex, EmbeddingMatrix, HNSWIndex, IVFIndex, normalize_rows
+
+def clustered_vectors(rng: np.random.Generator, count: int, dim: int, clusters: int, noise: float) -> np.ndarray:
+    # Seeded so resumes and queries share the same topic centers
+    centers = normalize_rows(np.random.default_rng(0).standard_normal((clusters, dim)))
+    labels = rng.integers(0, clusters, count)
+    return normalize_rows(centers[labels] + noise * rng.standard_normal((count, dim)) / np.sqrt(dim))
+
+def percentile(timings, q):
+    timings = sorted(timings)
+    return timings[int(q * (len(timings) - 1))] * 1000
+
+def run(name, index, queries, exact, top_k):
+    start = time.perf_counter()
+    index.rebuild()
+    build = time.perf_counter() - start
+
+    timings, recalls = [], []
+    for query, truth in zip(queries, exact):
+        start = time.perf_counter()
+        hits = index.search(query, top_k)
+        timings.append(time.perf_counter() - start)
+        recalls.append(len({row for row, _ in hits} & truth) / top_k)
+    print(
+        f"{name:<18} build {build:6.2f}s   recall@{top_k} {np.mean(recalls):.3f}   "
+        f"p50 {percentile(timings, 0.5):7.2f}ms   p95 {percentile(timings, 0.95):7.2f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=1.5, help="Within-topic spread relative to the topic center")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    matrix = EmbeddingMatrix(args.dim, capacity=args.vectors)
+    for row, vector in enumerate(clustered_vectors(rng, args.vectors, args.dim, args.clusters, args.noise)):
+        matrix.upsert(str(row), vector, "")
+    queries = clustered_vectors(rng, args.queries, args.dim, args.clusters, args.noise)
+
+    brute = BruteForceIndex(matrix)
+    exact = [{row for row, _ in brute.search(query, args.top_k)} for query in queries]
+    print(f"{args.vectors} vectors x {args.dim} dims, {args.queries} queries")
+    run("brute force", brute, queries, exact, args.top_k)
+
+    for nprobe in args.nprobe:
+        run(f"ivf nprobe={nprobe}", IVFIndex(matrix, nprobe=nprobe), queries, exact, args.top_k)
+
+    try:
+        for ef in (32, 64, 128):
+            run(f"hnsw ef={ef}", HNSWIndex(matrix, ef_search=ef), queries, exact, args.top_k)
+    except RuntimeError as e:
+        print(f"hnsw skipped: {e}")
+
+if __name__ == "__main__":
+    main()
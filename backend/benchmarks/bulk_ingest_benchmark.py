@@ -0,0 +1,119 @@
+"""
+Measure bulk resume ingestion throughput: a zip of generated PDF resumes is
+expanded, parsed in the extraction process pool, deduplicated and scored
+against a job, as the /jobs/{job_id}/bulk-ingest endpoint does.
+
+A share of the archive are exact copies, as in real ATS exports where the same
+resume was attached to several applications.
+
+Usage (from the backend directory, with the .env settings available):
+    python benchmarks/bulk_ingest_benchmark.py --resumes 500 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+from starlette.datastructures import UploadFile
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.bulk_ingest import ingest_documents
+from app.extraction import TextExtractor
+from app.matching import MatchingEngine
+from app.skills import SKILLS
+from core.uploads import iter_documents
+
+def make_pdf(pages):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 10 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+def make_archive(resumes: int, pages: int, duplicate_share: float, rng) -> bytes:
+    skills = [name for name in SKILLS if name.isascii() and "(" not in name and ")" not in name]
+    buffer = io.BytesIO()
+    originals = []
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(resumes):
+            if originals and rng.random() < duplicate_share:
+                data = originals[rng.integers(len(originals))]
+            else:
+                lines = [
+                    f"Candidate {i} page {page}: {int(rng.integers(1, 20))} years of experience with "
+                    + ", ".join(rng.choice(skills, 8, replace=False))
+                    for page in range(pages)
+                ]
+                data = make_pdf(lines)
+                originals.append(data)
+            archive.writestr(f"resumes/{i}.pdf", data)
+    return buffer.getvalue()
+
+async def run(args) -> None:
+    rng = np.random.default_rng(7)
+    archive = make_archive(args.resumes, args.pages, args.duplicates, rng)
+    print(f"Archive: {args.resumes} resumes, {len(archive) / 2**20:.1f} MB")
+
+    engine = MatchingEngine()
+    engine.fit(
+        {"existing": "backend developer python java sql"},
+        {"job": "senior python developer django postgresql aws docker kubernetes"}
+    )
+    extractor = TextExtractor(workers=args.workers)
+    try:
+        counts = {}
+        first_event = None
+        start = time.perf_counter()
+        async for event in ingest_documents(
+            iter_documents([UploadFile(io.BytesIO(archive), filename="export.zip")], max_files=args.resumes),
+            lambda data, kind, sha256: extractor.extract(data, kind, sha256),
+            lambda texts: engine.score_texts(texts, job_id="job")
+        ):
+            if first_event is None:
+                first_event = time.perf_counter() - start
+            if event["event"] == "summary":
+                counts = {key: event[key] for key in ("scored", "duplicate", "rejected", "failed")}
+        elapsed = time.perf_counter() - start
+    finally:
+        extractor.shutdown()
+
+    print(f"Workers: {args.workers}   parses: {extractor.parses}   {counts}")
+    print(f"First result after {first_event * 1000:.0f}ms, all done in {elapsed:.1f}s "
+          f"-> {args.resumes / elapsed * 60:.0f} resumes/minute")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of resumes that are exact copies")
+    parser.add_argument("--workers", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
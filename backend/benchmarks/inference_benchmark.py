@@ -0,0 +1,145 @@
+"""
+Benchmark the CPU inference backends against the fp32 baseline.
+
+Each backend is loaded in a fresh process so RSS numbers are not polluted by the
+previous model. Generation is greedy, so any difference from the fp32 output is
+drift introduced by quantization or the ONNX export.
+
+Usage (from the backend directory):
+    python benchmarks/inference_benchmark.py --task summarize
+    python benchmarks/inference_benchmark.py --task generate --model gpt2 --backends cpu-fp32 cpu-int8
+"""
+import argparse
+import difflib
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+SAMPLE_RESUME = """
+Jane Doe - Senior Software Engineer
+Experience: 7 years building distributed systems in Python and Go. Led the migration of a
+monolithic billing platform to Kubernetes on AWS, cutting infrastructure cost by 30%.
+Designed event-driven pipelines with Kafka and PostgreSQL serving 20k requests per second.
+Mentored a team of five engineers and introduced code review and CI/CD practices.
+Education: B.Sc. Computer Science, University of Toronto.
+Skills: Python, Go, Kubernetes, Docker, AWS, Terraform, Kafka, PostgreSQL, Redis, FastAPI.
+"""
+
+SAMPLE_PROMPTS = {
+    "summarize": [SAMPLE_RESUME] * 4,
+    "generate": [
+        "Generate a professional job description for a Backend Engineer position.",
+        "Generate 3 interview questions for a Data Scientist role.",
+        f"Analyze the following resume and list the key skills: {SAMPLE_RESUME}",
+        "Summarize the responsibilities of a DevOps engineer in two sentences.",
+    ],
+}
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    return 0.0
+
+def run_backend(task: str, backend: str, model_name: str, runs: int, max_new_tokens: int, queue) -> None:
+    from app.inference import load_summarizer, load_text_generator
+
+    rss_before = current_rss_mb()
+    load_start = time.perf_counter()
+    if task == "summarize":
+        pipe = load_summarizer(backend)
+        kwargs = {"max_length": 150, "min_length": 50, "do_sample": False}
+        output_key = "summary_text"
+    else:
+        pipe = load_text_generator(model_name, backend)
+        kwargs = {"max_new_tokens": max_new_tokens, "do_sample": False, "return_full_text": False}
+        output_key = "generated_text"
+    load_seconds = time.perf_counter() - load_start
+
+    prompts = SAMPLE_PROMPTS[task]
+    pipe(prompts[0], **kwargs)  # warmup
+
+    latencies = []
+    outputs = []
+    generated_tokens = 0
+    for _ in range(runs):
+        for prompt in prompts:
+            start = time.perf_counter()
+            result = pipe(prompt, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            text = result[0][output_key]
+            generated_tokens += len(pipe.tokenizer(text)["input_ids"])
+            outputs.append(text)
+
+    total_seconds = sum(latencies)
+    ordered = sorted(latencies)
+    queue.put({
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "latency_p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "latency_p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1),
+        "requests_per_second": round(len(latencies) / total_seconds, 3),
+        "tokens_per_second": round(generated_tokens / total_seconds, 1),
+        "rss_mb": round(current_rss_mb() - rss_before, 1),
+        "outputs": outputs[:len(prompts)],
+    })
+
+def drift(baseline: list, candidate: list) -> float:
+    """Mean token-level dissimilarity (0 = identical output) against the baseline"""
+    ratios = [
+        difflib.SequenceMatcher(None, a.split(), b.split()).ratio()
+        for a, b in zip(baseline, candidate)
+    ]
+    return round(1 - statistics.mean(ratios), 4)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--task", choices=["summarize", "generate"], default="summarize")
+    parser.add_argument("--model", default="gpt2", help="Causal LM to use for --task generate")
+    parser.add_argument("--backends", nargs="+", default=["cpu-fp32", "cpu-int8", "onnx"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    backends = args.backends if "cpu-fp32" in args.backends else ["cpu-fp32"] + args.backends
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for backend in backends:
+        queue = ctx.Queue()
+        process = ctx.Process(
+            target=run_backend,
+            args=(args.task, backend, args.model, args.runs, args.max_new_tokens, queue)
+        )
+        process.start()
+        while process.is_alive() and queue.empty():
+            process.join(timeout=0.5)
+        if queue.empty():
+            print(f"{backend}: failed (exit code {process.exitcode})", file=sys.stderr)
+            continue
+        results.append(queue.get())
+        process.join()
+
+    baseline = next((r for r in results if r["backend"] == "cpu-fp32"), None)
+    if baseline is None:
+        sys.exit("The cpu-fp32 baseline failed to run")
+    for result in results:
+        result["drift_vs_fp32"] = drift(baseline["outputs"], result["outputs"])
+        result["speedup_vs_fp32"] = round(result["requests_per_second"] / baseline["requests_per_second"], 2)
+        result.pop("outputs")
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
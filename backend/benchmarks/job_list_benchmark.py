@@ -0,0 +1,74 @@
+"""
+Compare payload size and serialization time of a job list page with full
+documents against the compact list projection (models.job.JOB_LIST_FIELDS).
+
+Documents mimic production jobs: a long description plus an AI-generated one.
+
+Usage (from the backend directory):
+    python benchmarks/job_list_benchmark.py --page-size 100
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from models.job import JOB_LIST_FIELDS
+
+PARAGRAPH = (
+    "We are looking for an engineer to design, build and operate services that process millions "
+    "of requests a day, working closely with product and data teams. "
+)
+
+def make_job(i: int) -> dict:
+    return {
+        "_id": str(ObjectId()),
+        "title": f"Senior Backend Engineer {i}",
+        "company": "Acme Corp",
+        "location": "Remote",
+        "type": "full-time",
+        "status": "open",
+        "description": PARAGRAPH * 20,
+        "ai_generated_description": PARAGRAPH * 30,
+        "requirements": ["Python", "FastAPI", "MongoDB", "AWS", "Docker", "Kubernetes"],
+        "skills": ["AWS", "Docker", "FastAPI", "Kubernetes", "MongoDB", "Python"],
+        "recruiter_id": str(ObjectId()),
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "total_applications": i,
+        "total_interviews": 0,
+    }
+
+def render(page) -> bytes:
+    return JSONResponse(content=jsonable_encoder({"total": len(page), "jobs": page})).body
+
+def measure(page, repeats: int):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        body = render(page)
+    return len(body), (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    full = [make_job(i) for i in range(args.page_size)]
+    compact = [{key: job[key] for key in ("_id",) + JOB_LIST_FIELDS} for job in full]
+
+    full_size, full_ms = measure(full, args.repeats)
+    compact_size, compact_ms = measure(compact, args.repeats)
+    print(f"{'full documents':<20} {full_size / 1024:8.1f} KB   {full_ms:6.2f} ms")
+    print(f"{'list projection':<20} {compact_size / 1024:8.1f} KB   {compact_ms:6.2f} ms")
+    print(f"-> {full_size / compact_size:.1f}x smaller, {full_ms / compact_ms:.1f}x faster to serialize")
+
+if __name__ == "__main__":
+    main()
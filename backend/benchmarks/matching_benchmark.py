@@ -0,0 +1,75 @@
+"""
+Time applicant ranking, incremental appends and snapshot loading for the
+TF-IDF matching index.
+
+Usage (from the backend directory):
+    python benchmarks/matching_benchmark.py --resumes 50000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.matching import MatchingEngine
+
+VOCABULARY = (
+    "python java go rust kubernetes docker aws gcp azure terraform kafka spark sql postgresql "
+    "mongodb redis react angular vue typescript fastapi django flask spring pandas numpy pytorch "
+    "tensorflow airflow linux security networking leadership mentoring agile scrum design figma"
+).split()
+
+def random_document(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50000)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    resumes = {f"c{i}": random_document(rng, 300) for i in range(args.resumes)}
+    jobs = {f"j{i}": random_document(rng, 120) for i in range(args.jobs)}
+
+    engine = MatchingEngine()
+    start = time.perf_counter()
+    engine.fit(resumes, jobs)
+    print(f"fit: {time.perf_counter() - start:.2f}s for {args.resumes} resumes and {args.jobs} jobs")
+
+    timings = []
+    for run in range(args.runs):
+        job_id = f"j{run % args.jobs}"
+        start = time.perf_counter()
+        engine.rank_applicants(job_id=job_id, top_k=args.top_k)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(
+        f"rank {args.resumes} applicants: p50 {timings[len(timings) // 2] * 1000:.1f}ms, "
+        f"p95 {timings[int(0.95 * (len(timings) - 1))] * 1000:.1f}ms"
+    )
+
+    start = time.perf_counter()
+    for i in range(1000):
+        engine.add_resume(f"new{i}", random_document(rng, 300))
+    print(f"append: {(time.perf_counter() - start):.3f}ms per resume")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        compacted = MatchingEngine.compacted(engine.resumes.frozen(), engine.jobs.frozen(), None)
+        print(f"compact: {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        compacted.save_snapshot(Path(directory))
+        print(f"save snapshot: {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        MatchingEngine.load_snapshot(Path(directory))
+        print(f"load snapshot (memory-mapped): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
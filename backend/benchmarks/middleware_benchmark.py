@@ -0,0 +1,162 @@
+"""
+Measure the per-layer overhead of the middleware stack in main.py on
+/api/health: requests/sec as each layer is added, with rate limiting, request
+logging and error handling written as @app.middleware("http") functions
+(BaseHTTPMiddleware, as before) and as pure ASGI middleware (core.middleware).
+
+Requests are driven straight through the ASGI app in-process, so only the
+framework and middleware cost is measured. The rate limiter always allows (no
+Redis round trip) and request log records are dropped by level.
+
+Usage (from the backend directory):
+    python benchmarks/middleware_benchmark.py --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from core.logging import log_request, setup_logger
+from core.middleware import ErrorHandlingMiddleware, RateLimitMiddleware, RequestLoggingMiddleware
+from core.rate_limit import RateLimiter
+from core.uploads import BodySizeLimitMiddleware
+
+class AllowingLimiter(RateLimiter):
+    def _check_rate_limit(self, key):
+        return True, None
+
+limiter = AllowingLimiter(key_prefix="benchmark")
+
+def add_cors(app):
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+
+def add_gzip(app):
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+def add_trusted_host(app):
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
+
+def add_body_limit(app):
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=10 * 2**20, path_limits={r"/bulk-ingest$": 200 * 2**20})
+
+def add_decorator_rate_limit(app):
+    app.middleware("http")(limiter)
+
+def add_decorator_logging(app):
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start_time = time.time()
+        try:
+            response = await call_next(request)
+            response.response_time = time.time() - start_time
+            log_request(request, response)
+            return response
+        except Exception as e:
+            log_request(request, error=e)
+            raise
+
+def add_decorator_errors(app):
+    @app.middleware("http")
+    async def error_handling(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as e:
+            logging.getLogger("main").error("Unhandled exception", extra={"stack_trace": traceback.format_exc()})
+            return JSONResponse(status_code=500, content={"error": "Internal server error"})
+
+SHARED_LAYERS = [
+    ("CORS", add_cors),
+    ("GZip", add_gzip),
+    ("TrustedHost", add_trusted_host),
+    ("BodySizeLimit", add_body_limit),
+]
+STACKS = {
+    "decorator": [
+        ("rate limit", add_decorator_rate_limit),
+        ("request logging", add_decorator_logging),
+        ("error handling", add_decorator_errors),
+    ],
+    "ASGI": [
+        ("rate limit", lambda app: app.add_middleware(RateLimitMiddleware, limiter=limiter)),
+        ("request logging", lambda app: app.add_middleware(RequestLoggingMiddleware)),
+        ("error handling", lambda app: app.add_middleware(ErrorHandlingMiddleware)),
+    ],
+}
+
+def make_app(layers) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    for _, add in layers:
+        add(app)
+    return app
+
+async def requests_per_second(app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/health", "raw_path": b"/api/health", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"origin", b"http://localhost:3000"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000),
+    }
+
+    async def send(message):
+        pass
+
+    async def request():
+        # Like a server: the (empty) body once, then nothing until the client disconnects
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        await app(dict(scope), receive, send)
+
+    for _ in range(100):
+        await request()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request()
+    return requests / (time.perf_counter() - start)
+
+async def run(args) -> None:
+    setup_logger("http").setLevel(logging.WARNING)
+    base = await requests_per_second(make_app([]), args.requests)
+    print(f"{'no middleware':<34} {base:9.0f} req/s")
+    for style, layers in STACKS.items():
+        print(f"\n{style} stack")
+        previous = base
+        stack = []
+        for name, add in SHARED_LAYERS + layers:
+            stack.append((name, add))
+            rate = await requests_per_second(make_app(stack), args.requests)
+            overhead = (1 / rate - 1 / previous) * 1e6
+            print(f"  + {name:<30} {rate:9.0f} req/s   {overhead:+7.1f} us/request")
+            previous = rate
+        print(f"  full stack: {rate / base * 100:.0f}% of bare throughput")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare rendering a 100-row page of Mongo documents the old way (ObjectIds
+converted in a loop, then jsonable_encoder and the stdlib JSONResponse) with
+core.responses.MongoJSONResponse serializing the raw documents with orjson.
+
+Usage (from the backend directory):
+    python benchmarks/serialization_benchmark.py --page-size 100
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from core.responses import MongoJSONResponse
+from models.job import JOB_LIST_FIELDS
+
+def make_application(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "job_id": ObjectId(),
+        "candidate_id": ObjectId(),
+        "status": "pending",
+        "match_score": 71.5 + i % 20,
+        "skills": ["AWS", "Docker", "FastAPI", "Kubernetes", "MongoDB", "Python"],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+        "job": {
+            "title": f"Senior Backend Engineer {i}",
+            "company": "Acme Corp",
+            "location": "Remote",
+            "type": "full-time",
+        },
+    }
+
+def make_job(i: int) -> dict:
+    job = {
+        "_id": ObjectId(),
+        "title": f"Senior Backend Engineer {i}",
+        "company": "Acme Corp",
+        "location": "Remote",
+        "type": "full-time",
+        "status": "open",
+        "skills": ["AWS", "Docker", "FastAPI", "Kubernetes", "MongoDB", "Python"],
+        "created_at": datetime.utcnow(),
+    }
+    return {key: job[key] for key in ("_id",) + JOB_LIST_FIELDS}
+
+def render_before(page) -> bytes:
+    for document in page:
+        for key in ("_id", "job_id", "candidate_id"):
+            if key in document:
+                document[key] = str(document[key])
+    return JSONResponse(content=jsonable_encoder(page)).body
+
+def render_after(page) -> bytes:
+    return MongoJSONResponse(page).body
+
+def measure(make, page_size: int, render, repeats: int):
+    # Fresh pages every round, as each request gets new documents from Mongo
+    pages = [[make(i) for i in range(page_size)] for _ in range(repeats)]
+    start = time.perf_counter()
+    for page in pages:
+        body = render(page)
+    return len(body), (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, make in (("applications", make_application), ("job list", make_job)):
+        before_size, before_ms = measure(make, args.page_size, render_before, args.repeats)
+        after_size, after_ms = measure(make, args.page_size, render_after, args.repeats)
+        print(f"{name:<14} jsonable_encoder {before_ms:6.2f} ms ({before_size / 1024:.1f} KB)   "
+              f"orjson {after_ms:6.2f} ms ({after_size / 1024:.1f} KB)   -> {before_ms / after_ms:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
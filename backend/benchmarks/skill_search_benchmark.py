@@ -0,0 +1,68 @@
+"""
+Time boolean skill queries against the bitmap skill index.
+
+Candidates get random skill sets drawn with a skewed popularity (a few skills
+are very common, most are rare), which is what makes OR/NOT queries expensive
+for posting-list merges.
+
+Usage (from the backend directory):
+    python benchmarks/skill_search_benchmark.py --candidates 500000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.skill_search import SkillIndex
+from app.skills import SKILLS
+
+QUERIES = [
+    "python",
+    "python AND django",
+    "python AND (django OR flask OR fastapi) AND NOT php",
+    "(java OR kotlin) AND spring boot AND docker",
+    "NOT javascript",
+    "machine learning AND (pytorch OR tensorflow) AND aws",
+]
+
+def percentile(timings, q):
+    timings = sorted(timings)
+    return timings[int(q * (len(timings) - 1))] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=500000)
+    parser.add_argument("--skills-per-candidate", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    skills = np.array(list(SKILLS))
+    popularity = 1.0 / np.arange(1, len(skills) + 1)
+    popularity /= popularity.sum()
+
+    index = SkillIndex()
+    start = time.perf_counter()
+    for i in range(args.candidates):
+        chosen = rng.choice(len(skills), args.skills_per_candidate, replace=False, p=popularity)
+        index.upsert(f"c{i}", skills[chosen].tolist(), float(rng.integers(0, 25)))
+    print(f"Indexed {args.candidates} candidates in {time.perf_counter() - start:.1f}s "
+          f"({sum(b.nbytes for b in index.postings.values()) / 2**20:.1f} MB of bitmaps)\n")
+
+    for query in QUERIES:
+        for min_experience in (None, 5.0):
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                total, _ = index.search(query, min_experience=min_experience, top_k=20)
+                timings.append(time.perf_counter() - start)
+            label = query if min_experience is None else f"{query} [>= 5 years]"
+            print(f"{label:<70} {total:>8} hits   p50 {percentile(timings, 0.5):7.2f}ms   p95 {percentile(timings, 0.95):7.2f}ms")
+
+if __name__ == "__main__":
+    main()
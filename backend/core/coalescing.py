@@ -0,0 +1,58 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from prometheus_client import Counter
+from core.config import settings
+from core.logging import setup_logger
+
+logger = setup_logger("coalescing")
+
+coalesced_fetches_total = Counter(
+    "coalesced_fetches_total",
+    "Backend fetches run by the request coalescer",
+    ["route"]
+)
+
+coalesced_requests_total = Counter(
+    "coalesced_requests_total",
+    "Requests answered by joining an identical fetch already in flight",
+    ["route"]
+)
+
+class RequestCoalescer:
+    """
+    Single-flight: identical concurrent requests (same route and parameters)
+    share one in-flight backend fetch instead of each running it.
+
+    The fetch runs in its own task, so a caller that disconnects does not
+    cancel it for the others; its result or exception is returned to every
+    caller. Results are shared, so callers must treat them as read-only.
+    Nothing is kept once the fetch completes: a later request fetches again.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def run(self, route: str, params: Dict[str, Any], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fetch()
+
+        key = (route, json.dumps(params, sort_keys=True, default=str))
+        task = self.in_flight.get(key)
+        if task is not None:
+            coalesced_requests_total.labels(route=route).inc()
+        else:
+            coalesced_fetches_total.labels(route=route).inc()
+            task = asyncio.ensure_future(fetch())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here too, in case every caller went away
+            logger.debug(f"Coalesced fetch for {key[0]} failed: {task.exception()!r}")
+
+coalescer = RequestCoalescer(settings.REQUEST_COALESCING_ENABLED)
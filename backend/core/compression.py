@@ -0,0 +1,183 @@
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Most preferred first; used to break ties between equally weighted encodings
+ENCODINGS = ("br", "zstd", "gzip")
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml")
+
+def compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
+
+def available_encodings():
+    return tuple(
+        encoding for encoding in ENCODINGS
+        if encoding == "gzip" or (encoding == "br" and brotli) or (encoding == "zstd" and zstandard)
+    )
+
+class StreamCompressor:
+    """
+    Incremental compressor for streamed bodies; every chunk is flushed so the
+    client can decode it as soon as it arrives (e.g. NDJSON progress events)
+    """
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        if self.encoding == "zstd":
+            return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+class Compressor:
+    """
+    Negotiates a content coding from Accept-Encoding and compresses with it
+    at the level configured for that coding
+    """
+    def __init__(self, levels: Dict[str, int], min_size: int = 1000):
+        encodings = available_encodings()
+        self.levels = {encoding: levels[encoding] for encoding in encodings if encoding in levels}
+        self.min_size = min_size
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """The supported coding with the highest q-value (None for identity)"""
+        if not accept_encoding:
+            return None
+        weights = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            weights[name.strip().lower()] = q
+
+        best, best_q = None, 0.0
+        for encoding in self.levels:
+            q = weights.get(encoding, weights.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        level = self.levels[encoding]
+        if encoding == "br":
+            return brotli.compress(data, quality=level)
+        if encoding == "zstd":
+            return zstandard.ZstdCompressor(level=level).compress(data)
+        stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return stream.compress(data) + stream.flush()
+
+    def compressobj(self, encoding: str) -> StreamCompressor:
+        return StreamCompressor(encoding, self.levels[encoding])
+
+class CompressionMiddleware:
+    """
+    Compress text and JSON responses with the coding the client prefers.
+
+    Responses that already carry a Content-Encoding (e.g. variants served
+    from core.http_cache) and bodies under the minimum size are passed
+    through; streamed bodies are compressed chunk by chunk.
+    """
+    def __init__(self, app: ASGIApp, compressor: Compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.compressor.negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        stream: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if (
+                    "content-encoding" in headers
+                    or start["status"] in (204, 304)
+                    or not compressible(headers.get("content-type"))
+                    or (not more_body and len(body) < self.compressor.min_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    body = self.compressor.compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                stream = self.compressor.compressobj(encoding)
+                await send(start)
+
+            body = stream.compress(body)
+            if not more_body:
+                body += stream.finish()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+# Per-response levels trade density for latency; cached variants are
+# compressed once per cache version, so they use the densest levels
+response_compressor = Compressor({
+    "br": settings.COMPRESSION_BROTLI_LEVEL,
+    "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+    "gzip": settings.COMPRESSION_GZIP_LEVEL,
+}, settings.COMPRESSION_MIN_SIZE)
+cached_compressor = Compressor({
+    "br": settings.COMPRESSION_CACHED_BROTLI_LEVEL,
+    "zstd": settings.COMPRESSION_CACHED_ZSTD_LEVEL,
+    "gzip": settings.COMPRESSION_CACHED_GZIP_LEVEL,
+}, settings.COMPRESSION_MIN_SIZE)
@@ -55,7 +55,74 @@ class Settings(BaseSettings):
     HF_MODEL: str = ""
     OLLAMA_MODEL: str = ""
     USE_OLLAMA_AS_BACKUP: bool = False
-    
+
+    # AI Hedging (race Ollama against Hugging Face instead of waiting for a failure)
+    AI_HEDGING_ENABLED: bool = False
+    AI_HEDGE_PERCENTILE: float = 95.0
+    AI_HEDGE_WINDOW_SIZE: int = 200
+    AI_HEDGE_BUDGETS: dict = {
+        # Delays and timeout in seconds; endpoints not listed use "default"
+        "default": {"min_delay": 0.5, "max_delay": 10.0, "timeout": 60.0},
+        "job_description": {"min_delay": 1.0, "max_delay": 8.0, "timeout": 45.0},
+        "resume_analysis": {"min_delay": 1.0, "max_delay": 8.0, "timeout": 45.0},
+        "interview_questions": {"min_delay": 2.0, "max_delay": 15.0, "timeout": 90.0},
+    }
+
+    # Uploads
+    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # bytes per file; larger request bodies are rejected early
+    BULK_UPLOAD_MAX_SIZE: int = 200 * 1024 * 1024  # whole request, for bulk resume ingestion
+    BULK_MAX_FILES: int = 1000
+    BULK_PARSE_WINDOW: int = 16  # documents parsed at once; the upload is not read further ahead
+    BULK_SCORE_BATCH: int = 32  # parsed resumes scored per sparse matrix product
+    UPLOAD_DIR: str = "uploads"  # root of the local storage backend
+    STORAGE_BACKEND: str = "local"  # "local" or "s3" (AWS_BUCKET_NAME)
+    AWS_S3_ENDPOINT_URL: str = ""  # S3-compatible endpoint (MinIO, LocalStack); empty for AWS
+    STORAGE_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024
+    STORAGE_MAX_CONCURRENCY: int = 4  # multipart parts in flight per upload
+    PRESIGNED_URL_EXPIRY: int = 3600  # seconds; download links are reused until a quarter of this is left
+
+    # Resume/job matching
+    MATCHING_INDEX_DIR: str = "matching_index"  # memory-mapped snapshots shared by workers
+    MATCHING_COMPACTION_INTERVAL: int = 900  # seconds between IDF re-estimation/compaction
+    MATCHING_RECONCILE_INTERVAL: int = 86400  # seconds between scans for documents deleted outside the app
+    EMBEDDING_INDEX_DIR: str = "embedding_index"  # cached resume/job sentence embeddings
+    SKILL_INDEX_SYNC_INTERVAL: float = 5.0  # seconds between skill index syncs in each process
+    EMBEDDING_ENABLED: bool = True  # semantic (sentence-embedding) matching alongside TF-IDF
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "cpu-fp32"  # see app.inference.INFERENCE_BACKENDS
+    EMBEDDING_INDEX: str = "ivf"  # "brute", "ivf" or "hnsw"
+    RECOMMENDATIONS_PER_CANDIDATE: int = 20  # length of each candidate's precomputed feed
+    RECOMMENDATIONS_JOB_FANOUT: int = 1000  # best-matching candidates a new or updated job is offered to
+    DUPLICATE_THRESHOLD: float = 0.85  # estimated Jaccard similarity at which two resumes are the same document
+
+    # Resume text extraction
+    EXTRACTION_WORKERS: int = min(4, os.cpu_count() or 1)  # parser processes; 0 parses in the thread pool
+    EXTRACTION_PARALLEL_PDF_PAGES: int = 16  # longer PDFs are split across workers by page range
+    EXTRACTION_CACHE_CHARS: int = 50_000_000  # extracted text kept in process memory
+
+    # Background AI task queue ("mongo" or "memory")
+    TASK_QUEUE_BACKEND: str = "mongo"
+    TASK_MAX_ATTEMPTS: int = 3
+    TASK_RETRY_BASE_DELAY: int = 5  # seconds, doubled on every retry
+    TASK_LEASE_SECONDS: int = 600
+    TASK_RESULT_TTL_SECONDS: int = 86400
+    TASK_POLL_INTERVAL: float = 1.0
+
+    # Shared response cache for read-mostly endpoints ("redis" or "memory")
+    HTTP_CACHE_BACKEND: str = "redis"
+    HTTP_CACHE_TTL: int = 300  # seconds an entry is kept without writes
+    HTTP_CACHE_MAX_AGE: int = 30  # Cache-Control max-age for clients and proxies
+    REQUEST_COALESCING_ENABLED: bool = True  # identical concurrent reads share one backend fetch
+
+    # Response compression, negotiated per request (br, zstd or gzip)
+    COMPRESSION_MIN_SIZE: int = 1000  # bytes; smaller bodies are sent as is
+    COMPRESSION_BROTLI_LEVEL: int = 4  # 0-11, for bodies compressed on every response
+    COMPRESSION_ZSTD_LEVEL: int = 3  # 1-22
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_CACHED_BROTLI_LEVEL: int = 10  # cached variants are compressed once per version
+    COMPRESSION_CACHED_ZSTD_LEVEL: int = 15
+    COMPRESSION_CACHED_GZIP_LEVEL: int = 9
+
     # Email
     SMTP_HOST: str
     SMTP_PORT: int
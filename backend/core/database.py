@@ -0,0 +1,22 @@
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from core.config import settings
+
+_client: Optional[AsyncIOMotorClient] = None
+
+def shared_database():
+    """
+    Process-wide database handle, for work that may outlive the request that
+    started it (e.g. a coalesced fetch other requests are waiting on), unlike
+    the per-request clients the routers' dependencies close when they return.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(settings.MONGODB_URL)
+    return _client[settings.MONGODB_DB_NAME]
+
+def close_shared_database() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from core.config import settings
+from core.logging import setup_logger
+
+logger = setup_logger("hedging")
+
+Backend = Callable[[], Awaitable[Any]]
+
+class LatencyTracker:
+    """Rolling window of successful backend latencies"""
+    def __init__(self, window_size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window_size)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile of the window, or None if it is empty"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+# One tracker per (endpoint, backend) pair
+_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+
+def get_tracker(endpoint: str, backend: str) -> LatencyTracker:
+    key = (endpoint, backend)
+    if key not in _trackers:
+        _trackers[key] = LatencyTracker(settings.AI_HEDGE_WINDOW_SIZE)
+    return _trackers[key]
+
+def get_budget(endpoint: str) -> Dict[str, float]:
+    """Return the hedging budget for an endpoint, falling back to the default budget"""
+    budgets = settings.AI_HEDGE_BUDGETS
+    budget = dict(budgets.get("default", {}))
+    budget.update(budgets.get(endpoint, {}))
+    return budget
+
+def get_hedge_delay(endpoint: str, backend: str) -> float:
+    """Derive how long to wait for the primary backend before launching the secondary"""
+    budget = get_budget(endpoint)
+    p95 = get_tracker(endpoint, backend).percentile(settings.AI_HEDGE_PERCENTILE)
+    if p95 is None:
+        return budget["max_delay"]
+    return min(max(p95, budget["min_delay"]), budget["max_delay"])
+
+async def _timed_call(endpoint: str, name: str, backend: Backend) -> Any:
+    start_time = time.monotonic()
+    result = await backend()
+    if result:
+        get_tracker(endpoint, name).record(time.monotonic() - start_time)
+    return result
+
+async def _sequential_call(
+    endpoint: str,
+    primary: Backend,
+    secondary: Backend,
+    primary_name: str,
+    secondary_name: str
+) -> Any:
+    result = await _timed_call(endpoint, primary_name, primary)
+    if result:
+        return result
+    return await _timed_call(endpoint, secondary_name, secondary)
+
+async def _race(
+    endpoint: str,
+    primary: Backend,
+    secondary: Backend,
+    primary_name: str,
+    secondary_name: str
+) -> Any:
+    delay = get_hedge_delay(endpoint, primary_name)
+    pending = {asyncio.ensure_future(_timed_call(endpoint, primary_name, primary))}
+
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        for task in done:
+            if not task.exception() and task.result():
+                return task.result()
+
+        # Primary is slow or has already failed: hedge with the secondary backend
+        pending.add(asyncio.ensure_future(_timed_call(endpoint, secondary_name, secondary)))
+        logger.info(
+            "Launching hedged request",
+            extra={"endpoint": endpoint, "backend": secondary_name, "delay": delay}
+        )
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.exception() and task.result():
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def hedged_call(
+    endpoint: str,
+    primary: Backend,
+    secondary: Backend,
+    primary_name: str = "ollama",
+    secondary_name: str = "huggingface"
+) -> Any:
+    """
+    Call two interchangeable AI backends and return the first usable (truthy) result.
+
+    With hedging disabled the secondary backend is only tried after the primary fails.
+    With hedging enabled the secondary is launched once the primary has been running
+    longer than its observed p95 latency, the first usable answer wins and the loser
+    is cancelled. Returns None if neither backend answers within the endpoint timeout.
+    """
+    budget = get_budget(endpoint)
+    if settings.AI_HEDGING_ENABLED:
+        call = _race(endpoint, primary, secondary, primary_name, secondary_name)
+    else:
+        call = _sequential_call(endpoint, primary, secondary, primary_name, secondary_name)
+
+    try:
+        return await asyncio.wait_for(call, timeout=budget["timeout"])
+    except asyncio.TimeoutError:
+        logger.warning(f"AI backends timed out for {endpoint} after {budget['timeout']}s")
+        return None
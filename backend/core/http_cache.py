@@ -0,0 +1,280 @@
+import hashlib
+import json
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import orjson
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from core.compression import Compressor, cached_compressor
+from core.config import settings
+from core.logging import setup_logger
+from core.responses import MongoJSONResponse, dumps
+
+logger = setup_logger("http_cache")
+
+def random_epoch() -> int:
+    """
+    Starting version for a namespace. Random rather than 0, so versions (and
+    the ETags made from them) are not reissued after a Redis flush or
+    restart, nor shared by workers that each keep their own counters.
+    """
+    # 48 bits leaves ample room below 2^63 for INCR
+    return secrets.randbits(48)
+
+class CacheBackend:
+    """
+    Shared store for cached response bodies and per-namespace version counters.
+
+    Entries carry the version they were built at; bumping a namespace's
+    version invalidates all of its entries at once without deleting them.
+    Versions start from a random epoch (see `random_epoch`).
+    """
+    async def lookup(self, namespace: str, key: str) -> Tuple[int, Optional[bytes]]:
+        """The namespace's current version and the raw entry for `key`, in one round trip"""
+        raise NotImplementedError
+
+    async def store(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def bump(self, namespace: str) -> int:
+        raise NotImplementedError
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process cache for development and tests; LRU-bounded"""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.versions: Dict[str, int] = {}
+        self.entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+
+    async def lookup(self, namespace: str, key: str) -> Tuple[int, Optional[bytes]]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self.entries[key]
+            entry = None
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return self._version(namespace), entry[0] if entry else None
+
+    def _version(self, namespace: str) -> int:
+        if namespace not in self.versions:
+            self.versions[namespace] = random_epoch()
+        return self.versions[namespace]
+
+    async def store(self, key: str, value: bytes, ttl: int) -> None:
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def bump(self, namespace: str) -> int:
+        self.versions[namespace] = self._version(namespace) + 1
+        return self.versions[namespace]
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by all workers; one MGET per lookup"""
+    def __init__(self, client, prefix: str = "http_cache"):
+        self.client = client
+        self.prefix = prefix
+
+    async def lookup(self, namespace: str, key: str) -> Tuple[int, Optional[bytes]]:
+        version, entry = await self.client.mget(f"{self.prefix}:version:{namespace}", f"{self.prefix}:entry:{key}")
+        if version is None:
+            # First use, or the counter was lost: entries built before are stale either way
+            return await self._seed(namespace), None
+        return int(version), entry
+
+    async def store(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(f"{self.prefix}:entry:{key}", value, ex=ttl)
+
+    async def bump(self, namespace: str) -> int:
+        await self._seed(namespace)
+        return await self.client.incr(f"{self.prefix}:version:{namespace}")
+
+    async def _seed(self, namespace: str) -> int:
+        """Start the namespace at a random epoch unless another worker already has"""
+        version_key = f"{self.prefix}:version:{namespace}"
+        await self.client.set(version_key, random_epoch(), nx=True)
+        return int(await self.client.get(version_key))
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Key for a response: unset parameters are dropped and the rest sorted"""
+    normalized = {
+        name: value.strip() if isinstance(value, str) else value
+        for name, value in params.items()
+        if value is not None
+    }
+    encoded = json.dumps(normalized, sort_keys=True, default=str)
+    return f"{namespace}:{hashlib.blake2b(encoded.encode('utf-8'), digest_size=12).hexdigest()}"
+
+def make_etag(key: str, version: int, encoding: Optional[str] = None) -> str:
+    """Each content coding of a response is a separate representation with its own tag"""
+    namespace, digest = key.split(":", 1)
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{namespace}-{version}-{digest}{suffix}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison, so W/ prefixes are ignored. "*" is
+    never a match: a client sending it has no copy a 304 could refer to.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+def _current_entry(entry: Optional[bytes], version: int) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    The body of an entry built at `version` and its content coding (None for
+    identity); older entries are stale
+    """
+    if entry is None:
+        return None, None
+    header, body = entry.split(b"\n", 1)
+    entry_version, _, encoding = header.decode().partition(" ")
+    if int(entry_version) != version:
+        return None, None
+    return body, encoding or None
+
+def _current_body(entry: Optional[bytes], version: int) -> Optional[bytes]:
+    return _current_entry(entry, version)[0]
+
+class ResponseCache:
+    """
+    Cache JSON responses of read-mostly endpoints by namespace and parameters.
+
+    ETags are derived from the namespace version, so a conditional request is
+    answered with 304 from a single cache lookup and a hit never reaches the
+    database. Writers call `invalidate(namespace)` after committing. If the
+    cache is unavailable, responses are built uncached.
+
+    With a `compressor`, the body is also cached compressed in the coding
+    each client negotiates, so repeated hits are served without compressing
+    (and skip the compression middleware, which passes encoded bodies on).
+    """
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: int = 300,
+        max_age: int = 30,
+        compressor: Optional[Compressor] = None
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_age = max_age
+        self.compressor = compressor
+
+    async def respond(
+        self,
+        request: Request,
+        namespace: str,
+        params: Dict[str, Any],
+        build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        key = cache_key(namespace, params)
+        encoding = self.compressor.negotiate(request.headers.get("accept-encoding")) if self.compressor else None
+        # The variant for the negotiated coding is looked up first: one round trip on a hit
+        entry_key = f"{key}:{encoding}" if encoding else key
+        try:
+            version, entry = await self.backend.lookup(namespace, entry_key)
+        except Exception as e:
+            logger.error(f"Response cache lookup failed: {str(e)}")
+            return MongoJSONResponse(content=await build())
+
+        headers = {
+            "ETag": make_etag(key, version, encoding),
+            "Cache-Control": f"public, max-age={self.max_age}",
+        }
+        if self.compressor:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        body, body_encoding = _current_entry(entry, version)
+        if body is not None:
+            return self._response(body, body_encoding, headers, "HIT")
+
+        cache_status = "HIT"
+        if encoding:
+            body = await self._lookup_body(namespace, key, version)
+        if body is None:
+            cache_status = "MISS"
+            body = dumps(await build())
+            await self._store(key, version, body)
+        if encoding:
+            # Bodies under the minimum size are stored as is under the variant key too
+            body_encoding = None
+            if len(body) >= self.compressor.min_size:
+                body = await run_in_threadpool(self.compressor.compress, body, encoding)
+                body_encoding = encoding
+            await self._store(entry_key, version, body, body_encoding)
+        return self._response(body, body_encoding, headers, cache_status)
+
+    def _response(self, body: bytes, encoding: Optional[str], headers: Dict[str, str], cache_status: str) -> Response:
+        headers = {**headers, "X-Cache": cache_status}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def _lookup_body(self, namespace: str, key: str, version: int) -> Optional[bytes]:
+        try:
+            _, entry = await self.backend.lookup(namespace, key)
+        except Exception as e:
+            logger.error(f"Response cache lookup failed: {str(e)}")
+            return None
+        return _current_body(entry, version)
+
+    async def get_value(self, namespace: str, params: Dict[str, Any]) -> Tuple[Optional[int], Any]:
+        """
+        A JSON value cached with `set_value` (None if absent or stale) and the
+        namespace version to store a fresh one under. The version is None when
+        the cache is unavailable.
+        """
+        try:
+            version, entry = await self.backend.lookup(namespace, cache_key(namespace, params))
+        except Exception as e:
+            logger.error(f"Response cache lookup failed: {str(e)}")
+            return None, None
+        body = _current_body(entry, version)
+        return version, orjson.loads(body) if body is not None else None
+
+    async def set_value(self, namespace: str, params: Dict[str, Any], version: Optional[int], value: Any) -> None:
+        if version is not None:
+            await self._store(cache_key(namespace, params), version, dumps(value))
+
+    async def _store(self, key: str, version: int, body: bytes, encoding: Optional[str] = None) -> None:
+        header = f"{version} {encoding}" if encoding else str(version)
+        try:
+            await self.backend.store(key, header.encode() + b"\n" + body, self.ttl)
+        except Exception as e:
+            logger.error(f"Response cache store failed: {str(e)}")
+
+    async def invalidate(self, namespace: str) -> None:
+        try:
+            await self.backend.bump(namespace)
+        except Exception as e:
+            # Entries then expire after the TTL
+            logger.error(f"Response cache invalidation of {namespace} failed: {str(e)}")
+
+def create_cache_backend() -> CacheBackend:
+    """Build the backend selected by HTTP_CACHE_BACKEND ("redis" or "memory")"""
+    if settings.HTTP_CACHE_BACKEND == "memory":
+        return InMemoryCacheBackend()
+    import redis.asyncio
+    return RedisCacheBackend(redis.asyncio.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD or None,
+        db=settings.REDIS_DB
+    ))
+
+response_cache = ResponseCache(
+    create_cache_backend(),
+    settings.HTTP_CACHE_TTL,
+    settings.HTTP_CACHE_MAX_AGE,
+    cached_compressor
+)
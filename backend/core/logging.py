@@ -1,7 +1,7 @@
 import logging
 import json
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from pathlib import Path
 import traceback
 from fastapi import Request
@@ -67,7 +67,13 @@ class JSONFormatter(logging.Formatter):
         
         return json.dumps(log_data)
 
-def log_request(request: Request, response: Any = None, error: Exception = None) -> None:
+def log_request(
+    request: Request,
+    response: Any = None,
+    error: Exception = None,
+    status_code: Optional[int] = None,
+    response_time: Optional[float] = None
+) -> None:
     """Log HTTP request details"""
     logger = setup_logger("http")
     
@@ -81,6 +87,10 @@ def log_request(request: Request, response: Any = None, error: Exception = None)
     if response:
         log_data["status_code"] = getattr(response, "status_code", None)
         log_data["response_time"] = getattr(response, "response_time", None)
+    if status_code is not None:
+        log_data["status_code"] = status_code
+    if response_time is not None:
+        log_data["response_time"] = response_time
     
     if error:
         log_data["error"] = {
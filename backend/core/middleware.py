@@ -0,0 +1,99 @@
+import time
+import traceback
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.logging import log_request, setup_logger
+from core.rate_limit import RateLimiter
+
+logger = setup_logger("middleware")
+
+# Pure ASGI middleware: unlike @app.middleware("http") (BaseHTTPMiddleware),
+# they call the next app directly instead of running it in a separate task and
+# re-wrapping the response body in a stream, so streaming responses pass
+# through untouched and each layer costs a function call.
+
+class RateLimitMiddleware:
+    """Answer requests over `limiter`'s limit with 429 before they reach the app"""
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response = self.limiter.check(Request(scope))
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+class RequestLoggingMiddleware:
+    """Log every request with its status and the time until the last body chunk was sent"""
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            log_request(Request(scope), error=e, response_time=time.perf_counter() - start_time)
+            raise
+        log_request(Request(scope), status_code=status_code, response_time=time.perf_counter() - start_time)
+
+class ErrorHandlingMiddleware:
+    """
+    Turn unhandled exceptions into a JSON 500. If the response had already
+    started (e.g. a failing stream) nothing more can be sent, so the
+    exception is re-raised for the server to close the connection.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as e:
+            logger.error(
+                "Unhandled exception",
+                extra={
+                    "error": str(e),
+                    "stack_trace": traceback.format_exc(),
+                    "path": scope["path"],
+                    "method": scope["method"],
+                }
+            )
+            if response_started:
+                raise
+            response = JSONResponse(
+                status_code=500,
+                content={"error": "Internal server error"}
+            )
+            await response(scope, receive, send)
@@ -0,0 +1,21 @@
+from typing import Dict, Iterable, Optional
+from fastapi import HTTPException, status
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], default: Iterable[str]) -> Dict[str, int]:
+    """
+    Mongo projection for a comma-separated sparse fieldset (`?fields=title,description`).
+
+    No `fields` gives the `default` fieldset; names outside `allowed` are a 400.
+    The id is always returned.
+    """
+    allowed = tuple(allowed)
+    requested = [name.strip() for name in (fields or "").split(",") if name.strip() and name.strip() not in ("id", "_id")]
+    if not requested:
+        requested = list(default)
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed)}"
+        )
+    return {name: 1 for name in sorted(set(requested))}
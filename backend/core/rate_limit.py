@@ -61,41 +61,44 @@ class RateLimiter:
 
         return True, None
 
-    async def __call__(self, request: Request, call_next: Callable):
-        """Rate limiting middleware"""
+    def check(self, request: Request) -> Optional[JSONResponse]:
+        """The 429 response if `request` is over the limit, else None"""
         try:
             key = self._get_key(request)
             allowed, reset_time = self._check_rate_limit(key)
-
-            if not allowed:
-                logger.warning(
-                    "Rate limit exceeded",
-                    extra={
-                        "ip": request.client.host,
-                        "path": request.url.path,
-                        "reset_time": reset_time
-                    }
-                )
-                return JSONResponse(
-                    status_code=429,
-                    content={
-                        "error": "Too many requests",
-                        "retry_after": int(reset_time) if reset_time else None
-                    }
-                )
-
-            response = await call_next(request)
-            return response
-
         except redis.RedisError as e:
             logger.error(f"Redis error in rate limiter: {str(e)}")
             # On Redis error, allow the request but log the error
-            return await call_next(request)
-
+            return None
         except Exception as e:
             logger.error(f"Rate limiter error: {str(e)}")
             # On other errors, allow the request but log the error
-            return await call_next(request)
+            return None
+
+        if allowed:
+            return None
+        logger.warning(
+            "Rate limit exceeded",
+            extra={
+                "ip": request.client.host,
+                "path": request.url.path,
+                "reset_time": reset_time
+            }
+        )
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": "Too many requests",
+                "retry_after": int(reset_time) if reset_time else None
+            }
+        )
+
+    async def __call__(self, request: Request, call_next: Callable):
+        """Rate limiting middleware (see core.middleware.RateLimitMiddleware for the ASGI one)"""
+        response = self.check(request)
+        if response is not None:
+            return response
+        return await call_next(request)
 
 # Create rate limiter instances for different endpoints
 default_limiter = RateLimiter(
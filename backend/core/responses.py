@@ -0,0 +1,44 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.encoders import ENCODERS_BY_TYPE, jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# datetimes, UUIDs, dataclasses and numpy arrays are handled natively by orjson
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def bson_default(obj: Any) -> Any:
+    """Encode the BSON types Mongo documents carry that orjson does not know"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return jsonable_encoder(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize documents straight from Mongo, ObjectIds and datetimes included"""
+    return orjson.dumps(content, default=bson_default, option=ORJSON_OPTIONS)
+
+class MongoJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Handlers can return one directly with raw documents (or bytes already
+    serialized, e.g. from a cache) to skip FastAPI's jsonable_encoder pass,
+    which walks and copies every value before rendering.
+    """
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
+
+# Handlers that still go through jsonable_encoder get ObjectIds as strings too
+ENCODERS_BY_TYPE.setdefault(ObjectId, str)
@@ -0,0 +1,318 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from core.logging import setup_logger
+
+logger = setup_logger("storage")
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+class ObjectNotFound(FileNotFoundError):
+    """The requested key does not exist in the storage backend"""
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+
+async def iterate_bytes(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+class StorageBackend:
+    """Object storage for uploaded files, addressed by slash-separated keys"""
+    async def put(self, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> StoredObject:
+        """Store an object from a stream of chunks; it becomes visible only once complete"""
+        raise NotImplementedError
+
+    def stream(self, key: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield an object's bytes in chunks; raises ObjectNotFound"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    async def url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        """A time-limited URL clients can download the object from, if the backend has one"""
+        return None
+
+    async def urls(self, keys: Iterable[str], expires_in: int = 3600) -> Dict[str, Optional[str]]:
+        """url() for many keys at once, for list endpoints"""
+        return {key: await self.url(key, expires_in) for key in keys}
+
+    async def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> StoredObject:
+        return await self.put(key, iterate_bytes(data), content_type)
+
+    async def get_bytes(self, key: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(key)])
+
+class LocalStorage(StorageBackend):
+    """Files under a root directory; blocking file calls run in the threadpool"""
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        # Keys stored before the storage layer existed were paths under the root
+        prefix = self.root.rstrip("/") + "/"
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+        root = os.path.abspath(self.root)
+        path = os.path.abspath(os.path.join(root, key))
+        if not path.startswith(root + os.sep):
+            raise ValueError(f"Key escapes the storage root: {key}")
+        return path
+
+    async def put(self, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> StoredObject:
+        path = self.path(key)
+        await run_in_threadpool(os.makedirs, os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        size = 0
+        out = await run_in_threadpool(open, temp_path, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                await run_in_threadpool(out.write, chunk)
+            await run_in_threadpool(out.close)
+            await run_in_threadpool(os.replace, temp_path, path)
+        except BaseException:
+            out.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return StoredObject(key=key, size=size)
+
+    async def stream(self, key: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        try:
+            f = await run_in_threadpool(open, self.path(key), "rb")
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+        try:
+            while True:
+                chunk = await run_in_threadpool(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
+    async def delete(self, key: str) -> None:
+        try:
+            await run_in_threadpool(os.remove, self.path(key))
+        except FileNotFoundError:
+            pass
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(os.path.exists, self.path(key))
+
+class PresignedUrlCache:
+    """
+    Presigned URLs keyed by (object key, requested lifetime), reused until
+    `refresh_fraction` of their lifetime is left, so a URL handed out is always
+    valid for at least that share of what the caller asked for. LRU-bounded.
+    """
+    def __init__(self, max_entries: int = 10000, refresh_fraction: float = 0.25, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.refresh_fraction = refresh_fraction
+        self.clock = clock
+        self.entries: "OrderedDict[Tuple[str, int], Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, expires_in: int) -> Optional[str]:
+        entry = self.entries.get((key, expires_in))
+        if entry is not None:
+            url, expires_at = entry
+            if expires_at - self.clock() > expires_in * self.refresh_fraction:
+                self.entries.move_to_end((key, expires_in))
+                self.hits += 1
+                return url
+            del self.entries[(key, expires_in)]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, expires_in: int, url: str, signed_at: float) -> None:
+        self.entries[(key, expires_in)] = (url, signed_at + expires_in)
+        self.entries.move_to_end((key, expires_in))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        for cache_key in [cache_key for cache_key in self.entries if cache_key[0] == key]:
+            del self.entries[cache_key]
+
+class S3Storage(StorageBackend):
+    """
+    S3 (or any S3-compatible store) through one shared boto3 client.
+
+    boto3 is synchronous, so every call runs in the threadpool; the client is
+    thread-safe and its connection pool is reused across requests. Objects
+    larger than one part go up as a multipart upload with up to
+    `max_concurrency` parts in flight, which also bounds the memory held.
+    """
+    def __init__(
+        self,
+        bucket: str,
+        client=None,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        **client_kwargs
+    ):
+        # S3 rejects multipart parts under 5 MB (except the last)
+        if part_size < 5 * 1024 * 1024:
+            raise ValueError("part_size must be at least 5 MB")
+        self.bucket = bucket
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            client = boto3.client(
+                "s3",
+                config=Config(max_pool_connections=max(10, 2 * max_concurrency), retries={"mode": "standard"}),
+                **client_kwargs
+            )
+        self.client = client
+        self.url_cache = PresignedUrlCache()
+
+    async def put(self, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> StoredObject:
+        extra = {"ContentType": content_type} if content_type else {}
+        buffer = bytearray()
+        size = 0
+        upload_id: Optional[str] = None
+        parts: List[Dict] = []
+        uploads: List[asyncio.Task] = []
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def upload_part(number: int, body: bytes) -> None:
+            try:
+                response = await run_in_threadpool(
+                    self.client.upload_part,
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+                )
+                parts.append({"PartNumber": number, "ETag": response["ETag"]})
+            finally:
+                slots.release()
+
+        async def start_part(body: bytes) -> None:
+            await slots.acquire()
+            uploads.append(asyncio.create_task(upload_part(len(uploads) + 1, body)))
+
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                buffer += chunk
+                while len(buffer) > self.part_size:
+                    if upload_id is None:
+                        response = await run_in_threadpool(
+                            self.client.create_multipart_upload, Bucket=self.bucket, Key=key, **extra
+                        )
+                        upload_id = response["UploadId"]
+                    body = bytes(buffer[:self.part_size])
+                    del buffer[:self.part_size]
+                    await start_part(body)
+
+            if upload_id is None:
+                await run_in_threadpool(self.client.put_object, Bucket=self.bucket, Key=key, Body=bytes(buffer), **extra)
+                return StoredObject(key=key, size=size)
+
+            await start_part(bytes(buffer))
+            await asyncio.gather(*uploads)
+            await run_in_threadpool(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])}
+            )
+            return StoredObject(key=key, size=size)
+        except BaseException:
+            for task in uploads:
+                task.cancel()
+            if upload_id is not None:
+                await asyncio.gather(*uploads, return_exceptions=True)
+                await run_in_threadpool(self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def stream(self, key: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        try:
+            response = await run_in_threadpool(self.client.get_object, Bucket=self.bucket, Key=key)
+        except self.client.exceptions.NoSuchKey:
+            raise ObjectNotFound(key)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await run_in_threadpool(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        self.url_cache.discard(key)
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+    async def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            await run_in_threadpool(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def url(self, key: str, expires_in: int = 3600) -> Optional[str]:
+        return (await self.urls([key], expires_in))[key]
+
+    async def urls(self, keys: Iterable[str], expires_in: int = 3600) -> Dict[str, Optional[str]]:
+        """Cached URLs where still fresh; the rest are signed together in one threadpool call"""
+        result: Dict[str, Optional[str]] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            result[key] = self.url_cache.get(key, expires_in)
+            if result[key] is None:
+                missing.append(key)
+        if missing:
+            signed_at = self.url_cache.clock()
+            signed = await run_in_threadpool(self._sign, missing, expires_in)
+            for key, url in zip(missing, signed):
+                self.url_cache.put(key, expires_in, url, signed_at)
+                result[key] = url
+        return result
+
+    def _sign(self, keys: List[str], expires_in: int) -> List[str]:
+        # Signing is local HMAC work, no request to S3
+        return [
+            self.client.generate_presigned_url(
+                "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+            )
+            for key in keys
+        ]
+
+_storage: Optional[StorageBackend] = None
+
+def get_storage() -> StorageBackend:
+    """The process-wide storage backend selected by STORAGE_BACKEND"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                settings.AWS_BUCKET_NAME,
+                part_size=settings.STORAGE_MULTIPART_PART_SIZE,
+                max_concurrency=settings.STORAGE_MAX_CONCURRENCY,
+                region_name=settings.AWS_REGION,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                endpoint_url=settings.AWS_S3_ENDPOINT_URL or None
+            )
+        else:
+            _storage = LocalStorage(settings.UPLOAD_DIR)
+        logger.info(f"Using {type(_storage).__name__} for uploads")
+    return _storage
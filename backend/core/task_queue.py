@@ -0,0 +1,428 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
+from core.logging import setup_logger
+from models.task import TaskStatus, TaskPriority
+
+logger = setup_logger("task_queue")
+
+# Task type -> async handler(payload, db) returning a JSON-serializable result
+TaskHandler = Callable[[dict, Any], Awaitable[Any]]
+TASK_HANDLERS: Dict[str, TaskHandler] = {}
+
+def task_handler(task_type: str):
+    """Register a coroutine as the handler for a task type"""
+    def decorator(func: TaskHandler) -> TaskHandler:
+        TASK_HANDLERS[task_type] = func
+        return func
+    return decorator
+
+def make_dedup_key(task_type: str, payload: dict) -> str:
+    """Identical payloads for the same task type share one task"""
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{task_type}:{encoded}".encode("utf-8")).hexdigest()
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.TASK_RETRY_BASE_DELAY * 2 ** (attempts - 1), 600))
+
+def lease_expires_at(now: datetime) -> datetime:
+    return now + timedelta(seconds=settings.TASK_LEASE_SECONDS)
+
+# Error of tasks whose last attempt ended with the worker gone (killed, OOM)
+LEASE_EXPIRED_ERROR = "The worker running the task stopped before it finished"
+
+def lease_filter(task: dict) -> dict:
+    """Matches the task only while the worker that claimed it still holds the lease"""
+    return {"_id": task["_id"], "worker_id": task["worker_id"], "attempts": task["attempts"]}
+
+def new_task(
+    task_type: str,
+    payload: dict,
+    priority: int,
+    max_attempts: int,
+    dedup_key: Optional[str]
+) -> dict:
+    now = datetime.utcnow()
+    return {
+        "_id": uuid.uuid4().hex,
+        "type": task_type,
+        "payload": payload,
+        "status": TaskStatus.PENDING.value,
+        "priority": int(priority),
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "dedup_key": dedup_key,
+        # Active tasks (pending, running or completed) are reused by identical requests
+        "active": True,
+        "run_at": now,
+        "created_at": now,
+        "updated_at": now,
+        "result": None,
+        "error": None,
+    }
+
+class TaskBackend:
+    """Storage interface for the task queue"""
+    async def enqueue(self, task: dict) -> dict:
+        """Store a task, or return the existing active task with the same dedup key"""
+        raise NotImplementedError
+
+    async def claim(self, task_types: List[str], worker_id: str) -> Optional[dict]:
+        """
+        Atomically take the highest-priority runnable task and mark it running.
+
+        Running tasks whose lease expired are taken over while they have
+        attempts left; the others are marked failed.
+        """
+        raise NotImplementedError
+
+    async def renew(self, task: dict) -> bool:
+        """Extend the lease of a claimed task; False if another worker has taken it over"""
+        raise NotImplementedError
+
+    async def complete(self, task: dict, result: Any) -> bool:
+        """Store the result unless the lease was lost; returns whether it was stored"""
+        raise NotImplementedError
+
+    async def fail(self, task: dict, error: str) -> bool:
+        """Reschedule the task with backoff, or mark it failed once out of attempts (unless the lease was lost)"""
+        raise NotImplementedError
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+class InMemoryTaskBackend(TaskBackend):
+    """
+    Process-local backend for tests and single-process development.
+
+    None of the methods await while mutating state, so each one is atomic on the event loop.
+    """
+    def __init__(self):
+        self.tasks: Dict[str, dict] = {}
+
+    async def enqueue(self, task: dict) -> dict:
+        if task["dedup_key"]:
+            for existing in self.tasks.values():
+                if existing["active"] and existing["dedup_key"] == task["dedup_key"]:
+                    return dict(existing)
+        self.tasks[task["_id"]] = task
+        return dict(task)
+
+    async def claim(self, task_types: List[str], worker_id: str) -> Optional[dict]:
+        now = datetime.utcnow()
+        runnable = []
+        for task in self.tasks.values():
+            if task["type"] not in task_types:
+                continue
+            if task["status"] == TaskStatus.PENDING.value and task["run_at"] <= now:
+                runnable.append(task)
+            elif task["status"] == TaskStatus.RUNNING.value and task["lease_expires_at"] <= now:
+                if task["attempts"] < task["max_attempts"]:
+                    runnable.append(task)
+                else:
+                    task.update({
+                        "status": TaskStatus.FAILED.value,
+                        "active": False,
+                        "error": LEASE_EXPIRED_ERROR,
+                        "updated_at": now,
+                    })
+        if not runnable:
+            return None
+        task = min(runnable, key=lambda t: (-t["priority"], t["created_at"]))
+        task.update({
+            "status": TaskStatus.RUNNING.value,
+            "worker_id": worker_id,
+            "attempts": task["attempts"] + 1,
+            "lease_expires_at": lease_expires_at(now),
+            "updated_at": now,
+        })
+        return dict(task)
+
+    def _leased(self, task: dict) -> Optional[dict]:
+        stored = self.tasks.get(task["_id"])
+        if stored is None or any(stored.get(field) != value for field, value in lease_filter(task).items()):
+            return None
+        return stored
+
+    async def renew(self, task: dict) -> bool:
+        stored = self._leased(task)
+        if stored is None or stored["status"] != TaskStatus.RUNNING.value:
+            return False
+        stored["lease_expires_at"] = lease_expires_at(datetime.utcnow())
+        return True
+
+    async def complete(self, task: dict, result: Any) -> bool:
+        stored = self._leased(task)
+        if stored is None:
+            return False
+        stored.update({
+            "status": TaskStatus.COMPLETED.value,
+            "result": result,
+            "error": None,
+            "updated_at": datetime.utcnow(),
+        })
+        return True
+
+    async def fail(self, task: dict, error: str) -> bool:
+        stored = self._leased(task)
+        if stored is None:
+            return False
+        now = datetime.utcnow()
+        if stored["attempts"] < stored["max_attempts"]:
+            stored.update({
+                "status": TaskStatus.PENDING.value,
+                "run_at": now + retry_delay(stored["attempts"]),
+            })
+        else:
+            stored.update({"status": TaskStatus.FAILED.value, "active": False})
+        stored.update({"error": error, "updated_at": now})
+        return True
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        task = self.tasks.get(task_id)
+        return dict(task) if task else None
+
+class MongoTaskBackend(TaskBackend):
+    """Durable backend storing tasks in the ai_tasks collection"""
+    def __init__(self, db, collection_name: str = "ai_tasks"):
+        self.collection = db[collection_name]
+        self._indexes_created = False
+
+    async def _ensure_indexes(self) -> None:
+        if self._indexes_created:
+            return
+        await self.collection.create_index(
+            [("status", ASCENDING), ("type", ASCENDING), ("priority", DESCENDING), ("created_at", ASCENDING)]
+        )
+        # Only one active task per dedup key
+        await self.collection.create_index(
+            "dedup_key",
+            unique=True,
+            partialFilterExpression={"active": True, "dedup_key": {"$type": "string"}}
+        )
+        # Finished tasks are removed once their result has expired
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        self._indexes_created = True
+
+    async def enqueue(self, task: dict) -> dict:
+        await self._ensure_indexes()
+        try:
+            await self.collection.insert_one(task)
+            return task
+        except DuplicateKeyError:
+            existing = await self.collection.find_one({"dedup_key": task["dedup_key"], "active": True})
+            return existing or task
+
+    async def claim(self, task_types: List[str], worker_id: str) -> Optional[dict]:
+        await self._ensure_indexes()
+        now = datetime.utcnow()
+        # Tasks that took their worker down on every attempt (OOM, crash) are not retried again
+        await self.collection.update_many(
+            {
+                "type": {"$in": task_types},
+                "status": TaskStatus.RUNNING.value,
+                "lease_expires_at": {"$lte": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]},
+            },
+            {"$set": {
+                "status": TaskStatus.FAILED.value,
+                "active": False,
+                "error": LEASE_EXPIRED_ERROR,
+                "updated_at": now,
+                "expires_at": now + timedelta(seconds=settings.TASK_RESULT_TTL_SECONDS),
+            }}
+        )
+        return await self.collection.find_one_and_update(
+            {
+                "type": {"$in": task_types},
+                "$or": [
+                    {"status": TaskStatus.PENDING.value, "run_at": {"$lte": now}},
+                    # Recover tasks from workers that died mid-run
+                    {
+                        "status": TaskStatus.RUNNING.value,
+                        "lease_expires_at": {"$lte": now},
+                        "$expr": {"$lt": ["$attempts", "$max_attempts"]},
+                    },
+                ],
+            },
+            {
+                "$set": {
+                    "status": TaskStatus.RUNNING.value,
+                    "worker_id": worker_id,
+                    "lease_expires_at": lease_expires_at(now),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", DESCENDING), ("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def renew(self, task: dict) -> bool:
+        result = await self.collection.update_one(
+            {**lease_filter(task), "status": TaskStatus.RUNNING.value},
+            {"$set": {"lease_expires_at": lease_expires_at(datetime.utcnow())}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, task: dict, result: Any) -> bool:
+        now = datetime.utcnow()
+        update = await self.collection.update_one(
+            lease_filter(task),
+            {"$set": {
+                "status": TaskStatus.COMPLETED.value,
+                "result": result,
+                "error": None,
+                "updated_at": now,
+                "expires_at": now + timedelta(seconds=settings.TASK_RESULT_TTL_SECONDS),
+            }}
+        )
+        return update.matched_count == 1
+
+    async def fail(self, task: dict, error: str) -> bool:
+        now = datetime.utcnow()
+        if task["attempts"] < task["max_attempts"]:
+            update = {
+                "status": TaskStatus.PENDING.value,
+                "run_at": now + retry_delay(task["attempts"]),
+            }
+        else:
+            update = {
+                "status": TaskStatus.FAILED.value,
+                "active": False,
+                "expires_at": now + timedelta(seconds=settings.TASK_RESULT_TTL_SECONDS),
+            }
+        update.update({"error": error, "updated_at": now})
+        result = await self.collection.update_one(lease_filter(task), {"$set": update})
+        return result.matched_count == 1
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"_id": task_id})
+
+class TaskQueue:
+    """Enqueue AI work for the worker processes and look up its status"""
+    def __init__(self, backend: Optional[TaskBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> TaskBackend:
+        """Created on first use, so importing this module (or forking workers) opens no database client"""
+        if self._backend is None:
+            self._backend = create_task_backend()
+        return self._backend
+
+    async def enqueue(
+        self,
+        task_type: str,
+        payload: dict,
+        priority: int = TaskPriority.NORMAL,
+        max_attempts: Optional[int] = None,
+        deduplicate: bool = True
+    ) -> dict:
+        dedup_key = make_dedup_key(task_type, payload) if deduplicate else None
+        task = new_task(
+            task_type,
+            payload,
+            priority,
+            max_attempts or settings.TASK_MAX_ATTEMPTS,
+            dedup_key
+        )
+        return await self.backend.enqueue(task)
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        return await self.backend.get(task_id)
+
+class TaskWorker:
+    """Poll the queue and run registered handlers"""
+    def __init__(
+        self,
+        backend: TaskBackend,
+        db: Any,
+        handlers: Optional[Dict[str, TaskHandler]] = None,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+        heartbeat_interval: Optional[float] = None
+    ):
+        self.backend = backend
+        self.db = db
+        self.handlers = handlers if handlers is not None else TASK_HANDLERS
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or uuid.uuid4().hex
+        # Renew well before the lease runs out, so slow model calls are not taken over
+        self.heartbeat_interval = heartbeat_interval or settings.TASK_LEASE_SECONDS / 3
+
+    async def _heartbeat(self, task: dict) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await self.backend.renew(task):
+                    logger.warning(f"Task {task['_id']} ({task['type']}) was taken over by another worker")
+                    return
+            except Exception as e:
+                logger.error(f"Could not renew the lease of task {task['_id']}: {str(e)}")
+
+    async def run_once(self) -> bool:
+        """Run a single task if one is available; returns False when the queue is empty"""
+        task = await self.backend.claim(list(self.handlers), self.worker_id)
+        if task is None:
+            return False
+
+        handler = self.handlers[task["type"]]
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        try:
+            result = await handler(task["payload"], self.db)
+        except Exception as e:
+            logger.error(
+                f"Task {task['_id']} ({task['type']}) failed on attempt "
+                f"{task['attempts']}/{task['max_attempts']}: {str(e)}"
+            )
+            if not await self.backend.fail(task, str(e)):
+                logger.warning(f"Task {task['_id']} ({task['type']}) failure ignored: the lease was lost")
+            return True
+        finally:
+            heartbeat.cancel()
+
+        if await self.backend.complete(task, result):
+            logger.info(f"Task {task['_id']} ({task['type']}) completed")
+        else:
+            logger.warning(f"Task {task['_id']} ({task['type']}) result discarded: the lease was lost")
+        return True
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> None:
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            if not await self.run_once():
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+def create_task_backend(db=None) -> TaskBackend:
+    """Build the backend selected by TASK_QUEUE_BACKEND ("mongo" or "memory"), on `db` if given"""
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        return InMemoryTaskBackend()
+    if db is None:
+        db = AsyncIOMotorClient(settings.MONGODB_URL)[settings.MONGODB_DB_NAME]
+    return MongoTaskBackend(db)
+
+task_queue = TaskQueue()
+
+def serialize_task(task: dict) -> dict:
+    """Public view of a task for the status endpoints"""
+    return {
+        "id": task["_id"],
+        "type": task["type"],
+        "status": task["status"],
+        "attempts": task["attempts"],
+        "created_at": task["created_at"],
+        "updated_at": task["updated_at"],
+        "result": task.get("result") if task["status"] == TaskStatus.COMPLETED.value else None,
+        "error": task.get("error"),
+    }
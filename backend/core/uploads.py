@@ -0,0 +1,270 @@
+import hashlib
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+from core.logging import setup_logger
+from core.storage import get_storage
+
+logger = setup_logger("uploads")
+
+CHUNK_SIZE = 64 * 1024
+# Room for the form fields and multipart boundaries around the file itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+RESUME_TYPES = ("pdf", "docx")
+EXTENSIONS: Dict[str, str] = {"pdf": ".pdf", "docx": ".docx"}
+CONTENT_TYPES: Dict[str, str] = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+@dataclass
+class StoredUpload:
+    key: str
+    size: int
+    sha256: str
+    kind: str
+
+@dataclass
+class UploadedDocument:
+    data: bytes
+    sha256: str
+    kind: str
+
+@dataclass
+class IncomingDocument:
+    """One file of a bulk upload; rejected files carry an `error` instead of data"""
+    filename: str
+    data: Optional[bytes] = None
+    kind: Optional[str] = None
+    error: Optional[str] = None
+
+def sniff_document_type(head: bytes) -> Optional[str]:
+    """Identify a document from its first bytes rather than its name or declared content type"""
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    # DOCX is a zip package; its parts are named in the local file headers
+    if head.startswith(b"PK\x03\x04") and (b"word/" in head or b"[Content_Types].xml" in head):
+        return "docx"
+    return None
+
+def safe_filename(filename: Optional[str]) -> str:
+    """Strip directories and unusual characters from a client-supplied filename"""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    name = "".join(c if c.isalnum() or c in "._-" else "_" for c in name).lstrip(".")
+    return name or "upload"
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit"
+    )
+
+async def _sniffed_chunks(
+    upload: UploadFile,
+    allowed_types: Iterable[str],
+    max_bytes: int
+) -> Tuple[str, AsyncIterator[bytes]]:
+    """Sniff the upload's type from its first chunk, then yield it chunk by chunk within max_bytes"""
+    head = await upload.read(CHUNK_SIZE)
+    kind = sniff_document_type(head)
+    if kind not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Unsupported file format. Please upload PDF or DOCX."
+        )
+
+    async def chunks() -> AsyncIterator[bytes]:
+        chunk, size = head, 0
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            yield chunk
+            chunk = await upload.read(CHUNK_SIZE)
+    return kind, chunks()
+
+async def save_upload(
+    upload: UploadFile,
+    subdirectory: str,
+    prefix: str,
+    allowed_types: Iterable[str] = RESUME_TYPES,
+    max_bytes: Optional[int] = None
+) -> StoredUpload:
+    """
+    Stream an upload into the storage backend under `subdirectory/`, in
+    fixed-size chunks and hashing it on the way.
+
+    The file type is sniffed from the first chunk and must be one of
+    `allowed_types`; the stored name gets the matching extension. Memory stays
+    at one chunk (or one multipart part per upload slot on S3) and partial
+    files are never visible.
+    """
+    kind, chunks = await _sniffed_chunks(upload, allowed_types, max_bytes or settings.MAX_UPLOAD_SIZE)
+    stem, _ = os.path.splitext(safe_filename(upload.filename))
+    key = f"{subdirectory}/{prefix}_{stem}{EXTENSIONS[kind]}"
+    digest = hashlib.sha256()
+
+    async def hashed() -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            digest.update(chunk)
+            yield chunk
+
+    stored = await get_storage().put(key, hashed(), CONTENT_TYPES[kind])
+    return StoredUpload(key=stored.key, size=stored.size, sha256=digest.hexdigest(), kind=kind)
+
+async def read_upload(
+    upload: UploadFile,
+    allowed_types: Iterable[str] = RESUME_TYPES,
+    max_bytes: Optional[int] = None
+) -> UploadedDocument:
+    """Read a sniffed, size-limited upload into memory for files that are parsed but not kept"""
+    kind, chunks = await _sniffed_chunks(upload, allowed_types, max_bytes or settings.MAX_UPLOAD_SIZE)
+    data = bytearray()
+    async for chunk in chunks:
+        data += chunk
+    data = bytes(data)
+    return UploadedDocument(data=data, sha256=hashlib.sha256(data).hexdigest(), kind=kind)
+
+def _incoming(filename: str, data: bytes, allowed_types: Iterable[str], max_bytes: int) -> IncomingDocument:
+    if len(data) > max_bytes:
+        return IncomingDocument(filename, error=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit")
+    kind = sniff_document_type(data[:CHUNK_SIZE])
+    if kind not in allowed_types:
+        return IncomingDocument(filename, error="Unsupported file format. Please upload PDF or DOCX.")
+    return IncomingDocument(filename, data, kind)
+
+def _open_archive(file) -> Optional[zipfile.ZipFile]:
+    """The upload as a zip archive of documents, or None when it is not one (a DOCX is a zip too)"""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        return None
+    names = set(archive.namelist())
+    if "[Content_Types].xml" in names and "word/document.xml" in names:
+        archive.close()
+        return None
+    return archive
+
+def _read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int) -> bytes:
+    with archive.open(info) as member:
+        # Bounded read: the size in the header is not trusted
+        return member.read(max_bytes + 1)
+
+async def iter_documents(
+    uploads: List[UploadFile],
+    allowed_types: Iterable[str] = RESUME_TYPES,
+    max_bytes: Optional[int] = None,
+    max_files: Optional[int] = None
+) -> AsyncIterator[IncomingDocument]:
+    """
+    Yield the documents of a multi-file upload, expanding zip archives.
+
+    Archive members are decompressed one at a time straight from the spooled
+    upload, never extracted to disk, and each read stops at `max_bytes` so a
+    zip bomb costs one bounded read. Files of the wrong type or size are
+    yielded with an error rather than failing the batch; more than `max_files`
+    documents in total is a 413.
+    """
+    max_bytes = max_bytes or settings.MAX_UPLOAD_SIZE
+    max_files = max_files or settings.BULK_MAX_FILES
+    count = 0
+
+    def counted() -> None:
+        nonlocal count
+        count += 1
+        if count > max_files:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {max_files} files per upload"
+            )
+
+    for upload in uploads:
+        name = safe_filename(upload.filename)
+        head = await upload.read(4)
+        await upload.seek(0)
+        archive = await run_in_threadpool(_open_archive, upload.file) if head == b"PK\x03\x04" else None
+        if archive is None:
+            counted()
+            await upload.seek(0)
+            yield _incoming(name, await upload.read(max_bytes + 1), allowed_types, max_bytes)
+            continue
+
+        with archive:
+            for info in archive.infolist():
+                basename = os.path.basename(info.filename)
+                if info.is_dir() or info.filename.startswith("__MACOSX/") or basename.startswith("."):
+                    continue
+                counted()
+                member_name = f"{name}/{info.filename}"
+                try:
+                    data = await run_in_threadpool(_read_member, archive, info, max_bytes)
+                except Exception as e:
+                    # Encrypted, corrupt or unsupported compression
+                    logger.warning(f"Unreadable archive member {member_name}: {str(e)}")
+                    yield IncomingDocument(member_name, error="Unreadable archive member")
+                    continue
+                yield _incoming(member_name, data, allowed_types, max_bytes)
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over `max_body_size` before they are buffered.
+
+    A declared Content-Length over the limit is answered with 413 without
+    reading the body. Chunked bodies are counted as they arrive and the request
+    fails with 413 as soon as the count passes the limit, while the multipart
+    parser is still consuming them. `path_limits` maps path regexes to their
+    own limits (e.g. bulk uploads).
+    """
+    def __init__(self, app: ASGIApp, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = [(re.compile(pattern), limit) for pattern, limit in (path_limits or {}).items()]
+
+    def limit_for(self, path: str) -> int:
+        for pattern, limit in self.path_limits:
+            if pattern.search(path):
+                return limit
+        return self.max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self.limit_for(scope["path"])
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body_size:
+            logger.warning(f"Rejected {int(content_length)} byte body for {scope['path']}")
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    # Raised inside request parsing, so FastAPI answers it like any HTTPException
+                    raise _too_large(max_body_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send: Send) -> None:
+        body = b'{"detail":"Request body too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,9 +1,8 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.openapi.utils import get_openapi
+import asyncio
 import sys
 from pathlib import Path
 
@@ -12,11 +11,13 @@ backend_dir = Path(__file__).parent
 sys.path.append(str(backend_dir))
 
 from core.config import settings
-from core.logging import setup_logger, log_request
+from core.compression import CompressionMiddleware, response_compressor
+from core.logging import setup_logger
 from core.rate_limit import default_limiter, auth_limiter, admin_limiter, api_limiter
+from core.middleware import ErrorHandlingMiddleware, RateLimitMiddleware, RequestLoggingMiddleware
+from core.uploads import BodySizeLimitMiddleware, FORM_OVERHEAD_BYTES
+from core.responses import MongoJSONResponse
 from routers import auth, admin, jobs, candidates, recruiters, ai, forms
-import time
-import traceback
 
 # Setup logging
 logger = setup_logger("main")
@@ -66,6 +67,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     docs_url="/api/docs" if settings.DEBUG else None,
     redoc_url="/api/redoc" if settings.DEBUG else None,
+    default_response_class=MongoJSONResponse,
 )
 
 app.openapi = custom_openapi
@@ -79,46 +81,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware, compressor=response_compressor)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.MAX_UPLOAD_SIZE + FORM_OVERHEAD_BYTES,
+    path_limits={r"/bulk-ingest$": settings.BULK_UPLOAD_MAX_SIZE}
+)
 
-# Add rate limiting middleware
-app.middleware("http")(default_limiter)
-
-# Add request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.response_time = process_time
-        log_request(request, response)
-        return response
-    except Exception as e:
-        process_time = time.time() - start_time
-        log_request(request, error=e)
-        raise
-
-# Add error handling middleware
-@app.middleware("http")
-async def error_handling(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except Exception as e:
-        logger.error(
-            "Unhandled exception",
-            extra={
-                "error": str(e),
-                "stack_trace": traceback.format_exc(),
-                "path": request.url.path,
-                "method": request.method,
-            }
-        )
-        return JSONResponse(
-            status_code=500,
-            content={"error": "Internal server error"}
-        )
+# Rate limiting, request logging and error handling, innermost first
+app.add_middleware(RateLimitMiddleware, limiter=default_limiter)
+app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(ErrorHandlingMiddleware)
 
 # Include routers with rate limiting
 app.include_router(
@@ -170,6 +144,39 @@ app.include_router(
     dependencies=[api_limiter]
 )
 
+@app.on_event("startup")
+async def start_matching_index():
+    # Load (or build) the resume/job indexes and keep them up to date in the background
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.matching import maintain_matching_index
+    from app.embeddings import embeddings_enabled, maintain_semantic_index
+    from app.skill_search import maintain_skill_index
+    db = AsyncIOMotorClient(settings.MONGODB_URL)[settings.MONGODB_DB_NAME]
+    app.state.matching_index_task = asyncio.create_task(maintain_matching_index(
+        db,
+        ai.load_resume_text,
+        Path(settings.MATCHING_INDEX_DIR),
+        settings.MATCHING_COMPACTION_INTERVAL
+    ))
+    if embeddings_enabled():
+        app.state.semantic_index_task = asyncio.create_task(maintain_semantic_index(
+            db,
+            ai.load_resume_text,
+            Path(settings.EMBEDDING_INDEX_DIR),
+            settings.MATCHING_COMPACTION_INTERVAL
+        ))
+    app.state.skill_index_task = asyncio.create_task(maintain_skill_index(db, settings.SKILL_INDEX_SYNC_INTERVAL))
+
+@app.on_event("shutdown")
+async def stop_text_extraction():
+    from app.extraction import text_extractor
+    text_extractor.shutdown()
+
+@app.on_event("shutdown")
+async def close_database():
+    from core.database import close_shared_database
+    close_shared_database()
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy"}
@@ -8,6 +8,14 @@ class JobStatus(str, Enum):
     CLOSED = "closed"
     DRAFT = "draft"
 
+# Fields list views get unless they ask for others with `fields=`
+JOB_LIST_FIELDS = ("title", "company", "location", "type", "status", "skills", "created_at")
+# Fields clients may request; documents can carry internal fields that are not exposed
+JOB_FIELDS = JOB_LIST_FIELDS + (
+    "description", "ai_generated_description", "requirements", "salary", "recruiter_id",
+    "experience_level", "updated_at", "total_applications", "total_interviews"
+)
+
 class JobBase(BaseModel):
     title: str
     description: str
@@ -29,6 +37,7 @@ class JobInDB(JobBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     ai_generated_description: Optional[str] = None
+    skills: List[str] = []
     total_applications: int = 0
     total_interviews: int = 0
 
@@ -36,6 +45,7 @@ class JobResponse(JobBase):
     id: str
     created_at: datetime
     updated_at: datetime
+    skills: List[str] = []
     total_applications: int
     total_interviews: int
 
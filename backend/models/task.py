@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional, Any
+from datetime import datetime
+from enum import Enum
+
+class TaskStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class TaskPriority(int, Enum):
+    LOW = 0
+    NORMAL = 5
+    HIGH = 10
+
+class TaskResponse(BaseModel):
+    id: str
+    type: str
+    status: TaskStatus
+    attempts: int
+    created_at: datetime
+    updated_at: datetime
+    result: Optional[Any] = None
+    error: Optional[str] = None
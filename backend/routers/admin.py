@@ -12,7 +12,9 @@ from pathlib import Path
 import shutil
 
 from auth import get_current_admin_user
+from core.coalescing import coalescer
 from core.config import settings
+from core.database import shared_database
 from models.admin import ErrorLog, BackupLog
 from core.logging import setup_logger
 from models.user import UserResponse, UserRole
@@ -41,9 +43,13 @@ class SystemStats(BaseModel):
 
 @router.get("/stats", response_model=SystemStats)
 async def get_system_stats(
-    db: AsyncIOMotorClient = Depends(get_database), # type: ignore
     current_user: UserResponse = Depends(get_current_admin_user)
 ):
+    # Dashboards polling at once share one set of counts; the shared fetch uses
+    # the process-wide client, as the first caller's may close while others wait
+    return await coalescer.run("admin.stats", {}, lambda: _system_stats(shared_database()))
+
+async def _system_stats(db) -> SystemStats:
     total_users = await db.users.count_documents({})
     total_jobs = await db.jobs.count_documents({})
     total_applications = await db.applications.count_documents({})
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Body
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional, List, Union
+import asyncio
+import hashlib
 import os
 from dotenv import load_dotenv
 import json
-from PyPDF2 import PdfReader
-import docx
-from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
 import torch
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
@@ -14,6 +13,22 @@ import logging
 from datetime import datetime
 import ollama
 from pydantic import BaseModel
+from app.inference import load_summarizer, load_text_generator, resolve_backend
+from app.model_loader import FallbackModelLoader
+from app.summarization import MapReduceSummarizer, approximate_token_count
+from core.coalescing import coalescer
+from core.task_queue import task_queue, task_handler, serialize_task
+from models.task import TaskResponse
+from core.uploads import read_upload
+from models.user import UserResponse
+from routers.auth import get_optional_user
+from core.storage import ObjectNotFound, get_storage
+from app.matching import matching_engine
+from app.embeddings import embeddings_enabled, semantic_index
+from app.skills import extract_skills
+from app.duplicates import claim_analysis, find_cached_analysis, release_analysis, store_analysis
+from app.extraction import text_extractor
+from starlette.concurrency import run_in_threadpool
 
 load_dotenv()
 
@@ -25,17 +40,25 @@ HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 HF_MODEL = os.getenv("HF_MODEL", "mistralai/Mistral-7B-Instruct-v0.2")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
 USE_OLLAMA_AS_BACKUP = os.getenv("USE_OLLAMA_AS_BACKUP", "true").lower() == "true"
+OLLAMA_SUMMARY_CHUNK_TOKENS = int(os.getenv("OLLAMA_SUMMARY_CHUNK_TOKENS", "1500"))
+# How often a worker checks on an analysis another worker is generating
+ANALYSIS_POLL_SECONDS = 2.0
 
-# Initialize Hugging Face models
+# Initialize Hugging Face models (backend selected by AI_INFERENCE_BACKEND)
 try:
-    summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    text_generator = pipeline("text-generation", model=HF_MODEL)
-    logger.info(f"Successfully loaded Hugging Face models: {HF_MODEL}")
+    summarizer = load_summarizer()
+    text_generator = load_text_generator(HF_MODEL, token=HUGGINGFACE_API_KEY)
+    logger.info(f"Successfully loaded Hugging Face models: {HF_MODEL} ({resolve_backend()})")
 except Exception as e:
     logger.error(f"Failed to initialize Hugging Face models: {str(e)}")
     summarizer = None
     text_generator = None
 
+# Loaded once in the background if the text-generation pipeline is unavailable
+fallback_model = FallbackModelLoader(HF_MODEL, token=HUGGINGFACE_API_KEY)
+if text_generator is None:
+    fallback_model.start()
+
 async def get_db():
     client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
     db = client[os.getenv("MONGODB_DB_NAME")]
@@ -44,19 +67,21 @@ async def get_db():
     finally:
         client.close()
 
-def extract_text_from_pdf(file_path: str) -> str:
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text()
-    return text
-
-def extract_text_from_docx(file_path: str) -> str:
-    doc = docx.Document(file_path)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text
+async def load_resume_text(user: dict) -> str:
+    """Return a candidate's resume text, parsing the uploaded file if it was not stored"""
+    if user.get("resume_text"):
+        return user["resume_text"]
+    resume_path = user.get("resume_path")
+    if not resume_path:
+        return ""
+    try:
+        return await text_extractor.extract_stored(get_storage(), resume_path, user.get("resume_sha256"))
+    except ObjectNotFound:
+        logger.warning(f"Resume file {resume_path} is missing from storage")
+        return ""
+    except Exception as e:
+        logger.error(f"Error extracting resume text from {resume_path}: {str(e)}")
+        return ""
 
 def generate_with_ollama(prompt: str, model: str = None) -> str:
     """Generate text using Ollama local LLM"""
@@ -77,20 +102,64 @@ def generate_with_huggingface(prompt: str) -> str:
             result = text_generator(prompt, max_length=500, num_return_sequences=1)
             return result[0]["generated_text"]
         else:
-            # Fallback to direct model loading if pipeline failed
-            model = AutoModelForCausalLM.from_pretrained(HF_MODEL)
-            tokenizer = AutoTokenizer.from_pretrained(HF_MODEL)
+            # Fallback to the directly loaded model if the pipeline failed
+            loaded = fallback_model.get()
+            if loaded is None:
+                if fallback_model.failed:
+                    logger.error(f"Fallback model {HF_MODEL} failed to load: {fallback_model.last_error}")
+                else:
+                    logger.warning(f"Fallback model {HF_MODEL} is not loaded yet (attempt {fallback_model.attempts})")
+                return ""
+            model, tokenizer = loaded
             
-            inputs = tokenizer(prompt, return_tensors="pt")
+            inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
             outputs = model.generate(**inputs, max_length=500, num_return_sequences=1)
             return tokenizer.decode(outputs[0], skip_special_tokens=True)
     except Exception as e:
         logger.error(f"Hugging Face error: {str(e)}")
         return ""
 
+def _summarize_batch_with_bart(chunks: List[str], min_length: int = 30) -> List[str]:
+    results = summarizer(chunks, max_length=150, min_length=min_length, do_sample=False, truncation=True, batch_size=8)
+    return [result["summary_text"] for result in results]
+
+def _summarize_batch_with_ollama(chunks: List[str]) -> List[str]:
+    return [generate_with_ollama(f"Summarize this resume section in 2-3 sentences: {chunk}") for chunk in chunks]
+
+def _reduce_batch_with_ollama(chunks: List[str]) -> List[str]:
+    return [generate_with_ollama(f"Summarize this resume in 3-4 sentences: {chunk}") for chunk in chunks]
+
+# Long resumes are summarized section by section and the summaries summarized again
+bart_summarizer = None
+if summarizer:
+    bart_summarizer = MapReduceSummarizer(
+        _summarize_batch_with_bart,
+        lambda text: len(summarizer.tokenizer(text)["input_ids"]),
+        # Leave headroom below BART's 1024-token input limit
+        summarizer.tokenizer.model_max_length - 24,
+        reduce_batch=lambda chunks: _summarize_batch_with_bart(chunks, min_length=50)
+    )
+ollama_summarizer = MapReduceSummarizer(
+    _summarize_batch_with_ollama,
+    approximate_token_count,
+    OLLAMA_SUMMARY_CHUNK_TOKENS,
+    reduce_batch=_reduce_batch_with_ollama
+)
+
 def calculate_resume_match_score(resume_text: str, job_description: str) -> float:
     """Calculate match score between resume and job description using TF-IDF and cosine similarity"""
     try:
+        # Sentence embeddings also match synonyms ("k8s" and "Kubernetes")
+        if embeddings_enabled():
+            try:
+                return semantic_index.similarity(resume_text, job_description)
+            except Exception as e:
+                logger.error(f"Error calculating semantic match score: {str(e)}")
+        
+        # Prefer IDF weights fitted on the whole resume and job corpus
+        if matching_engine.fitted:
+            return matching_engine.score(resume_text, job_description)
+        
         from sklearn.feature_extraction.text import TfidfVectorizer
         
         vectorizer = TfidfVectorizer(stop_words='english')
@@ -155,15 +224,132 @@ async def generate_job_description(
             detail="An error occurred while generating the job description"
         )
 
+def generate_resume_narrative(resume_text_content: str, skills: List[str]) -> tuple:
+    """Summary and narrative analysis from the models: (summary, raw_analysis, model_used)"""
+    # Generate resume summary using Hugging Face
+    summary = ""
+    if bart_summarizer:
+        try:
+            summary = bart_summarizer.summarize(resume_text_content)
+        except Exception as e:
+            logger.error(f"Error generating summary: {str(e)}")
+            summary = "Failed to generate summary"
+    else:
+        # Fallback to Ollama if configured
+        if USE_OLLAMA_AS_BACKUP:
+            summary = ollama_summarizer.summarize(resume_text_content)
+        else:
+            summary = "Summary generation not available"
+    
+    analysis_prompt = f"""Analyze the following resume and provide insights:
+    {resume_text_content}
+    
+    Skills found in the resume: {', '.join(skills) or 'none listed'}
+    
+    Please provide:
+    1. Experience level
+    2. Education background
+    3. Potential job matches
+    4. Areas for improvement
+    """
+    
+    raw_analysis = ""
+    model_used = "unknown"
+    
+    # Try Hugging Face first, fall back to Ollama if configured
+    raw_analysis = generate_with_huggingface(analysis_prompt)
+    if not raw_analysis and USE_OLLAMA_AS_BACKUP:
+        raw_analysis = generate_with_ollama(analysis_prompt)
+        model_used = "ollama"
+    else:
+        model_used = "huggingface"
+    return summary, raw_analysis, model_used
+
+async def _resume_narrative(db, resume_text: str, skills: List[str], owner_id: Optional[str]) -> tuple:
+    """Summary, analysis, model and reuse details, from the analysis cache when possible"""
+    # Resubmissions reuse the narrative of an identical resume, or of the owner's own near-identical one
+    cached = await find_cached_analysis(db, resume_text, owner_id)
+    # Workers analyzing the same text at once: one generates, the others wait for its result
+    while cached is None and not await claim_analysis(db, resume_text, owner_id):
+        await asyncio.sleep(ANALYSIS_POLL_SECONDS)
+        cached = await find_cached_analysis(db, resume_text, owner_id)
+    if cached:
+        reused_from = {"analysis_id": str(cached["_id"]), "similarity": cached["similarity"]}
+        return cached["result"]["summary"], cached["result"]["raw_analysis"], cached["result"]["model_used"], reused_from
+
+    try:
+        # Model calls block: run them off the event loop so the task lease keeps being renewed
+        summary, raw_analysis, model_used = await run_in_threadpool(generate_resume_narrative, resume_text, skills)
+    except BaseException:
+        await release_analysis(db, resume_text)
+        raise
+    if raw_analysis:
+        await store_analysis(db, resume_text, {
+            "summary": summary, "raw_analysis": raw_analysis, "model_used": model_used
+        }, owner_id)
+    else:
+        await release_analysis(db, resume_text)
+    return summary, raw_analysis, model_used, None
+
+async def run_resume_analysis(
+    db,
+    resume_text: str,
+    job_description: Optional[str] = None,
+    has_file: bool = False,
+    has_text: bool = False,
+    owner_id: Optional[str] = None
+) -> dict:
+    """Summarize, analyze and score a resume; runs in the task workers"""
+    resume_text_content = resume_text
+    
+    # Calculate match score if job description is provided
+    match_score = None
+    if job_description:
+        match_score = await run_in_threadpool(calculate_resume_match_score, resume_text_content, job_description)
+    
+    # Skills come from the dictionary matcher; the model only writes the narrative
+    skills = extract_skills(resume_text_content)
+    
+    # Identical resumes analyzed at once in this process share one lookup; across
+    # processes, the claim in _resume_narrative lets only one of them generate
+    summary, raw_analysis, model_used, reused_from = await coalescer.run(
+        "ai.resume_narrative",
+        {"sha256": hashlib.sha256(resume_text_content.encode("utf-8")).hexdigest(), "owner_id": owner_id},
+        lambda: _resume_narrative(db, resume_text_content, skills, owner_id)
+    )
+    
+    # Log the analysis
+    await db.ai_logs.insert_one({
+        "type": "resume_analysis",
+        "input": {"has_file": has_file, "has_text": has_text, "has_job_description": bool(job_description)},
+        "output": {"summary": summary, "skills": skills, "match_score": match_score, "raw_analysis": raw_analysis, "reused_from": reused_from},
+        "timestamp": datetime.utcnow()
+    })
+    
+    return {
+        "summary": summary,
+        "skills": skills,
+        "match_score": match_score,
+        "raw_analysis": raw_analysis,
+        "model_used": model_used,
+        "reused_from": reused_from,
+        "score": match_score if match_score is not None else 85.5  # Default score if no job description provided
+    }
+
+@task_handler("resume_analysis")
+async def resume_analysis_task(payload: dict, db) -> dict:
+    return await run_resume_analysis(db, **payload)
+
 class ResumeTextRequest(BaseModel):
     resume_text: str
     job_description: Optional[str] = None
 
-@router.post("/analyze-resume")
+@router.post("/analyze-resume", status_code=status.HTTP_202_ACCEPTED)
 async def analyze_resume(
     resume: Optional[UploadFile] = File(None),
     resume_text: Optional[str] = Body(None),
     job_description: Optional[str] = Body(None),
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
     db: AsyncIOMotorClient = Depends(get_db) # type: ignore
 ):
     try:
@@ -171,27 +357,9 @@ async def analyze_resume(
         
         # Handle file upload
         if resume:
-            # Save resume temporarily
-            temp_path = f"uploads/temp/{resume.filename}"
-            os.makedirs("uploads/temp", exist_ok=True)
-            
-            with open(temp_path, "wb") as buffer:
-                content = await resume.read()
-                buffer.write(content)
-            
-            # Extract text from resume
-            if resume.filename.endswith('.pdf'):
-                resume_text_content = extract_text_from_pdf(temp_path)
-            elif resume.filename.endswith('.docx'):
-                resume_text_content = extract_text_from_docx(temp_path)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Unsupported file format. Please upload PDF or DOCX."
-                )
-            
-            # Clean up temporary file
-            os.remove(temp_path)
+            # Parsed from memory; identical files reuse the cached text
+            upload = await read_upload(resume)
+            resume_text_content = await text_extractor.extract(upload.data, upload.kind, upload.sha256, db)
         # Handle direct text input
         elif resume_text:
             resume_text_content = resume_text
@@ -201,65 +369,19 @@ async def analyze_resume(
                 detail="Either resume file or resume text must be provided."
             )
         
-        # Generate resume summary using Hugging Face
-        summary = ""
-        if summarizer:
-            try:
-                summary_result = summarizer(resume_text_content, max_length=150, min_length=50, do_sample=False)
-                summary = summary_result[0]["summary_text"]
-            except Exception as e:
-                logger.error(f"Error generating summary: {str(e)}")
-                summary = "Failed to generate summary"
-        else:
-            # Fallback to Ollama if configured
-            if USE_OLLAMA_AS_BACKUP:
-                summary = generate_with_ollama(f"Summarize this resume in 3-4 sentences: {resume_text_content[:1000]}")
-            else:
-                summary = "Summary generation not available"
-        
-        # Calculate match score if job description is provided
-        match_score = None
-        if job_description:
-            match_score = calculate_resume_match_score(resume_text_content, job_description)
-        
-        # Generate detailed analysis
-        analysis_prompt = f"""Analyze the following resume and provide insights:
-        {resume_text_content}
-        
-        Please provide:
-        1. Key skills
-        2. Experience level
-        3. Education background
-        4. Potential job matches
-        5. Areas for improvement
-        """
-        
-        raw_analysis = ""
-        model_used = "unknown"
-        
-        # Try Hugging Face first, fall back to Ollama if configured
-        raw_analysis = generate_with_huggingface(analysis_prompt)
-        if not raw_analysis and USE_OLLAMA_AS_BACKUP:
-            raw_analysis = generate_with_ollama(analysis_prompt)
-            model_used = "ollama"
-        else:
-            model_used = "huggingface"
-        
-        # Log the analysis
-        await db.ai_logs.insert_one({
-            "type": "resume_analysis",
-            "input": {"has_file": bool(resume), "has_text": bool(resume_text), "has_job_description": bool(job_description)},
-            "output": {"summary": summary, "match_score": match_score, "raw_analysis": raw_analysis},
-            "timestamp": datetime.utcnow()
-        })
-        
-        return {
-            "summary": summary,
-            "match_score": match_score,
-            "raw_analysis": raw_analysis,
-            "model_used": model_used,
-            "score": match_score if match_score is not None else 85.5  # Default score if no job description provided
-        }
+        task = await task_queue.enqueue(
+            "resume_analysis",
+            {
+                "resume_text": resume_text_content,
+                "job_description": job_description,
+                "has_file": bool(resume),
+                "has_text": bool(resume_text),
+                "owner_id": current_user.id if current_user else None
+            }
+        )
+        return serialize_task(task)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing resume: {str(e)}")
         raise HTTPException(
@@ -267,81 +389,122 @@ async def analyze_resume(
             detail="An error occurred while analyzing the resume"
         )
 
-@router.post("/generate-interview-questions")
+async def run_interview_question_generation(
+    db,
+    job_description: str,
+    resume_text: Optional[str] = None,
+    num_questions: int = 5
+) -> dict:
+    """Generate and parse multiple choice questions; runs in the task workers"""
+    prompt = f"Generate {num_questions} multiple choice interview questions based on this job description: {job_description}"
+    if resume_text:
+        prompt += f"\n\nConsider the candidate's background from this resume: {resume_text[:500]}"
+    
+    # Try Hugging Face first, fall back to Ollama if configured
+    questions_text = await run_in_threadpool(generate_with_huggingface, prompt)
+    if not questions_text and USE_OLLAMA_AS_BACKUP:
+        questions_text = await run_in_threadpool(generate_with_ollama, prompt)
+    
+    if not questions_text:
+        raise RuntimeError("Failed to generate interview questions")
+    
+    # Parse questions (simple parsing - in production you'd want more robust parsing)
+    questions = []
+    current_question = {"question": "", "options": [], "correct_answer": 0}
+    
+    lines = questions_text.split("\n")
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+            
+        if line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.", "8.", "9.", "10.")):
+            if current_question["question"]:
+                questions.append(current_question)
+            current_question = {"question": line.split(".", 1)[1].strip(), "options": [], "correct_answer": 0}
+        elif line.startswith(("a)", "b)", "c)", "d)")):
+            option = line.split(")", 1)[1].strip()
+            current_question["options"].append(option)
+            if "(correct)" in option.lower() or "(answer)" in option.lower():
+                current_question["correct_answer"] = len(current_question["options"]) - 1
+                current_question["options"][-1] = option.replace("(correct)", "").replace("(answer)", "").strip()
+    
+    if current_question["question"]:
+        questions.append(current_question)
+    
+    # Ensure we have the requested number of questions
+    if len(questions) < num_questions:
+        # Generate more questions if needed
+        additional_prompt = f"Generate {num_questions - len(questions)} more multiple choice interview questions based on this job description: {job_description}"
+        additional_questions_text = ""
+        
+        if USE_OLLAMA_AS_BACKUP:
+            additional_questions_text = await run_in_threadpool(generate_with_ollama, additional_prompt)
+        else:
+            additional_questions_text = await run_in_threadpool(generate_with_huggingface, additional_prompt)
+            
+        if additional_questions_text:
+            # Parse additional questions (similar to above)
+            # This is simplified for brevity
+            pass
+    
+    # Log the generation
+    await db.ai_logs.insert_one({
+        "type": "interview_questions",
+        "input": {"job_description": job_description[:200], "num_questions": num_questions},
+        "output": {"questions": questions},
+        "timestamp": datetime.utcnow()
+    })
+    
+    return {"questions": questions}
+
+@task_handler("interview_questions")
+async def interview_questions_task(payload: dict, db) -> dict:
+    return await run_interview_question_generation(db, **payload)
+
+@router.post("/generate-interview-questions", status_code=status.HTTP_202_ACCEPTED)
 async def generate_interview_questions(
     job_description: str,
     resume_text: Optional[str] = None,
-    num_questions: int = 5,
-    db: AsyncIOMotorClient = Depends(get_db) # type: ignore
+    num_questions: int = 5
 ):
     try:
-        prompt = f"Generate {num_questions} multiple choice interview questions based on this job description: {job_description}"
-        if resume_text:
-            prompt += f"\n\nConsider the candidate's background from this resume: {resume_text[:500]}"
-        
-        # Try Hugging Face first, fall back to Ollama if configured
-        questions_text = generate_with_huggingface(prompt)
-        if not questions_text and USE_OLLAMA_AS_BACKUP:
-            questions_text = generate_with_ollama(prompt)
-        
-        if not questions_text:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate interview questions"
-            )
-        
-        # Parse questions (simple parsing - in production you'd want more robust parsing)
-        questions = []
-        current_question = {"question": "", "options": [], "correct_answer": 0}
-        
-        lines = questions_text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.", "8.", "9.", "10.")):
-                if current_question["question"]:
-                    questions.append(current_question)
-                current_question = {"question": line.split(".", 1)[1].strip(), "options": [], "correct_answer": 0}
-            elif line.startswith(("a)", "b)", "c)", "d)")):
-                option = line.split(")", 1)[1].strip()
-                current_question["options"].append(option)
-                if "(correct)" in option.lower() or "(answer)" in option.lower():
-                    current_question["correct_answer"] = len(current_question["options"]) - 1
-                    current_question["options"][-1] = option.replace("(correct)", "").replace("(answer)", "").strip()
-        
-        if current_question["question"]:
-            questions.append(current_question)
-        
-        # Ensure we have the requested number of questions
-        if len(questions) < num_questions:
-            # Generate more questions if needed
-            additional_prompt = f"Generate {num_questions - len(questions)} more multiple choice interview questions based on this job description: {job_description}"
-            additional_questions_text = ""
-            
-            if USE_OLLAMA_AS_BACKUP:
-                additional_questions_text = generate_with_ollama(additional_prompt)
-            else:
-                additional_questions_text = generate_with_huggingface(additional_prompt)
-                
-            if additional_questions_text:
-                # Parse additional questions (similar to above)
-                # This is simplified for brevity
-                pass
-        
-        # Log the generation
-        await db.ai_logs.insert_one({
-            "type": "interview_questions",
-            "input": {"job_description": job_description[:200], "num_questions": num_questions},
-            "output": {"questions": questions},
-            "timestamp": datetime.utcnow()
-        })
-        
-        return {"questions": questions}
+        task = await task_queue.enqueue(
+            "interview_questions",
+            {
+                "job_description": job_description,
+                "resume_text": resume_text,
+                "num_questions": num_questions
+            }
+        )
+        return serialize_task(task)
     except Exception as e:
         logger.error(f"Error generating interview questions: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while generating interview questions"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/tasks/{task_id}", response_model=TaskResponse)
+async def get_task_status(task_id: str):
+    """Poll the status and, once completed, the result of a background AI task"""
+    task = await task_queue.get(task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    return serialize_task(task)
+
+@router.get("/models/status")
+async def get_model_status():
+    """Whether the local fallback model is loaded, still loading or has failed to load"""
+    return {
+        "text_generator": text_generator is not None,
+        "fallback_model": {
+            "model": fallback_model.model_name,
+            "status": fallback_model.status,
+            "attempts": fallback_model.attempts,
+            "last_error": fallback_model.last_error
+        }
+    }
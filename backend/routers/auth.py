@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -15,6 +15,7 @@ from bson import ObjectId
 from pydantic import BaseModel
 from core.config import settings
 from core.logging import setup_logger
+from core.uploads import safe_filename, save_upload
 
 load_dotenv()
 
@@ -24,6 +25,7 @@ logger = setup_logger("auth")
 # Security configuration
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 # JWT configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")
@@ -81,6 +83,18 @@ async def get_current_user(
     
     return UserResponse(**user)
 
+async def get_optional_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+) -> Optional[UserResponse]:
+    """The signed-in user, or None for anonymous requests and invalid tokens"""
+    if not token:
+        return None
+    try:
+        return await get_current_user(token, db)
+    except HTTPException:
+        return None
+
 # Role-based access control
 async def get_current_admin(
     current_user: UserResponse = Depends(get_current_user)
@@ -105,6 +119,7 @@ async def get_current_recruiter(
 # Routes
 @router.post("/register")
 async def register(
+    background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -129,16 +144,22 @@ async def register(
     
     # Save resume file if provided
     if resume:
-        resume_path = f"uploads/resumes/{email}_{resume.filename}"
-        os.makedirs("uploads/resumes", exist_ok=True)
-        with open(resume_path, "wb") as buffer:
-            content = await resume.read()
-            buffer.write(content)
-        user["resume_path"] = resume_path
+        stored = await save_upload(resume, "resumes", safe_filename(email))
+        user["resume_path"] = stored.key
+        user["resume_sha256"] = stored.sha256
     
     result = await db.users.insert_one(user)
     user["_id"] = str(result.inserted_id)
     
+    if resume:
+        # Imported here: routers.ai loads the AI models at import time
+        from app.indexing import index_candidate_resume
+        from routers.ai import load_resume_text
+        background_tasks.add_task(
+            index_candidate_resume, db, user["_id"],
+            {"resume_path": user["resume_path"], "resume_sha256": user["resume_sha256"]}, load_resume_text
+        )
+    
     # Create access token
     access_token = create_access_token(
         data={"sub": user["email"], "role": user["role"]},
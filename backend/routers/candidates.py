@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Query
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
@@ -9,10 +9,15 @@ import aiohttp
 import json
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import PyPDF2
-import io
 import logging
 from routers.auth import get_current_user
+from core.hedging import hedged_call
+from core.responses import MongoJSONResponse
+from core.uploads import save_upload
+from app.matching import matching_engine
+from app.indexing import index_candidate_resume
+from app.recommendations import RECOMMENDATIONS_PER_CANDIDATE, get_recommendations
+from routers.ai import load_resume_text
 
 from models.job import JobApplication
 from models.user import UserResponse, UserRole
@@ -26,40 +31,41 @@ logger = logging.getLogger(__name__)
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 OLLAMA_API_URL = os.getenv("OLLAMA_API_URL")
 
-async def analyze_resume_with_ai(resume_text: str, job_description: str) -> tuple:
-    """Analyze resume using AI and return score and summary"""
+def _parse_score_and_summary(response_text: str) -> Optional[tuple]:
+    """Parse the "Score: <n> ... Summary: <text>" format requested from the LLM"""
+    try:
+        score = float(response_text.split("Score:")[1].split()[0])
+        summary = response_text.split("Summary:")[1].strip()
+        return score, summary
+    except:
+        return None
+
+async def _analyze_with_ollama(prompt: str) -> Optional[tuple]:
     try:
-        # Try Ollama first
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 f"{OLLAMA_API_URL}/api/generate",
                 json={
                     "model": "llama2",
-                    "prompt": f"Analyze this resume against the job description and provide a score (0-100) and a brief summary. Resume: {resume_text[:1000]} Job Description: {job_description[:1000]}",
+                    "prompt": prompt,
                     "stream": False
                 }
             ) as response:
                 if response.status == 200:
                     result = await response.json()
-                    response_text = result.get("response", "")
-                    # Parse score and summary from response
-                    try:
-                        score = float(response_text.split("Score:")[1].split()[0])
-                        summary = response_text.split("Summary:")[1].strip()
-                        return score, summary
-                    except:
-                        pass
+                    return _parse_score_and_summary(result.get("response", ""))
     except Exception as e:
         print(f"Ollama error: {str(e)}")
-    
-    # Fallback to Hugging Face
+    return None
+
+async def _analyze_with_huggingface(prompt: str) -> Optional[tuple]:
     try:
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 "https://api-inference.huggingface.co/models/gpt2",
                 headers={"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"},
                 json={
-                    "inputs": f"Analyze this resume against the job description and provide a score (0-100) and a brief summary. Resume: {resume_text[:1000]} Job Description: {job_description[:1000]}",
+                    "inputs": prompt,
                     "parameters": {
                         "max_length": 500,
                         "temperature": 0.7
@@ -68,38 +74,33 @@ async def analyze_resume_with_ai(resume_text: str, job_description: str) -> tupl
             ) as response:
                 if response.status == 200:
                     result = await response.json()
-                    response_text = result[0].get("generated_text", "")
-                    try:
-                        score = float(response_text.split("Score:")[1].split()[0])
-                        summary = response_text.split("Summary:")[1].strip()
-                        return score, summary
-                    except:
-                        pass
+                    return _parse_score_and_summary(result[0].get("generated_text", ""))
     except Exception as e:
         print(f"Hugging Face error: {str(e)}")
+    return None
+
+async def analyze_resume_with_ai(resume_text: str, job_description: str) -> tuple:
+    """Analyze resume using AI and return score and summary"""
+    prompt = f"Analyze this resume against the job description and provide a score (0-100) and a brief summary. Resume: {resume_text[:1000]} Job Description: {job_description[:1000]}"
+    result = await hedged_call(
+        "resume_analysis",
+        lambda: _analyze_with_ollama(prompt),
+        lambda: _analyze_with_huggingface(prompt)
+    )
+    if result:
+        return result
     
-    # Fallback to basic TF-IDF scoring
-    vectorizer = TfidfVectorizer()
+    # Fallback to basic TF-IDF scoring, using corpus-level IDF weights when available
     try:
+        if matching_engine.fitted:
+            return matching_engine.score(resume_text, job_description), "Basic resume analysis completed."
+        vectorizer = TfidfVectorizer()
         tfidf_matrix = vectorizer.fit_transform([resume_text, job_description])
         score = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0] * 100
         return score, "Basic resume analysis completed."
     except:
         return 0, "Unable to analyze resume."
 
-async def extract_text_from_pdf(pdf_file: UploadFile) -> str:
-    """Extract text from PDF file"""
-    try:
-        content = await pdf_file.read()
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        print(f"PDF extraction error: {str(e)}")
-        return ""
-
 async def get_db():
     client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
     db = client[os.getenv("MONGODB_DB_NAME")]
@@ -201,6 +202,7 @@ async def update_candidate_profile(
 
 @router.post("/resume")
 async def update_resume(
+    background_tasks: BackgroundTasks,
     resume: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
     db: AsyncIOMotorClient = Depends(get_db)
@@ -214,17 +216,17 @@ async def update_resume(
     
     try:
         # Save resume file
-        resume_path = f"uploads/resumes/{current_user['id']}_{resume.filename}"
-        os.makedirs("uploads/resumes", exist_ok=True)
-        
-        with open(resume_path, "wb") as buffer:
-            content = await resume.read()
-            buffer.write(content)
+        stored = await save_upload(resume, "resumes", current_user["id"])
+        resume_path = stored.key
         
         # Update user record
         result = await db.users.update_one(
             {"_id": ObjectId(current_user["id"])},
-            {"$set": {"resume_path": resume_path, "resume_updated_at": datetime.utcnow()}}
+            {
+                "$set": {"resume_path": resume_path, "resume_sha256": stored.sha256, "resume_updated_at": datetime.utcnow()},
+                # Stale until the background task stores the new text
+                "$unset": {"resume_text": ""}
+            }
         )
         
         if result.modified_count == 0:
@@ -233,6 +235,12 @@ async def update_resume(
                 detail="Candidate not found"
             )
         
+        # Parse and index the new resume after the response is sent
+        background_tasks.add_task(
+            index_candidate_resume, db, current_user["id"],
+            {"resume_path": resume_path, "resume_sha256": stored.sha256}, load_resume_text
+        )
+        
         return {"message": "Resume updated successfully"}
     except HTTPException:
         raise
@@ -362,12 +370,8 @@ async def get_candidate_applications(
         
         applications = await db.applications.aggregate(pipeline).to_list(length=100)
         
-        # Convert ObjectId to string
-        for app in applications:
-            app["_id"] = str(app["_id"])
-            app["job_id"] = str(app["job_id"])
-        
-        return applications
+        # Raw documents go straight to orjson (ObjectIds included)
+        return MongoJSONResponse(applications)
     except Exception as e:
         logger.error(f"Error getting applications: {str(e)}")
         raise HTTPException(
@@ -375,6 +379,28 @@ async def get_candidate_applications(
             detail="An error occurred while retrieving applications"
         )
 
+@router.get("/recommended-jobs")
+async def get_recommended_jobs(
+    limit: int = Query(RECOMMENDATIONS_PER_CANDIDATE, ge=1, le=RECOMMENDATIONS_PER_CANDIDATE),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorClient = Depends(get_db)
+):
+    """Get the candidate's precomputed job recommendations, best match first"""
+    if current_user["role"] != "candidate":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view recommendations"
+        )
+    
+    try:
+        return await get_recommendations(db, current_user["id"], limit)
+    except Exception as e:
+        logger.error(f"Error getting recommended jobs: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An error occurred while retrieving recommendations"
+        )
+
 @router.get("/interviews")
 async def get_candidate_interviews(
     current_user: dict = Depends(get_current_user),
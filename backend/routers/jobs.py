@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, Request
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
@@ -10,10 +10,18 @@ import json
 
 from models.job import (
     JobCreate, JobUpdate, JobResponse, JobSearch,
-    JobStatus, JobInDB
+    JobStatus, JobInDB, JOB_FIELDS, JOB_LIST_FIELDS
 )
 from models.user import UserResponse, UserRole
 from routers.auth import get_current_user, get_current_recruiter, get_database
+from core.coalescing import coalescer
+from core.database import shared_database
+from core.hedging import hedged_call
+from core.http_cache import response_cache
+from core.projection import parse_fields
+from app.indexing import index_job, index_job_inline, job_index_fields, unindex_job
+from app.job_facets import find_jobs_with_facets
+from app.matching import record_deletion
 
 load_dotenv()
 
@@ -23,16 +31,15 @@ router = APIRouter()
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 OLLAMA_API_URL = os.getenv("OLLAMA_API_URL")
 
-async def generate_jd_with_ai(title: str, requirements: List[str]) -> str:
-    """Generate job description using AI (Hugging Face or Ollama)"""
+async def _generate_jd_with_ollama(prompt: str) -> str:
+    """Generate a job description with the local Ollama server"""
     try:
-        # Try Ollama first
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 f"{OLLAMA_API_URL}/api/generate",
                 json={
                     "model": "llama2",
-                    "prompt": f"Generate a professional job description for the role of {title}. Requirements: {', '.join(requirements)}",
+                    "prompt": prompt,
                     "stream": False
                 }
             ) as response:
@@ -41,15 +48,17 @@ async def generate_jd_with_ai(title: str, requirements: List[str]) -> str:
                     return result.get("response", "")
     except Exception as e:
         print(f"Ollama error: {str(e)}")
-    
-    # Fallback to Hugging Face
+    return ""
+
+async def _generate_jd_with_huggingface(prompt: str) -> str:
+    """Generate a job description with the Hugging Face inference API"""
     try:
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 "https://api-inference.huggingface.co/models/gpt2",
                 headers={"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"},
                 json={
-                    "inputs": f"Generate a professional job description for the role of {title}. Requirements: {', '.join(requirements)}",
+                    "inputs": prompt,
                     "parameters": {
                         "max_length": 500,
                         "temperature": 0.7
@@ -61,114 +70,206 @@ async def generate_jd_with_ai(title: str, requirements: List[str]) -> str:
                     return result[0].get("generated_text", "")
     except Exception as e:
         print(f"Hugging Face error: {str(e)}")
-    
     return ""
 
+async def generate_jd_with_ai(title: str, requirements: List[str]) -> str:
+    """Generate job description using AI (Ollama, hedged or falling back to Hugging Face)"""
+    prompt = f"Generate a professional job description for the role of {title}. Requirements: {', '.join(requirements)}"
+    description = await hedged_call(
+        "job_description",
+        lambda: _generate_jd_with_ollama(prompt),
+        lambda: _generate_jd_with_huggingface(prompt)
+    )
+    return description or ""
+
+class LazyDatabase:
+    """Connects on first use, so requests answered from the response cache never open a client"""
+    def __init__(self):
+        self._client = None
+        self._db = None
+
+    def __getattr__(self, name: str):
+        if self._db is None:
+            self._client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+            self._db = self._client[os.getenv("MONGODB_DB_NAME")]
+        return getattr(self._db, name)
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+
 async def get_db():
-    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
-    db = client[os.getenv("MONGODB_DB_NAME")]
+    db = LazyDatabase()
     try:
         yield db
     finally:
-        client.close()
+        db.close()
 
 @router.get("/")
 async def get_jobs(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     job_type: Optional[str] = None,
-    db: AsyncIOMotorClient = Depends(get_db)
+    location: Optional[str] = None,
+    experience_level: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return instead of the list summary"),
+    facets: bool = Query(False, description="Include job counts by type, location and experience level")
 ):
-    # Build query
-    query = {}
-    if search:
-        query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"company": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
-    if job_type:
-        query["type"] = job_type
-    
-    # Get total count
-    total = await db.jobs.count_documents(query)
+    # Long descriptions stay in Mongo unless asked for
+    projection = parse_fields(fields, JOB_FIELDS, JOB_LIST_FIELDS)
     
-    # Get jobs
-    cursor = db.jobs.find(query).skip(skip).limit(limit)
-    jobs = await cursor.to_list(length=limit)
+    async def build():
+        # Coalesced: other requests may be waiting on this fetch, so it uses the
+        # process-wide client (opened on first use, so cache hits never connect)
+        db = shared_database()
+        
+        # Build query
+        query = {}
+        if search:
+            query["$or"] = [
+                {"title": {"$regex": search, "$options": "i"}},
+                {"company": {"$regex": search, "$options": "i"}},
+                {"description": {"$regex": search, "$options": "i"}}
+            ]
+        if job_type:
+            query["type"] = job_type
+        if location:
+            query["location"] = location
+        if experience_level:
+            query["experience_level"] = experience_level
+        
+        # Facets (and the total) depend only on the filter, so every page of a
+        # popular search shares them; a miss computes them with the page in one $facet
+        facet_counts = None
+        if facets:
+            facet_params = {"facets_for": filters}
+            version, cached = await response_cache.get_value("jobs", facet_params)
+            if cached is None:
+                total, jobs, facet_counts = await find_jobs_with_facets(db, query, projection, skip, limit)
+                await response_cache.set_value("jobs", facet_params, version, {"total": total, "facets": facet_counts})
+            else:
+                total, facet_counts = cached["total"], cached["facets"]
+                jobs = await db.jobs.find(query, projection).skip(skip).limit(limit).to_list(length=limit)
+        else:
+            # Get total count
+            total = await db.jobs.count_documents(query)
+            
+            # Get jobs
+            cursor = db.jobs.find(query, projection).skip(skip).limit(limit)
+            jobs = await cursor.to_list(length=limit)
+        
+        response = {
+            "total": total,
+            "jobs": jobs
+        }
+        if facet_counts is not None:
+            response["facets"] = facet_counts
+        return response
     
-    # Convert ObjectId to string
-    for job in jobs:
-        job["_id"] = str(job["_id"])
-    
-    return {
-        "total": total,
-        "jobs": jobs
-    }
+    filters = {"search": search or None, "job_type": job_type, "location": location, "experience_level": experience_level}
+    params = {**filters, "skip": skip, "limit": limit, "fields": list(projection), "facets": facets}
+    # Concurrent misses for the same page share one query
+    return await response_cache.respond(request, "jobs", params, lambda: coalescer.run("jobs.list", params, build))
 
 @router.get("/{job_id}")
-async def get_job(job_id: str, db: AsyncIOMotorClient = Depends(get_db)):
-    try:
-        job = await db.jobs.find_one({"_id": ObjectId(job_id)})
-        if not job:
+async def get_job(
+    request: Request,
+    job_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return instead of the whole job")
+):
+    projection = parse_fields(fields, JOB_FIELDS, JOB_FIELDS) if fields else None
+    
+    async def build():
+        try:
+            # Coalesced: uses the process-wide client rather than one tied to this request
+            job = await shared_database().jobs.find_one({"_id": ObjectId(job_id)}, projection)
+            if not job:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Job not found"
+                )
+            return job
+        except Exception as e:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Job not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid job ID"
             )
-        job["_id"] = str(job["_id"])
-        return job
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid job ID"
-        )
+    
+    params = {"job_id": job_id, "fields": list(projection) if projection else None}
+    # A popular posting is fetched once however many requests arrive while it loads
+    return await response_cache.respond(request, "jobs", params, lambda: coalescer.run("jobs.get", params, build))
 
 @router.post("/")
 async def create_job(
     job: dict,
+    background_tasks: BackgroundTasks,
     db: AsyncIOMotorClient = Depends(get_db)
 ):
     job["created_at"] = datetime.utcnow()
-    result = await db.jobs.insert_one(job)
-    job["_id"] = str(result.inserted_id)
+    job_id = ObjectId()
+    job.update(job_index_fields(job))
+    job["_id"] = job_id
+    await db.jobs.insert_one(job)
+    # Only indexed once stored, so a failed insert leaves no phantom job in the match index
+    index_job_inline(str(job_id), job)
+    await response_cache.invalidate("jobs")
+    job["_id"] = str(job_id)
+    background_tasks.add_task(index_job, db, job["_id"], job)
     return job
 
 @router.put("/{job_id}")
 async def update_job(
     job_id: str,
     job_update: dict,
+    background_tasks: BackgroundTasks,
     db: AsyncIOMotorClient = Depends(get_db)
 ):
     try:
         result = await db.jobs.update_one(
             {"_id": ObjectId(job_id)},
-            {"$set": job_update}
+            {"$set": {**job_update, "updated_at": datetime.utcnow()}}
         )
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Job not found"
-            )
-        return {"message": "Job updated successfully"}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid job ID"
         )
+    if result.modified_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    # The job is saved; the index follows it rather than failing the request
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    if job:
+        fields = job_index_fields(job)
+        await db.jobs.update_one({"_id": ObjectId(job_id)}, {"$set": fields})
+        index_job_inline(job_id, {**job, **fields})
+        background_tasks.add_task(index_job, db, job_id, job)
+    await response_cache.invalidate("jobs")
+    return {"message": "Job updated successfully"}
 
 @router.delete("/{job_id}")
-async def delete_job(job_id: str, db: AsyncIOMotorClient = Depends(get_db)):
+async def delete_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncIOMotorClient = Depends(get_db)
+):
     try:
         result = await db.jobs.delete_one({"_id": ObjectId(job_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Job not found"
-            )
-        return {"message": "Job deleted successfully"}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid job ID"
-        ) 
\ No newline at end of file
+        )
+    if result.deleted_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    await record_deletion(db, "job", job_id)
+    await response_cache.invalidate("jobs")
+    background_tasks.add_task(unindex_job, db, job_id)
+    return {"message": "Job deleted successfully"}
\ No newline at end of file
@@ -1,67 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 from datetime import datetime
+from pathlib import Path
 import os
 from dotenv import load_dotenv
 import aiohttp
 import json
 
-from models.job import JobApplication
+from models.job import JobApplication, JOB_LIST_FIELDS
 from models.interview import InterviewCreate, InterviewResponse, InterviewStatus
 from models.user import UserResponse, UserRole
 from routers.auth import get_current_recruiter, get_database
+from core.hedging import hedged_call
+from core.http_cache import response_cache
+from core.task_queue import task_queue, task_handler, serialize_task
+from models.task import TaskPriority
+from core.config import settings
+from core.storage import get_storage
+from core.uploads import CONTENT_TYPES, EXTENSIONS, iter_documents
+from app.matching import job_document_text, ensure_matching_engine
+from app.embeddings import embeddings_enabled, semantic_index
+from app.skill_search import QueryError, skill_index
+from app.duplicates import duplicate_clusters, find_duplicate_candidates
+from app.bulk_ingest import ingest_documents
+from app.extraction import text_extractor
+from starlette.concurrency import run_in_threadpool
+from routers.ai import load_resume_text
 
 load_dotenv()
 
 router = APIRouter()
 
+# Jobs embedded in application and interview lists
+JOB_SUMMARY_PROJECTION = {field: 1 for field in JOB_LIST_FIELDS}
+
 # AI Service configuration
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 OLLAMA_API_URL = os.getenv("OLLAMA_API_URL")
 
-async def generate_interview_questions(job_description: str, resume_text: str, num_questions: int = 10) -> List[dict]:
-    """Generate interview questions using AI"""
+def _parse_questions(response_text: str, num_questions: int) -> List[dict]:
+    """Parse multiple choice questions separated by blank lines from an LLM response"""
+    questions = []
+    for q in response_text.split("\n\n"):
+        if "?" in q:
+            question_text = q.split("?")[0] + "?"
+            options = [opt.strip() for opt in q.split("?")[1].split("\n") if opt.strip()]
+            if len(options) >= 4:
+                questions.append({
+                    "text": question_text,
+                    "type": "multiple_choice",
+                    "options": options[:4],
+                    "correct_answer": options[0]  # Assuming first option is correct
+                })
+    return questions[:num_questions]
+
+async def _questions_from_ollama(prompt: str, num_questions: int) -> List[dict]:
     try:
-        # Try Ollama first
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 f"{OLLAMA_API_URL}/api/generate",
                 json={
                     "model": "llama2",
-                    "prompt": f"Generate {num_questions} multiple choice interview questions based on this job description and resume. Job: {job_description[:1000]} Resume: {resume_text[:1000]}",
+                    "prompt": prompt,
                     "stream": False
                 }
             ) as response:
                 if response.status == 200:
                     result = await response.json()
-                    response_text = result.get("response", "")
-                    # Parse questions from response
-                    questions = []
-                    for q in response_text.split("\n\n"):
-                        if "?" in q:
-                            question_text = q.split("?")[0] + "?"
-                            options = [opt.strip() for opt in q.split("?")[1].split("\n") if opt.strip()]
-                            if len(options) >= 4:
-                                questions.append({
-                                    "text": question_text,
-                                    "type": "multiple_choice",
-                                    "options": options[:4],
-                                    "correct_answer": options[0]  # Assuming first option is correct
-                                })
-                    return questions[:num_questions]
+                    return _parse_questions(result.get("response", ""), num_questions)
     except Exception as e:
         print(f"Ollama error: {str(e)}")
-    
-    # Fallback to Hugging Face
+    return []
+
+async def _questions_from_huggingface(prompt: str, num_questions: int) -> List[dict]:
     try:
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 "https://api-inference.huggingface.co/models/gpt2",
                 headers={"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"},
                 json={
-                    "inputs": f"Generate {num_questions} multiple choice interview questions based on this job description and resume. Job: {job_description[:1000]} Resume: {resume_text[:1000]}",
+                    "inputs": prompt,
                     "parameters": {
                         "max_length": 1000,
                         "temperature": 0.7
@@ -70,23 +91,21 @@ async def generate_interview_questions(job_description: str, resume_text: str, n
             ) as response:
                 if response.status == 200:
                     result = await response.json()
-                    response_text = result[0].get("generated_text", "")
-                    # Parse questions from response
-                    questions = []
-                    for q in response_text.split("\n\n"):
-                        if "?" in q:
-                            question_text = q.split("?")[0] + "?"
-                            options = [opt.strip() for opt in q.split("?")[1].split("\n") if opt.strip()]
-                            if len(options) >= 4:
-                                questions.append({
-                                    "text": question_text,
-                                    "type": "multiple_choice",
-                                    "options": options[:4],
-                                    "correct_answer": options[0]  # Assuming first option is correct
-                                })
-                    return questions[:num_questions]
+                    return _parse_questions(result[0].get("generated_text", ""), num_questions)
     except Exception as e:
         print(f"Hugging Face error: {str(e)}")
+    return []
+
+async def generate_interview_questions(job_description: str, resume_text: str, num_questions: int = 10) -> List[dict]:
+    """Generate interview questions using AI"""
+    prompt = f"Generate {num_questions} multiple choice interview questions based on this job description and resume. Job: {job_description[:1000]} Resume: {resume_text[:1000]}"
+    questions = await hedged_call(
+        "interview_questions",
+        lambda: _questions_from_ollama(prompt, num_questions),
+        lambda: _questions_from_huggingface(prompt, num_questions)
+    )
+    if questions:
+        return questions
     
     # Return default questions if AI fails
     return [
@@ -103,6 +122,34 @@ async def generate_interview_questions(job_description: str, resume_text: str, n
         }
     ] * num_questions
 
+@task_handler("scheduled_interview_questions")
+async def scheduled_interview_questions_task(payload: dict, db) -> dict:
+    """Generate the questions for a scheduled interview and store them on it"""
+    questions = await generate_interview_questions(
+        payload["job_description"],
+        payload["resume_text"],
+        payload["num_questions"]
+    )
+    await db.interviews.update_one(
+        {"_id": ObjectId(payload["interview_id"])},
+        {
+            "$set": {
+                "questions": questions,
+                "questions_status": "ready",
+                "updated_at": datetime.utcnow()
+            }
+        }
+    )
+    return {"interview_id": payload["interview_id"], "total_questions": len(questions)}
+
+async def _attach_resume_urls(candidates: List[dict]) -> None:
+    """Replace each candidate's resume_path with a download URL (None on backends without one)"""
+    keys = [c["resume_path"] for c in candidates if c.get("resume_path")]
+    urls = await get_storage().urls(keys, settings.PRESIGNED_URL_EXPIRY) if keys else {}
+    for candidate in candidates:
+        path = candidate.pop("resume_path", None)
+        candidate["resume_url"] = urls.get(path) if path else None
+
 @router.get("/applications")
 async def get_applications(
     job_id: Optional[str] = None,
@@ -113,7 +160,7 @@ async def get_applications(
     query = {}
     
     # Get jobs posted by the recruiter
-    recruiter_jobs = await db.jobs.find({"recruiter_id": current_user.id}).to_list(length=100)
+    recruiter_jobs = await db.jobs.find({"recruiter_id": current_user.id}, {"_id": 1}).to_list(length=100)
     job_ids = [str(job["_id"]) for job in recruiter_jobs]
     query["job_id"] = {"$in": job_ids}
     
@@ -125,7 +172,7 @@ async def get_applications(
     
     # Get job and candidate details for each application
     for app in applications:
-        job = await db.jobs.find_one({"_id": ObjectId(app["job_id"])})
+        job = await db.jobs.find_one({"_id": ObjectId(app["job_id"])}, JOB_SUMMARY_PROJECTION)
         if job:
             app["job"] = job
         
@@ -134,11 +181,372 @@ async def get_applications(
             app["candidate"] = {
                 "id": str(candidate["_id"]),
                 "email": candidate["email"],
-                "full_name": candidate["full_name"]
+                "full_name": candidate["full_name"],
+                "resume_path": candidate.get("resume_path")
             }
     
+    # One batch of (mostly cached) presigned links for the whole page
+    await _attach_resume_urls([app["candidate"] for app in applications if "candidate" in app])
     return applications
 
+@router.get("/jobs/{job_id}/ranked-applicants")
+async def get_ranked_applicants(
+    job_id: str,
+    top_k: int = Query(10, ge=1, le=500),
+    current_user: UserResponse = Depends(get_current_recruiter),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+):
+    """Rank every applicant for a job by resume match score and return the top_k"""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID"
+        )
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job.get("recruiter_id") != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # Applications store job_id either as an ObjectId or as a string
+    applications = await db.applications.find(
+        {"job_id": {"$in": [ObjectId(job_id), job_id]}},
+        {"candidate_id": 1}
+    ).to_list(length=None)
+    candidate_ids = {str(app["candidate_id"]) for app in applications}
+    
+    engine = await ensure_matching_engine(db, load_resume_text, Path(settings.MATCHING_INDEX_DIR))
+    ranked = []
+    if engine.fitted and candidate_ids:
+        ranked = engine.rank_applicants(
+            job_id=job_id,
+            job_text=job_document_text(job),
+            candidate_ids=candidate_ids,
+            top_k=top_k
+        )
+    
+    candidates = await db.users.find(
+        {"_id": {"$in": [ObjectId(candidate_id) for candidate_id, _ in ranked]}},
+        {"email": 1, "full_name": 1, "resume_path": 1}
+    ).to_list(length=top_k)
+    await _attach_resume_urls(candidates)
+    candidates_by_id = {str(c["_id"]): c for c in candidates}
+    
+    return {
+        "job_id": job_id,
+        "total_applicants": len(candidate_ids),
+        "applicants": [
+            {
+                "candidate_id": candidate_id,
+                "email": candidates_by_id.get(candidate_id, {}).get("email"),
+                "full_name": candidates_by_id.get(candidate_id, {}).get("full_name"),
+                "resume_url": candidates_by_id.get(candidate_id, {}).get("resume_url"),
+                "match_score": score
+            }
+            for candidate_id, score in ranked
+        ]
+    }
+
+@router.get("/jobs/{job_id}/similar-candidates")
+async def get_similar_candidates(
+    job_id: str,
+    top_k: int = Query(10, ge=1, le=100),
+    current_user: UserResponse = Depends(get_current_recruiter),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+):
+    """Find the candidates (applicants or not) whose resumes are semantically closest to a job"""
+    if not embeddings_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Semantic matching is disabled"
+        )
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID"
+        )
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job.get("recruiter_id") != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # No-op when the job's embedding is already cached for its current text
+    await run_in_threadpool(semantic_index.upsert, "job", job_id, job_document_text(job))
+    ranked = await run_in_threadpool(semantic_index.top_candidates_for_job, job_id, top_k)
+    
+    candidates = await db.users.find(
+        {"_id": {"$in": [ObjectId(candidate_id) for candidate_id, _ in ranked]}},
+        {"email": 1, "full_name": 1}
+    ).to_list(length=top_k)
+    candidates_by_id = {str(c["_id"]): c for c in candidates}
+    
+    return {
+        "job_id": job_id,
+        "candidates": [
+            {
+                "candidate_id": candidate_id,
+                "email": candidates_by_id.get(candidate_id, {}).get("email"),
+                "full_name": candidates_by_id.get(candidate_id, {}).get("full_name"),
+                "similarity": score
+            }
+            for candidate_id, score in ranked
+        ]
+    }
+
+@router.get("/candidates/search")
+async def search_candidates(
+    q: str = Query(..., description='Boolean skill query, e.g. python AND (django OR flask) AND NOT php'),
+    min_experience: Optional[float] = Query(None, ge=0),
+    max_experience: Optional[float] = Query(None, ge=0),
+    job_id: Optional[str] = None,
+    top_k: int = Query(20, ge=1, le=200),
+    current_user: UserResponse = Depends(get_current_recruiter),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+):
+    """
+    Search every candidate by skills and years of experience. Results are ranked
+    by resume match score against `job_id` when given, otherwise by how many of
+    the queried skills each candidate has.
+    """
+    match_scores = None
+    if job_id:
+        if not ObjectId.is_valid(job_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid job ID"
+            )
+        job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        engine = await ensure_matching_engine(db, load_resume_text, Path(settings.MATCHING_INDEX_DIR))
+        if engine.fitted:
+            job_text = job_document_text(job)
+            match_scores = lambda candidate_ids: engine.applicant_scores(candidate_ids, job_id, job_text)
+    
+    # Kept in sync by the maintain_skill_index task started with the app
+    try:
+        total, ranked = skill_index.search(q, min_experience, max_experience, match_scores, top_k)
+    except QueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    candidates = await db.users.find(
+        {"_id": {"$in": [ObjectId(candidate_id) for candidate_id, _ in ranked]}},
+        {"email": 1, "full_name": 1, "skills": 1, "experience_years": 1}
+    ).to_list(length=top_k)
+    candidates_by_id = {str(c["_id"]): c for c in candidates}
+    
+    return {
+        "query": q,
+        "total": total,
+        "candidates": [
+            {
+                "candidate_id": candidate_id,
+                "email": candidates_by_id.get(candidate_id, {}).get("email"),
+                "full_name": candidates_by_id.get(candidate_id, {}).get("full_name"),
+                "skills": candidates_by_id.get(candidate_id, {}).get("skills", []),
+                "experience_years": candidates_by_id.get(candidate_id, {}).get("experience_years"),
+                "score": score
+            }
+            for candidate_id, score in ranked
+        ]
+    }
+
+@router.get("/candidates/{candidate_id}/duplicates")
+async def get_duplicate_candidates(
+    candidate_id: str,
+    current_user: UserResponse = Depends(get_current_recruiter),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+):
+    """Other candidate accounts whose resume is a near-duplicate of this candidate's"""
+    if not ObjectId.is_valid(candidate_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid candidate ID"
+        )
+    candidate = await db.users.find_one({"_id": ObjectId(candidate_id), "role": "candidate"}, {"minhash": 1})
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    if not candidate.get("minhash"):
+        return {"candidate_id": candidate_id, "duplicates": []}
+    
+    duplicates = await find_duplicate_candidates(db, candidate["minhash"], exclude_id=candidate_id)
+    users = await db.users.find(
+        {"_id": {"$in": [ObjectId(duplicate_id) for duplicate_id, _ in duplicates]}},
+        {"email": 1, "full_name": 1}
+    ).to_list(length=None)
+    users_by_id = {str(u["_id"]): u for u in users}
+    
+    return {
+        "candidate_id": candidate_id,
+        "duplicates": [
+            {
+                "candidate_id": duplicate_id,
+                "email": users_by_id.get(duplicate_id, {}).get("email"),
+                "full_name": users_by_id.get(duplicate_id, {}).get("full_name"),
+                "similarity": score
+            }
+            for duplicate_id, score in duplicates
+        ]
+    }
+
+@router.get("/jobs/{job_id}/duplicate-applicants")
+async def get_duplicate_applicants(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_recruiter),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+):
+    """Group a job's applicants into clusters whose resumes are near-duplicates"""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID"
+        )
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"recruiter_id": 1})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job.get("recruiter_id") != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # Applications store job_id either as an ObjectId or as a string
+    applications = await db.applications.find(
+        {"job_id": {"$in": [ObjectId(job_id), job_id]}},
+        {"candidate_id": 1}
+    ).to_list(length=None)
+    candidate_ids = {str(app["candidate_id"]) for app in applications}
+    
+    users = await db.users.find(
+        {"_id": {"$in": [ObjectId(candidate_id) for candidate_id in candidate_ids]}},
+        {"email": 1, "full_name": 1, "minhash": 1}
+    ).to_list(length=None)
+    users_by_id = {str(u["_id"]): u for u in users}
+    clusters = duplicate_clusters({
+        candidate_id: user["minhash"] for candidate_id, user in users_by_id.items() if user.get("minhash")
+    })
+    
+    return {
+        "job_id": job_id,
+        "total_applicants": len(candidate_ids),
+        "clusters": [
+            [
+                {
+                    "candidate_id": candidate_id,
+                    "email": users_by_id[candidate_id].get("email"),
+                    "full_name": users_by_id[candidate_id].get("full_name")
+                }
+                for candidate_id in cluster
+            ]
+            for cluster in clusters
+        ]
+    }
+
+@router.post("/jobs/{job_id}/bulk-ingest")
+async def bulk_ingest_resumes(
+    job_id: str,
+    files: List[UploadFile] = File(...),
+    current_user: UserResponse = Depends(get_current_recruiter),
+    db: AsyncIOMotorClient = Depends(get_database) # type: ignore
+):
+    """
+    Parse and score a batch of resumes (PDF/DOCX files and zip archives of
+    them) against a job. The response streams NDJSON: one line per file as it
+    is processed, then a summary with the best matches.
+    """
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID"
+        )
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job.get("recruiter_id") != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    engine = await ensure_matching_engine(db, load_resume_text, Path(settings.MATCHING_INDEX_DIR))
+    if not engine.fitted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Matching index is not ready"
+        )
+    job_text = job_document_text(job)
+    storage = get_storage()
+    ingestion_id = ObjectId()
+    
+    async def extract(data: bytes, kind: str, sha256: str) -> str:
+        return await text_extractor.extract(data, kind, sha256, db)
+    
+    async def store(sha256: str, data: bytes, kind: str) -> str:
+        # Content-addressed, so files already ingested are not uploaded again
+        key = f"bulk/{sha256}{EXTENSIONS[kind]}"
+        if not await storage.exists(key):
+            await storage.put_bytes(key, data, CONTENT_TYPES[kind])
+        return key
+    
+    async def events():
+        documents = []
+        try:
+            async for event in ingest_documents(
+                iter_documents(files),
+                extract,
+                lambda texts: engine.score_texts(texts, job_id, job_text),
+                store
+            ):
+                if event["event"] == "document":
+                    documents.append(event)
+                else:
+                    await db.bulk_ingestions.insert_one({
+                        "_id": ingestion_id,
+                        "job_id": job_id,
+                        "recruiter_id": current_user.id,
+                        "summary": {key: value for key, value in event.items() if key != "top"},
+                        "documents": documents,
+                        "created_at": datetime.utcnow()
+                    })
+                yield json.dumps(event) + "\n"
+        except HTTPException as e:
+            # The status line is already sent; report limits hit mid-stream in the body
+            yield json.dumps({"event": "error", "detail": e.detail}) + "\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"X-Ingestion-Id": str(ingestion_id)}
+    )
+
 @router.post("/applications/{application_id}/review")
 async def review_application(
     application_id: str,
@@ -200,32 +608,41 @@ async def schedule_interview(
             detail="Not enough permissions"
         )
     
-    # Get candidate's resume
-    candidate = await db.candidates.find_one({"user_id": application["candidate_id"]})
-    if not candidate or "resume_text" not in candidate:
+    # Get candidate's resume; text is stored at upload, older accounts fall back to parsing the file
+    candidate = await db.users.find_one(
+        {"_id": ObjectId(str(application["candidate_id"]))},
+        {"resume_text": 1, "resume_path": 1, "resume_sha256": 1}
+    )
+    resume_text = await load_resume_text(candidate) if candidate else ""
+    if not resume_text:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Candidate resume not found"
         )
     
-    # Generate interview questions
-    questions = await generate_interview_questions(
-        job["description"],
-        candidate["resume_text"],
-        interview.total_questions
-    )
-    
-    # Create interview
+    # Create interview; questions are generated by the task workers
     interview_dict = interview.dict()
     interview_dict["job_id"] = application["job_id"]
     interview_dict["candidate_id"] = application["candidate_id"]
     interview_dict["recruiter_id"] = current_user.id
-    interview_dict["questions"] = questions
+    interview_dict["questions"] = []
+    interview_dict["questions_status"] = "pending"
     interview_dict["created_at"] = datetime.utcnow()
     interview_dict["updated_at"] = datetime.utcnow()
     
     result = await db.interviews.insert_one(interview_dict)
     
+    task = await task_queue.enqueue(
+        "scheduled_interview_questions",
+        {
+            "interview_id": str(result.inserted_id),
+            "job_description": job["description"],
+            "resume_text": resume_text,
+            "num_questions": interview.total_questions
+        },
+        priority=TaskPriority.HIGH
+    )
+    
     # Update application status
     await db.applications.update_one(
         {"_id": ObjectId(application_id)},
@@ -242,10 +659,15 @@ async def schedule_interview(
         {"_id": ObjectId(application["job_id"])},
         {"$inc": {"total_interviews": 1}}
     )
+    await response_cache.invalidate("jobs")
     
     # TODO: Send email notification to candidate
     
-    return {"message": "Interview scheduled successfully", "interview_id": str(result.inserted_id)}
+    return {
+        "message": "Interview scheduled successfully",
+        "interview_id": str(result.inserted_id),
+        "task": serialize_task(task)
+    }
 
 @router.get("/interviews")
 async def get_interviews(
@@ -262,7 +684,7 @@ async def get_interviews(
     
     # Get job and candidate details for each interview
     for interview in interviews:
-        job = await db.jobs.find_one({"_id": ObjectId(interview["job_id"])})
+        job = await db.jobs.find_one({"_id": ObjectId(interview["job_id"])}, JOB_SUMMARY_PROJECTION)
         if job:
             interview["job"] = job
         
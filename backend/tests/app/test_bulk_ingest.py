@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.bulk_ingest import ingest_documents
+from app.matching import MatchingEngine
+
+def document(filename, text=None, error=None):
+    return SimpleNamespace(filename=filename, data=text.encode() if text else None, kind="pdf", error=error)
+
+async def aiter(items):
+    for item in items:
+        yield item
+
+@pytest.fixture
+def engine():
+    engine = MatchingEngine()
+    engine.fit(
+        {"c1": "python django postgres developer", "c2": "java spring kotlin engineer"},
+        {"job": "senior python django developer"}
+    )
+    return engine
+
+@pytest.mark.asyncio
+async def test_ingest_parses_deduplicates_and_scores(engine):
+    extracted = []
+
+    async def extract(data, kind, sha256):
+        extracted.append(sha256)
+        await asyncio.sleep(0.01 if b"slow" in data else 0)
+        return "" if b"scanned" in data else data.decode()
+
+    stored = {}
+
+    async def store(sha256, data, kind):
+        stored[sha256] = data
+        return f"bulk/{sha256}.pdf"
+
+    documents = [
+        document("a.pdf", "slow python django developer with 5 years of experience"),
+        document("b.pdf", "java spring engineer"),
+        document("copy-of-a.pdf", "slow python django developer with 5 years of experience"),
+        document("notes.txt", error="Unsupported file format. Please upload PDF or DOCX."),
+        document("scan.pdf", "scanned"),
+        document("c.pdf", "java developer"),
+    ]
+    events = [
+        event async for event in ingest_documents(
+            aiter(documents),
+            extract,
+            lambda texts: engine.score_texts(texts, job_id="job"),
+            store,
+            window=2,
+            batch_size=2
+        )
+    ]
+
+    summary = events.pop()
+    by_name = {event["filename"]: event for event in events}
+    assert len(events) == 6 and all(event["event"] == "document" for event in events)
+    assert len(extracted) == 4 and len(stored) == 4
+    assert by_name["copy-of-a.pdf"]["status"] == "duplicate"
+    assert by_name["copy-of-a.pdf"]["duplicate_of"] == "a.pdf"
+    assert by_name["notes.txt"]["status"] == "rejected"
+    assert by_name["scan.pdf"]["status"] == "failed"
+
+    a = by_name["a.pdf"]
+    assert a["status"] == "scored" and "text" not in a
+    assert sorted(a["skills"]) == ["Django", "Python"]
+    assert a["experience_years"] == 5
+    assert a["resume_key"] == f"bulk/{a['sha256']}.pdf"
+    assert a["match_score"] > by_name["c.pdf"]["match_score"] > by_name["b.pdf"]["match_score"] == 0
+
+    assert summary["event"] == "summary"
+    assert (summary["total"], summary["scored"], summary["duplicate"], summary["rejected"], summary["failed"]) == (6, 3, 1, 1, 1)
+    assert [item["filename"] for item in summary["top"]] == ["a.pdf", "c.pdf", "b.pdf"]
+
+def test_score_texts_matches_single_scores(engine):
+    texts = ["python django developer", "java engineer", ""]
+    scores = engine.score_texts(texts, job_text="senior python django developer")
+    assert isinstance(scores, np.ndarray) and len(scores) == 3
+    for text, score in zip(texts, scores):
+        assert score == pytest.approx(engine.score(text, "senior python django developer"), abs=0.01)
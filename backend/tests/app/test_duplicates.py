@@ -0,0 +1,103 @@
+import pytest
+import pytest_asyncio
+from app import duplicates
+from app.duplicates import duplicate_clusters, minhash_signature, signature_fields, similarity
+
+RESUME = (
+    "Jane Doe. Senior backend engineer with eight years building payment platforms in Python "
+    "and Go. Designed event driven services on Kafka, migrated a monolith to Kubernetes, and "
+    "cut p99 latency of the checkout API by forty percent. Led a team of five engineers, "
+    "introduced contract testing and on-call runbooks. MSc Computer Science, TU Delft."
+)
+EDITED = RESUME.replace("forty percent", "forty-two percent").replace("Jane Doe.", "Jane A. Doe.")
+OTHER = (
+    "John Smith. Graphic designer focused on brand identity for consumer startups. Figma, "
+    "Illustrator and Photoshop daily; built design systems and marketing sites; art directed "
+    "photo shoots and packaging for three product launches. BA Visual Communication."
+)
+
+def test_signatures_are_stable_and_estimate_jaccard():
+    assert minhash_signature(RESUME).tolist() == minhash_signature(RESUME).tolist()
+    assert minhash_signature("") is None
+    assert similarity(minhash_signature(RESUME), minhash_signature(EDITED)) > 0.7
+    assert similarity(minhash_signature(RESUME), minhash_signature(OTHER)) < 0.1
+    # Case and punctuation do not matter
+    assert similarity(minhash_signature(RESUME), minhash_signature(RESUME.upper().replace(",", ""))) == 1.0
+
+def test_near_duplicates_share_an_lsh_band():
+    bands = set(signature_fields(RESUME)["lsh_bands"])
+    assert bands & set(signature_fields(EDITED)["lsh_bands"])
+    assert not bands & set(signature_fields(OTHER)["lsh_bands"])
+
+def test_duplicate_clusters_are_transitive():
+    signatures = {
+        "a": signature_fields(RESUME)["minhash"],
+        "b": signature_fields(EDITED)["minhash"],
+        "c": signature_fields(EDITED.replace("five engineers", "six engineers"))["minhash"],
+        "d": signature_fields(OTHER)["minhash"],
+    }
+    clusters = duplicate_clusters(signatures, threshold=0.6)
+    assert [sorted(cluster) for cluster in clusters] == [["a", "b", "c"]]
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+@pytest_asyncio.fixture
+async def db(monkeypatch):
+    monkeypatch.setattr(duplicates, "_indexes_created", False)
+    return mongomock_motor.AsyncMongoMockClient()["test"]
+
+@pytest.mark.asyncio
+async def test_find_duplicate_candidates(db):
+    ids = {}
+    for name, text in (("jane", RESUME), ("jane2", EDITED), ("john", OTHER)):
+        ids[name] = str((await db.users.insert_one({"role": "candidate", **signature_fields(text)})).inserted_id)
+
+    found = await duplicates.find_duplicate_candidates(
+        db, signature_fields(RESUME)["minhash"], exclude_id=ids["jane"], threshold=0.6
+    )
+    assert [candidate_id for candidate_id, _ in found] == [ids["jane2"]]
+
+@pytest.mark.asyncio
+async def test_analysis_is_reused_for_identical_resumes(db):
+    assert await duplicates.find_cached_analysis(db, RESUME) is None
+    await duplicates.store_analysis(db, RESUME, {"summary": "s", "raw_analysis": "r", "model_used": "m"}, "jane")
+
+    # Identical text is reused whoever submits it
+    for owner_id in ("jane", "someone-else", None):
+        cached = await duplicates.find_cached_analysis(db, RESUME, owner_id)
+        assert cached["result"]["raw_analysis"] == "r"
+        assert cached["similarity"] == 1.0
+    assert await duplicates.find_cached_analysis(db, OTHER, "jane") is None
+
+@pytest.mark.asyncio
+async def test_near_duplicates_are_only_reused_for_the_same_owner(db, monkeypatch):
+    monkeypatch.setattr(duplicates, "DUPLICATE_THRESHOLD", 0.6)
+    await duplicates.store_analysis(db, RESUME, {"summary": "s", "raw_analysis": "r", "model_used": "m"}, "jane")
+
+    cached = await duplicates.find_cached_analysis(db, EDITED, "jane")
+    assert cached["owner_id"] == "jane"
+    assert 0.6 <= cached["similarity"] < 1.0
+    assert await duplicates.find_cached_analysis(db, EDITED, "john") is None
+    assert await duplicates.find_cached_analysis(db, EDITED) is None
+
+@pytest.mark.asyncio
+async def test_one_worker_claims_generating_an_analysis(db):
+    assert await duplicates.claim_analysis(db, RESUME, "jane")
+    # Other workers wait while the claim is live, and find nothing to reuse yet
+    assert not await duplicates.claim_analysis(db, RESUME, "john")
+    assert await duplicates.find_cached_analysis(db, RESUME, "john") is None
+
+    await duplicates.store_analysis(db, RESUME, {"summary": "s", "raw_analysis": "r", "model_used": "m"}, "jane")
+    assert not await duplicates.claim_analysis(db, RESUME, "john")
+    assert (await duplicates.find_cached_analysis(db, RESUME, "john"))["result"]["raw_analysis"] == "r"
+    assert await db.resume_analyses.count_documents({}) == 1
+
+@pytest.mark.asyncio
+async def test_released_and_abandoned_claims_are_taken_over(db, monkeypatch):
+    assert await duplicates.claim_analysis(db, RESUME, "jane")
+    await duplicates.release_analysis(db, RESUME)
+    assert await duplicates.claim_analysis(db, RESUME, "john")
+
+    monkeypatch.setattr(duplicates, "ANALYSIS_CLAIM_SECONDS", -1)
+    assert await duplicates.claim_analysis(db, RESUME, "jane")
+    assert (await db.resume_analyses.find_one({}))["owner_id"] == "jane"
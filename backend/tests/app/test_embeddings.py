@@ -0,0 +1,170 @@
+import numpy as np
+from bson import ObjectId
+import pytest
+from app.embeddings import (
+    BruteForceIndex, EmbeddingMatrix, IVFIndex, SemanticIndex, SentenceEmbedder, normalize_rows, token_windows
+)
+
+class BagOfWordsEmbedder:
+    """Deterministic stand-in for the sentence encoder"""
+    model_name = "bag-of-words"
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.calls = 0
+
+    def encode(self, texts):
+        self.calls += len(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % self.dim] += 1
+        return normalize_rows(vectors)
+
+def random_unit_vectors(count, dim=32, seed=0):
+    return normalize_rows(np.random.default_rng(seed).standard_normal((count, dim)))
+
+def test_matrix_grows_and_reuses_free_rows():
+    matrix = EmbeddingMatrix(4, capacity=2)
+    for i, vector in enumerate(random_unit_vectors(3, dim=4)):
+        matrix.upsert(f"d{i}", vector, f"h{i}")
+    assert matrix.capacity == 4 and len(matrix) == 3
+
+    row = matrix.remove("d1")
+    assert matrix.upsert("d3", random_unit_vectors(1, dim=4)[0], "h3") == row
+    assert matrix.hash_of("d1") is None and matrix.hash_of("d3") == "h3"
+
+def test_ivf_matches_brute_force_on_clustered_vectors():
+    rng = np.random.default_rng(1)
+    centers = random_unit_vectors(20, seed=2)
+    matrix = EmbeddingMatrix(32, capacity=4000)
+    for row, vector in enumerate(normalize_rows(centers[rng.integers(0, 20, 4000)] + 0.1 * rng.standard_normal((4000, 32)))):
+        matrix.upsert(str(row), vector, "")
+    brute, ivf = BruteForceIndex(matrix), IVFIndex(matrix, nprobe=4)
+    ivf.rebuild()
+    assert ivf.centroids is not None
+
+    recalls = []
+    for query in centers:
+        exact = {row for row, _ in brute.search(query, 10)}
+        recalls.append(len(exact & {row for row, _ in ivf.search(query, 10)}) / 10)
+    assert np.mean(recalls) >= 0.9
+
+def test_ivf_tracks_updates_and_removals():
+    matrix = EmbeddingMatrix(32)
+    ivf = IVFIndex(matrix, nprobe=2)
+    for row, vector in enumerate(random_unit_vectors(300)):
+        ivf.update(matrix.upsert(str(row), vector, ""))
+    assert ivf.centroids is not None
+
+    query = random_unit_vectors(1, seed=7)[0]
+    ivf.update(matrix.upsert("0", query, "changed"))
+    assert ivf.search(query, 1)[0][0] == matrix.rows["0"]
+    ivf.remove(matrix.remove("0"))
+    assert all(row != 0 for row, _ in ivf.search(query, 5))
+
+@pytest.mark.parametrize("index_type", ["brute", "ivf"])
+def test_semantic_index_ranks_and_skips_unchanged_documents(index_type):
+    embedder = BagOfWordsEmbedder()
+    index = SemanticIndex(embedder, index_type)
+    index.upsert_many("resume", {
+        "py": "python fastapi postgresql",
+        "design": "figma photoshop branding",
+    })
+    index.upsert("job", "backend", "python fastapi developer")
+    assert index.top_candidates_for_job("backend", top_k=1)[0][0] == "py"
+    assert index.top_jobs_for_candidate("py", top_k=1)[0][0] == "backend"
+
+    calls = embedder.calls
+    assert index.upsert_many("resume", {"py": "python fastapi postgresql"}) == 0
+    assert embedder.calls == calls
+
+    index.remove("resume", "py")
+    assert [c for c, _ in index.top_candidates_for_job("backend", top_k=5)] == ["design"]
+
+def test_saved_embeddings_are_reused(tmp_path):
+    index = SemanticIndex(BagOfWordsEmbedder(), "brute")
+    index.upsert("resume", "py", "python fastapi postgresql")
+    index.save(tmp_path)
+
+    embedder = BagOfWordsEmbedder()
+    restored = SemanticIndex(embedder, "brute")
+    restored.load(tmp_path)
+    assert restored.upsert_many("resume", {"py": "python fastapi postgresql"}) == 0
+    assert embedder.calls == 0
+
+def test_hnsw_index_search():
+    pytest.importorskip("hnswlib")
+    index = SemanticIndex(BagOfWordsEmbedder(), "hnsw")
+    index.upsert_many("resume", {"py": "python fastapi", "design": "figma branding"})
+    index.upsert("job", "backend", "python fastapi developer")
+    assert index.top_candidates_for_job("backend", top_k=1)[0][0] == "py"
+
+class WordTokenizer:
+    """One token id per word, with [CLS] and [SEP] added by the encoder"""
+    def __init__(self):
+        self.vocab = {}
+
+    def __call__(self, texts, add_special_tokens=True, verbose=True):
+        return {"input_ids": [[self.vocab.setdefault(word, len(self.vocab)) for word in text.lower().split()] for text in texts]}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+class WindowedBagOfWordsEmbedder(SentenceEmbedder):
+    """SentenceEmbedder with the transformer replaced by token id counts"""
+    def __init__(self, **kwargs):
+        super().__init__(model_name="bag-of-words", backend="cpu-fp32", **kwargs)
+        self._model, self._tokenizer = object(), WordTokenizer()
+        self.window_sizes = []
+
+    def _encode_windows(self, windows):
+        self.window_sizes.extend(len(window) + 2 for window in windows)
+        vectors = np.zeros((len(windows), 512), dtype=np.float32)
+        for row, window in enumerate(windows):
+            for token in window:
+                vectors[row, token % 512] += 1
+        return normalize_rows(vectors)
+
+def test_token_windows_overlap_and_cover_the_text():
+    assert token_windows(list(range(10)), 4, 1, 16) == [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]]
+    assert token_windows(list(range(10)), 4, 1, 2) == [[0, 1, 2, 3], [3, 4, 5, 6]]
+    assert token_windows([], 4, 1, 16) == [[]]
+
+def test_long_resumes_are_embedded_past_the_encoder_limit():
+    embedder = WindowedBagOfWordsEmbedder(max_length=256)
+    filler = " ".join(f"filler{i}" for i in range(600))
+    resume = filler + " kubernetes terraform golang microservices"
+    job = "kubernetes terraform golang microservices"
+
+    vectors = embedder.encode([resume, job])
+    assert max(embedder.window_sizes) <= 256
+    # The skills sit around token 600: a truncating encoder would score 0
+    assert float(vectors[0] @ vectors[1]) > 0.1
+    assert float(vectors[0] @ vectors[1]) > float(embedder.encode([filler, job])[0] @ vectors[1])
+
+@pytest.mark.asyncio
+async def test_sync_drops_candidates_deleted_from_the_cache_and_by_tombstone(monkeypatch, tmp_path):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app import embeddings, matching
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    monkeypatch.setattr(matching, "_deletions_index_created", False)
+
+    async def resume_text(user):
+        return user["resume_text"]
+
+    jane = str((await db.users.insert_one({"role": "candidate", "resume_path": "jane.pdf", "resume_text": "python fastapi"})).inserted_id)
+    john = str((await db.users.insert_one({"role": "candidate", "resume_path": "john.pdf", "resume_text": "figma branding"})).inserted_id)
+    cached = SemanticIndex(BagOfWordsEmbedder(), "brute")
+    cached.upsert_many("resume", {jane: "python fastapi", john: "figma branding", "gone": "java spring"})
+    cached.save(tmp_path)
+    monkeypatch.setattr(embeddings, "semantic_index", SemanticIndex(BagOfWordsEmbedder(), "brute"))
+
+    # Deleted while nothing was syncing: dropped when the cache is loaded
+    await embeddings.sync_semantic_index(db, resume_text, tmp_path)
+    assert set(embeddings.semantic_index.matrices["resume"].rows) == {jane, john}
+
+    await db.users.delete_one({"_id": ObjectId(john)})
+    await matching.record_deletion(db, "resume", john)
+    await embeddings.sync_semantic_index(db, resume_text, tmp_path)
+    assert set(embeddings.semantic_index.matrices["resume"].rows) == {jane}
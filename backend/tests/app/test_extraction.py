@@ -0,0 +1,100 @@
+import asyncio
+import io
+import pytest
+from app import extraction
+from app.extraction import TextCache, TextExtractor, parse_document
+from core.storage import LocalStorage
+
+docx = pytest.importorskip("docx")
+pytest.importorskip("PyPDF2")
+
+def make_pdf(pages):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+def make_docx(paragraphs):
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+def test_parse_from_memory():
+    assert "Senior Python engineer" in parse_document(make_pdf(["Senior Python engineer"]), "pdf")
+    assert parse_document(make_docx(["Jane Doe", "Kubernetes"]), "docx") == "Jane Doe\nKubernetes\n"
+    with pytest.raises(ValueError):
+        parse_document(b"", "rtf")
+
+def test_text_cache_evicts_least_recently_used():
+    cache = TextCache(max_chars=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.get("a")
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.chars == 8
+
+@pytest.mark.asyncio
+async def test_large_pdfs_are_split_by_page_range(monkeypatch):
+    monkeypatch.setattr(extraction, "PARALLEL_PDF_PAGES", 4)
+    extractor = TextExtractor(workers=3)
+    try:
+        pages = [f"Page {i} of the resume" for i in range(10)]
+        assert extractor._page_ranges(10) == [(0, 4), (4, 8), (8, 10)]
+        text = await extractor.extract(make_pdf(pages), "pdf")
+        assert [f"Page {i} " in text for i in range(10)] == [True] * 10
+        assert text.index("Page 3 ") < text.index("Page 4 ") < text.index("Page 9 ")
+    finally:
+        extractor.shutdown()
+
+@pytest.mark.asyncio
+async def test_identical_files_are_parsed_once(tmp_path):
+    extractor = TextExtractor(workers=0)
+    data = make_docx(["Go and Rust"])
+    texts = await asyncio.gather(*(extractor.extract(data, "docx") for _ in range(5)))
+    assert texts == ["Go and Rust\n"] * 5
+    assert extractor.parses == 1
+
+    storage = LocalStorage(str(tmp_path))
+    await storage.put_bytes("resumes/resume.docx", data)
+    assert await extractor.extract_stored(storage, "resumes/resume.docx") == "Go and Rust\n"
+    assert extractor.parses == 1
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+@pytest.mark.asyncio
+async def test_parsed_text_is_shared_through_the_database():
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    data = make_docx(["Terraform"])
+    first = TextExtractor(workers=0)
+    await first.extract(data, "docx", db=db)
+
+    # Another worker process: empty memory cache, same collection
+    second = TextExtractor(workers=0)
+    assert await second.extract(data, "docx", db=db) == "Terraform\n"
+    assert second.parses == 0
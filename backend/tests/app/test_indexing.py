@@ -0,0 +1,55 @@
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from core.config import settings
+from app import indexing, recommendations, skill_search
+from app.matching import MatchingEngine, matching_engine
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+RESUME = "Backend engineer, 6 years of Python, FastAPI and PostgreSQL on AWS."
+
+@pytest_asyncio.fixture
+async def db(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_ENABLED", False)
+    monkeypatch.setattr(recommendations, "_indexes_created", False)
+    monkeypatch.setattr(indexing, "skill_index", skill_search.SkillIndex())
+    previous = MatchingEngine()
+    previous.load_from(matching_engine)
+    engine = MatchingEngine()
+    engine.fit({"other": "Figma designer"}, {str(ObjectId()): "Python developer"})
+    matching_engine.load_from(engine)
+    yield mongomock_motor.AsyncMongoMockClient()["test"]
+    matching_engine.__dict__.clear()
+    matching_engine.load_from(previous)
+
+@pytest.mark.asyncio
+async def test_resume_is_parsed_once_and_derived_fields_are_stored(db):
+    candidate_id = str((await db.users.insert_one({"role": "candidate", "resume_path": "cv.pdf"})).inserted_id)
+    loads = []
+
+    async def load_resume_text(user):
+        loads.append(user)
+        return RESUME
+
+    await indexing.index_candidate_resume(db, candidate_id, {"resume_path": "cv.pdf"}, load_resume_text)
+
+    user = await db.users.find_one({"_id": ObjectId(candidate_id)})
+    assert len(loads) == 1
+    assert user["resume_text"] == RESUME
+    assert user["skills"] == ["Python", "FastAPI", "PostgreSQL", "AWS"]
+    assert user["experience_years"] == 6
+    assert len(user["minhash"]) == 128 and user["lsh_bands"]
+    assert "resume_indexed_at" in user
+    assert candidate_id in indexing.skill_index
+    assert candidate_id in matching_engine.resumes
+
+@pytest.mark.asyncio
+async def test_unreadable_resume_stores_nothing(db):
+    candidate_id = str((await db.users.insert_one({"role": "candidate"})).inserted_id)
+
+    async def load_resume_text(user):
+        return ""
+
+    await indexing.index_candidate_resume(db, candidate_id, {"resume_path": "missing.pdf"}, load_resume_text)
+    assert "resume_text" not in await db.users.find_one({"_id": ObjectId(candidate_id)})
@@ -0,0 +1,108 @@
+import sys
+import types
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from app import inference
+
+class FakeTokenizer:
+    @classmethod
+    def from_pretrained(cls, model_name, token=None):
+        return cls()
+
+class FakeORTModel:
+    """Records how optimum would have been asked to load or export a model"""
+    loads = []
+
+    def __init__(self, source, export):
+        self.source, self.export = source, export
+
+    @classmethod
+    def from_pretrained(cls, source, export=False, token=None):
+        cls.loads.append((source, export))
+        return cls(source, export)
+
+    def save_pretrained(self, directory):
+        directory.mkdir(parents=True)
+
+@pytest.fixture
+def fake_optimum(monkeypatch, tmp_path):
+    FakeORTModel.loads = []
+    module = types.ModuleType("optimum.onnxruntime")
+    module.ORTModelForCausalLM = module.ORTModelForFeatureExtraction = FakeORTModel
+    monkeypatch.setitem(sys.modules, "optimum", types.ModuleType("optimum"))
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", module)
+    monkeypatch.setenv("ONNX_EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(inference, "AutoTokenizer", FakeTokenizer)
+    return tmp_path
+
+def tiny_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(8, 16), torch.nn.ReLU(), torch.nn.Linear(16, 4))
+
+def test_resolve_backend_validates_and_reads_the_environment(monkeypatch):
+    monkeypatch.delenv("AI_CPU_THREADS", raising=False)
+    assert inference.resolve_backend("CPU-INT8") == "cpu-int8"
+    monkeypatch.setenv("AI_INFERENCE_BACKEND", "onnx")
+    assert inference.resolve_backend() == "onnx"
+    with pytest.raises(ValueError, match="Unknown inference backend 'tpu'"):
+        inference.resolve_backend("tpu")
+
+def test_auto_backend_follows_gpu_availability(monkeypatch):
+    monkeypatch.delenv("AI_CPU_THREADS", raising=False)
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: True)
+    assert inference.resolve_backend("auto") == "cuda"
+    monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+    assert inference.resolve_backend("auto") == "cpu-fp32"
+
+def test_cpu_thread_count_only_applies_to_cpu_backends(monkeypatch):
+    threads = []
+    monkeypatch.setattr(torch, "set_num_threads", threads.append)
+    monkeypatch.setenv("AI_CPU_THREADS", "3")
+    inference.resolve_backend("cuda")
+    assert threads == []
+    inference.resolve_backend("cpu-fp32")
+    assert threads == [3]
+
+def test_onnx_models_are_exported_once_then_loaded_from_disk(fake_optimum):
+    first, _ = inference.load_causal_lm("org/model", backend="onnx")
+    assert first.export and first.source == "org/model"
+    assert (fake_optimum / "org--model").is_dir()
+
+    second, _ = inference.load_causal_lm("org/model", backend="onnx")
+    assert not second.export and second.source == fake_optimum / "org--model"
+    assert FakeORTModel.loads == [("org/model", True), (fake_optimum / "org--model", False)]
+
+    encoder, _ = inference.load_encoder("org/encoder", backend="onnx")
+    assert isinstance(encoder, FakeORTModel)
+
+def test_onnx_backend_without_optimum_fails_clearly(monkeypatch):
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", None)
+    monkeypatch.setattr(inference, "AutoTokenizer", FakeTokenizer)
+    with pytest.raises(RuntimeError, match="optimum"):
+        inference.load_encoder("org/encoder", backend="onnx")
+
+def test_int8_quantization_replaces_linear_layers():
+    model = tiny_model()
+    inputs = torch.randn(5, 8)
+    expected = model(inputs)
+    quantized = inference._quantize_int8(model)
+    assert not any(type(module) is torch.nn.Linear for module in quantized.modules())
+    assert torch.allclose(quantized(inputs), expected, atol=0.1)
+
+def test_cpu_int8_backend_quantizes_the_fp32_model(monkeypatch):
+    calls = []
+
+    def from_pretrained(model_name, **kwargs):
+        calls.append(kwargs)
+        return tiny_model()
+
+    monkeypatch.setattr(inference, "AutoTokenizer", FakeTokenizer)
+    monkeypatch.setattr(inference.AutoModelForCausalLM, "from_pretrained", from_pretrained)
+    fp32, _ = inference.load_causal_lm("org/model", backend="cpu-fp32")
+    int8, _ = inference.load_causal_lm("org/model", backend="cpu-int8", use_safetensors=True)
+    assert any(type(module) is torch.nn.Linear for module in fp32.modules())
+    assert not any(type(module) is torch.nn.Linear for module in int8.modules())
+    assert all(call["torch_dtype"] is torch.float32 and call["low_cpu_mem_usage"] for call in calls)
+    assert calls[1]["use_safetensors"] is True
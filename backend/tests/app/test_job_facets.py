@@ -0,0 +1,44 @@
+import pytest
+import pytest_asyncio
+from app.job_facets import find_jobs_with_facets
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+JOBS = [
+    {"title": "Backend engineer", "type": "full-time", "location": "Remote", "experience_level": "senior"},
+    {"title": "Frontend engineer", "type": "full-time", "location": "Berlin", "experience_level": "mid"},
+    {"title": "Data engineer", "type": "contract", "location": "Remote", "experience_level": "senior"},
+    {"title": "Intern", "type": "internship", "location": "", "description": "long text"},
+    {"title": "Designer", "type": "full-time", "location": "Remote", "status": "closed"},
+]
+
+@pytest_asyncio.fixture
+async def db():
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    await db.jobs.insert_many([dict(job) for job in JOBS])
+    return db
+
+@pytest.mark.asyncio
+async def test_page_total_and_facets_in_one_aggregation(db):
+    total, jobs, facets = await find_jobs_with_facets(db, {}, {"title": 1}, skip=1, limit=2)
+    assert total == 5
+    assert [job["title"] for job in jobs] == ["Frontend engineer", "Data engineer"]
+    assert set(jobs[0]) == {"_id", "title"}
+    assert facets["type"] == [
+        {"value": "full-time", "count": 3},
+        {"value": "contract", "count": 1},
+        {"value": "internship", "count": 1},
+    ]
+    # Empty and missing values are not counted
+    assert facets["location"] == [{"value": "Remote", "count": 3}, {"value": "Berlin", "count": 1}]
+    assert facets["experience_level"] == [{"value": "senior", "count": 2}, {"value": "mid", "count": 1}]
+
+@pytest.mark.asyncio
+async def test_facets_follow_the_filter(db):
+    total, jobs, facets = await find_jobs_with_facets(db, {"location": "Remote"}, {"title": 1}, skip=0, limit=10, facets=("type",))
+    assert total == 3 and len(jobs) == 3
+    assert facets == {"type": [{"value": "full-time", "count": 2}, {"value": "contract", "count": 1}]}
+
+    total, jobs, facets = await find_jobs_with_facets(db, {"location": "Nowhere"}, {"title": 1}, skip=0, limit=10)
+    assert (total, jobs) == (0, [])
+    assert facets == {"type": [], "location": [], "experience_level": []}
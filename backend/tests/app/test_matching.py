@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app import matching
+from app.matching import MatchingEngine, job_document_text
+
+RESUMES = {
+    "py": "Senior Python developer with Django, FastAPI and PostgreSQL experience",
+    "java": "Java engineer building Spring Boot microservices",
+    "design": "Graphic designer skilled in Figma, Photoshop and branding",
+}
+JOBS = {
+    "backend": job_document_text({
+        "title": "Python Backend Engineer",
+        "description": "Build APIs with FastAPI",
+        "requirements": ["Python", "PostgreSQL"],
+    }),
+}
+
+def test_rank_applicants_orders_by_similarity():
+    engine = MatchingEngine()
+    engine.fit(RESUMES, JOBS)
+    ranked = engine.rank_applicants(job_id="backend", top_k=2)
+    assert ranked[0][0] == "py"
+    assert len(ranked) == 2
+    assert ranked[0][1] > ranked[1][1]
+
+def test_rank_applicants_restricted_to_candidates():
+    engine = MatchingEngine()
+    engine.fit(RESUMES, JOBS)
+    ranked = engine.rank_applicants(job_id="backend", candidate_ids=["design", "unknown"], top_k=5)
+    assert [candidate_id for candidate_id, _ in ranked] == ["design"]
+
+def test_unindexed_job_is_vectorized_on_the_fly():
+    engine = MatchingEngine()
+    engine.fit(RESUMES, JOBS)
+    ranked = engine.rank_applicants(job_id="new", job_text="Figma branding designer", top_k=1)
+    assert ranked[0][0] == "design"
+    assert 0 < engine.score(RESUMES["py"], JOBS["backend"]) <= 100
+
+def test_appended_resumes_are_ranked_without_refitting():
+    engine = MatchingEngine()
+    engine.fit(RESUMES, JOBS)
+    engine.add_resume("fastapi", "Python FastAPI PostgreSQL backend engineer")
+    engine.add_resume("py", "Graphic designer, Figma")  # replaced resume
+    ranked = engine.rank_applicants(job_id="backend", top_k=4)
+    assert ranked[0][0] == "fastapi"
+    assert [candidate_id for candidate_id, _ in ranked].count("py") == 1
+    assert len(ranked) == 4
+
+def test_compaction_drops_tombstones_and_keeps_rankings():
+    engine = MatchingEngine()
+    engine.fit(RESUMES, JOBS)
+    engine.add_resume("fastapi", "Python FastAPI PostgreSQL backend engineer")
+    engine.remove_job("backend")
+    engine.add_job("backend", JOBS["backend"])
+    before = engine.rank_applicants(job_id="backend", top_k=4)
+
+    compacted = MatchingEngine.compacted(engine.resumes.frozen(), engine.jobs.frozen(), None)
+    assert compacted.resumes.dead == set() and compacted.jobs.dead == set()
+    assert compacted.n_docs == engine.n_docs == 5
+    assert (compacted.doc_freq == engine.doc_freq).all()
+    assert [c for c, _ in compacted.rank_applicants(job_id="backend", top_k=4)] == [c for c, _ in before]
+
+def test_snapshot_round_trip_is_memory_mapped(tmp_path):
+    engine = MatchingEngine()
+    engine.fit(RESUMES, JOBS)
+    engine.save_snapshot(tmp_path)
+
+    loaded = MatchingEngine.load_snapshot(tmp_path)
+    # Read-only views of the mapped .npy files, not copies
+    assert not loaded.resumes.vectors.data.flags.writeable
+    assert loaded.rank_applicants(job_id="backend", top_k=3) == engine.rank_applicants(job_id="backend", top_k=3)
+    loaded.add_resume("fastapi", "Python FastAPI PostgreSQL backend engineer")
+    assert loaded.rank_applicants(job_id="backend", top_k=1)[0][0] == "fastapi"
+
+def test_changes_before_loading_are_kept_for_replay():
+    engine = MatchingEngine()
+    engine.add_job("backend", JOBS["backend"])
+    assert not engine.fitted
+    assert [op[1:4] for op in engine.pending_ops] == [("add", "job", "backend")]
+
+def test_rank_jobs_for_candidate():
+    engine = MatchingEngine()
+    engine.fit(RESUMES, {**JOBS, "design": "Brand designer using Figma"})
+    assert [job_id for job_id, _ in engine.rank_jobs("design", top_k=2)] == ["design", "backend"]
+    assert engine.rank_jobs("unknown") == []
+
+@pytest.mark.asyncio
+async def test_maintenance_survives_load_failures_and_takes_over_leadership(monkeypatch, tmp_path):
+    calls = []
+    locks = iter([None, None, True])
+
+    async def ensure(db, load_resume_text, directory):
+        calls.append("ensure")
+        if calls.count("ensure") == 1:
+            raise ConnectionError("database unavailable")
+
+    async def compact(engine, directory=None):
+        calls.append("compact")
+
+    monkeypatch.setattr(matching, "acquire_leader_lock", lambda directory: next(locks))
+    monkeypatch.setattr(matching, "ensure_matching_engine", ensure)
+    monkeypatch.setattr(matching, "compact_matching_engine", compact)
+    monkeypatch.setattr(matching, "matching_engine", MatchingEngine())
+
+    task = asyncio.ensure_future(matching.maintain_matching_index(None, None, tmp_path, 0.001))
+    while "compact" not in calls:
+        await asyncio.sleep(0.001)
+    task.cancel()
+    # The failed load is retried, and the lock is retried until the old leader lets go
+    assert calls[:4] == ["ensure", "ensure", "ensure", "compact"]
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+async def _resume_text(user):
+    return user.get("resume_text", "")
+
+@pytest.mark.asyncio
+async def test_sync_picks_up_late_commits_and_deletions(monkeypatch):
+    monkeypatch.setattr(matching, "_deletions_index_created", False)
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    now = datetime.utcnow()
+    jane = (await db.users.insert_one({
+        "role": "candidate", "resume_path": "jane.pdf", "resume_text": RESUMES["py"], "created_at": now - timedelta(hours=1)
+    })).inserted_id
+    await db.jobs.insert_one({"title": "Designer", "description": "Figma", "requirements": [], "created_at": now - timedelta(hours=1)})
+    engine = await matching.build_matching_engine(db, _resume_text)
+
+    # Stamped before the previous sync but committed after it
+    job = (await db.jobs.insert_one({
+        "title": "Python Backend Engineer", "description": "Build APIs", "requirements": ["Python"],
+        "created_at": engine.synced_at - timedelta(seconds=5)
+    })).inserted_id
+    await db.users.delete_one({"_id": jane})
+    await matching.record_deletion(db, "resume", str(jane))
+    await matching.sync_from_db(engine, db, _resume_text)
+
+    assert str(job) in engine.jobs.rows
+    assert str(jane) not in engine.resumes.rows
+
+@pytest.mark.asyncio
+async def test_reconciliation_drops_documents_deleted_without_a_tombstone():
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    john = (await db.users.insert_one({"role": "candidate", "resume_path": "john.pdf", "resume_text": RESUMES["java"]})).inserted_id
+    job = (await db.jobs.insert_one({"title": "Java Engineer", "description": "Spring Boot", "requirements": []})).inserted_id
+    engine = await matching.build_matching_engine(db, _resume_text)
+    await db.users.delete_one({"_id": john})
+    await db.jobs.delete_one({"_id": job})
+
+    await matching.sync_from_db(engine, db, _resume_text)
+    assert str(john) in engine.resumes.rows and str(job) in engine.jobs.rows
+    await matching.sync_from_db(engine, db, _resume_text, reconcile=True)
+    assert str(john) not in engine.resumes.rows and str(job) not in engine.jobs.rows
@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from app import model_loader
+from app.model_loader import FallbackModelLoader
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(model_loader.time, "sleep", sleeps.append)
+    return sleeps
+
+def stub_loader(monkeypatch, outcomes):
+    """Stand-in for load_causal_lm: each call pops the next outcome, raising exceptions"""
+    calls = []
+
+    def load_causal_lm(model_name, backend=None, token=None, use_safetensors=None):
+        calls.append(use_safetensors)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(model_loader, "load_causal_lm", load_causal_lm)
+    return calls
+
+def run(loader):
+    loader.start()
+    loader._thread.join(timeout=5)
+
+def test_failed_loads_back_off_exponentially_until_ready(monkeypatch, sleeps):
+    stub_loader(monkeypatch, [RuntimeError("hub down")] * 3 + [("model", "tokenizer")])
+    loader = FallbackModelLoader("org/model", initial_backoff=1, max_backoff=3)
+    assert loader.status == "idle"
+    run(loader)
+
+    assert sleeps == [1, 2, 3]
+    assert loader.ready and loader.status == "ready"
+    assert loader.get() == ("model", "tokenizer")
+    assert loader.attempts == 4 and loader.last_error is None
+
+def test_safetensors_fall_back_to_bin_weights(monkeypatch, sleeps):
+    calls = stub_loader(monkeypatch, [OSError("no model.safetensors"), ("model", "tokenizer")])
+    loader = FallbackModelLoader("org/model")
+    run(loader)
+    assert calls == [True, None]
+    assert loader.ready and loader.attempts == 1 and sleeps == []
+
+def test_loader_gives_up_after_max_attempts(monkeypatch, sleeps):
+    stub_loader(monkeypatch, [RuntimeError("out of memory")] * 3 + [("model", "tokenizer")])
+    loader = FallbackModelLoader("org/model", initial_backoff=1, max_attempts=3)
+    run(loader)
+    assert loader.status == "failed" and loader.attempts == 3
+    assert loader.last_error == "out of memory"
+    assert sleeps == [1, 2]
+
+    # get() does not restart a failed loader; retry() does
+    assert loader.get() is None and not loader._thread.is_alive()
+    loader.retry()
+    loader._thread.join(timeout=5)
+    assert loader.ready and loader.attempts == 1
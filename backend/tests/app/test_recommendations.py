@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from core.config import settings
+from app import recommendations
+from app.embeddings import SemanticIndex, normalize_rows
+from app.matching import MatchingEngine, matching_engine
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+JOBS = {
+    "python": {"title": "Python Developer", "description": "FastAPI and PostgreSQL services", "status": "open"},
+    "design": {"title": "Brand Designer", "description": "Figma and Photoshop", "status": "open"},
+}
+
+@pytest_asyncio.fixture
+async def db(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_ENABLED", False)
+    monkeypatch.setattr(recommendations, "RECOMMENDATIONS_PER_CANDIDATE", 2)
+    monkeypatch.setattr(recommendations, "_indexes_created", False)
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    job_ids = {}
+    for key, job in JOBS.items():
+        job_ids[key] = str((await db.jobs.insert_one(dict(job))).inserted_id)
+
+    engine = MatchingEngine()
+    engine.fit(
+        {"alice": "Python FastAPI PostgreSQL engineer", "bob": "Figma Photoshop brand designer"},
+        {job_ids[key]: f"{job['title']} {job['description']}" for key, job in JOBS.items()}
+    )
+    previous = MatchingEngine()
+    previous.load_from(matching_engine)
+    matching_engine.load_from(engine)
+    db.job_ids = job_ids
+    yield db
+    matching_engine.__dict__.clear()
+    matching_engine.load_from(previous)
+
+@pytest.mark.asyncio
+async def test_feed_is_built_on_first_read_and_stored(db):
+    feed = await recommendations.get_recommendations(db, "alice", limit=2)
+    assert feed[0]["job_id"] == db.job_ids["python"]
+    assert feed[0]["title"] == "Python Developer"
+    stored = await db.job_recommendations.find_one({"_id": "alice"})
+    assert [entry["job_id"] for entry in stored["jobs"]] == [entry["job_id"] for entry in feed]
+
+@pytest.mark.asyncio
+async def test_new_job_is_folded_into_existing_feeds(db):
+    await recommendations.refresh_candidate_recommendations(db, "alice")
+    job_id = str((await db.jobs.insert_one({"title": "Senior Python FastAPI Engineer", "status": "open"})).inserted_id)
+    matching_engine.add_job(job_id, "Senior Python FastAPI PostgreSQL Engineer")
+
+    await recommendations.refresh_job_recommendations(db, job_id)
+    feed = await recommendations.get_recommendations(db, "alice", limit=2)
+    assert job_id in [entry["job_id"] for entry in feed]
+    assert len(feed) == 2
+    # Candidates without a feed are not given a partial one
+    assert await db.job_recommendations.find_one({"_id": "bob"}) is None
+
+@pytest.mark.asyncio
+async def test_closed_job_is_removed_and_feed_refilled(db):
+    await recommendations.refresh_candidate_recommendations(db, "alice")
+    await db.jobs.update_one({"_id": ObjectId(db.job_ids["python"])}, {"$set": {"status": "closed"}})
+
+    await recommendations.refresh_job_recommendations(db, db.job_ids["python"])
+    feed = await recommendations.get_recommendations(db, "alice", limit=2)
+    assert [entry["job_id"] for entry in feed] == [db.job_ids["design"]]
+
+class WordEmbedder:
+    model_name = "words"
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), 32), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % 32] += 1
+        return normalize_rows(vectors)
+
+@pytest.mark.asyncio
+async def test_feed_scores_come_from_a_single_source(db, monkeypatch):
+    await recommendations.refresh_candidate_recommendations(db, "alice")
+    assert (await db.job_recommendations.find_one({"_id": "alice"}))["source"] == "tfidf"
+
+    job_id = str((await db.jobs.insert_one({"title": "Senior Python FastAPI Engineer", "status": "open"})).inserted_id)
+    index = SemanticIndex(WordEmbedder(), "brute")
+    index.upsert("resume", "alice", "Python FastAPI PostgreSQL engineer")
+    index.upsert_many("job", {
+        db.job_ids["python"]: "Python Developer FastAPI and PostgreSQL services",
+        db.job_ids["design"]: "Brand Designer Figma and Photoshop",
+        job_id: "Senior Python FastAPI Engineer",
+    })
+    monkeypatch.setattr(recommendations, "semantic_index", index)
+    monkeypatch.setattr(settings, "EMBEDDING_ENABLED", True)
+
+    # Offered with a cosine score, the job is not pushed into a TF-IDF feed: the feed is rebuilt
+    await recommendations.refresh_job_recommendations(db, job_id)
+    stored = await db.job_recommendations.find_one({"_id": "alice"})
+    assert stored["source"] == "semantic"
+    expected = dict(index.top_jobs_for_candidate("alice", 3))
+    assert {entry["job_id"]: entry["score"] for entry in stored["jobs"]} == {
+        entry["job_id"]: expected[entry["job_id"]] for entry in stored["jobs"]
+    }
+    assert job_id in expected
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from app import skill_search
+from app.skill_search import QueryError, SkillIndex, parse_skill_query
+from app.skills import extract_experience_years
+
+@pytest.fixture
+def index():
+    index = SkillIndex()
+    index.upsert("alice", ["Python", "Django", "PostgreSQL"], 6)
+    index.upsert("bob", ["Python", "Flask"], 2)
+    index.upsert("carol", ["Java", "Spring Boot"], 10)
+    index.upsert("dave", ["Python", "Django", "PHP"], None)
+    return index
+
+def matching_ids(index, query, **filters):
+    return {index.ids[row] for row in index.candidate_rows(parse_skill_query(query), **filters)}
+
+def test_parse_precedence_and_aliases():
+    assert parse_skill_query("python3 AND (django OR flask) AND NOT php") == (
+        "and", "Python", ("or", "Django", "Flask"), ("not", "PHP")
+    )
+    assert parse_skill_query("python OR java django") == ("or", "Python", ("and", "Java", "Django"))
+    # Multi-word names are read greedily, so adjacent skills need no operator
+    assert parse_skill_query("machine learning python") == ("and", "Machine Learning", "Python")
+    assert parse_skill_query('"spring boot" and not golang') == ("and", "Spring Boot", ("not", "Go"))
+
+@pytest.mark.parametrize("query", ["", "python AND", "(python", "python )", "cobol", "NOT"])
+def test_parse_errors(query):
+    with pytest.raises(QueryError):
+        parse_skill_query(query)
+
+def test_boolean_queries(index):
+    assert matching_ids(index, "python") == {"alice", "bob", "dave"}
+    assert matching_ids(index, "python AND django") == {"alice", "dave"}
+    assert matching_ids(index, "python AND (django OR flask) AND NOT php") == {"alice", "bob"}
+    assert matching_ids(index, "NOT python") == {"carol"}
+    assert matching_ids(index, "kubernetes") == set()
+
+def test_experience_filters_exclude_unknown(index):
+    assert matching_ids(index, "python", min_experience=3) == {"alice"}
+    assert matching_ids(index, "python OR java", max_experience=6) == {"alice", "bob"}
+
+def test_upsert_replaces_skills_and_remove_reuses_rows(index):
+    index.upsert("bob", ["Java"], 3)
+    assert matching_ids(index, "python") == {"alice", "dave"}
+    assert matching_ids(index, "java") == {"bob", "carol"}
+
+    row = index.rows["carol"]
+    index.remove("carol")
+    assert matching_ids(index, "java") == {"bob"}
+    assert matching_ids(index, "NOT python") == {"bob"}
+    index.upsert("erin", ["Rust"], 1)
+    assert index.rows["erin"] == row
+    assert matching_ids(index, "java OR rust") == {"bob", "erin"}
+
+def test_bitmaps_grow_past_word_boundaries():
+    index = SkillIndex()
+    for i in range(3000):
+        index.upsert(f"c{i}", ["Python"] if i % 3 == 0 else ["Java"], i % 20)
+    assert len(matching_ids(index, "python")) == 1000
+    assert matching_ids(index, "python", min_experience=19) == {f"c{i}" for i in range(3000) if i % 3 == 0 and i % 20 == 19}
+
+def test_search_ranks_by_coverage_then_experience(index):
+    total, ranked = index.search("python AND (django OR postgresql OR flask)")
+    assert total == 3
+    # bob and dave both hold 2 of 4 skills; bob's known experience breaks the tie
+    assert ranked == [("alice", 75.0), ("bob", 50.0), ("dave", 50.0)]
+
+def test_search_ranks_by_match_scores(index):
+    scores = {"alice": 20.0, "bob": 75.0, "dave": 50.0}
+    total, ranked = index.search("python", match_scores=lambda ids: np.array([scores[i] for i in ids]), top_k=2)
+    assert total == 3
+    assert ranked == [("bob", 75.0), ("dave", 50.0)]
+
+def test_extract_experience_years():
+    assert extract_experience_years("5+ years of Python, 2 yrs Go; 8 years overall") == 8
+    assert extract_experience_years("Graduated 2019") is None
+    # Without a claim of total experience, the first figure is the headline one
+    assert extract_experience_years("3 years Python, 7 years Go") == 3
+
+def test_experience_ignores_durations_that_are_not_experience():
+    assert extract_experience_years("Joined a company founded 40 years ago") is None
+    assert extract_experience_years("Company founded 40 years ago. 6 years of experience in Python") == 6
+    assert extract_experience_years("Maintained a 10 year old codebase for 3 yrs") == 3
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+@pytest.mark.asyncio
+async def test_sync_rereads_the_overlap_window_and_drops_deleted_candidates(monkeypatch):
+    monkeypatch.setattr(skill_search, "_indexes_created", False)
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    # Mongo stores milliseconds
+    now = datetime.utcnow().replace(microsecond=0)
+    alice = (await db.users.insert_one({"role": "candidate", "skills": ["Python"], "resume_indexed_at": now})).inserted_id
+    index = await skill_search.sync_skill_index(db, SkillIndex())
+    assert index.synced_at == now
+
+    # Committed after the last sync but stamped slightly before it
+    bob = (await db.users.insert_one({
+        "role": "candidate", "skills": ["Go"], "resume_indexed_at": now - timedelta(seconds=5)
+    })).inserted_id
+    await db.users.delete_one({"_id": alice})
+    await skill_search.sync_skill_index(db, index)
+    assert str(bob) in index and str(alice) in index
+
+    monkeypatch.setattr(skill_search, "FULL_SYNC_INTERVAL", 0)
+    await skill_search.sync_skill_index(db, index)
+    assert str(alice) not in index and str(bob) in index
+
+@pytest.mark.asyncio
+async def test_maintenance_loop_keeps_syncing_after_failures(monkeypatch):
+    calls = []
+
+    async def sync(db, index=None):
+        calls.append(db)
+        if len(calls) == 1:
+            raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(skill_search, "sync_skill_index", sync)
+    task = asyncio.ensure_future(skill_search.maintain_skill_index("db", 0.001))
+    while len(calls) < 3:
+        await asyncio.sleep(0.001)
+    task.cancel()
+    assert calls[:3] == ["db"] * 3
@@ -0,0 +1,42 @@
+from app.skills import SkillAutomaton, extract_skills, skill_lookup
+
+def test_aliases_are_normalized_to_canonical_skills():
+    text = "Deployed services on k8s with Golang and Postgres; built UIs in ReactJS."
+    assert extract_skills(text) == ["Kubernetes", "Go", "PostgreSQL", "React"]
+
+def test_matches_respect_word_boundaries():
+    assert extract_skills("JavaScript developer") == ["JavaScript"]
+    assert extract_skills("Let's go to the park") == []
+    assert "C++" in extract_skills("Modern C++ and C# experience")
+    assert "C#" in extract_skills("Modern C++ and C# experience")
+
+def test_longest_overlapping_match_wins():
+    assert extract_skills("React Native and machine learning") == ["React Native", "Machine Learning"]
+
+def test_skills_are_reported_once_in_order_of_first_mention():
+    assert extract_skills("Python, Docker, python3 and Python again") == ["Python", "Docker"]
+
+def test_suffix_patterns_are_found_through_failure_links():
+    automaton = SkillAutomaton([("abcd", "ABCD"), ("bc", "BC"), ("c d", "CD")])
+    assert automaton.extract("x abcd bc c d") == ["ABCD", "BC", "CD"]
+    assert [m[2] for m in SkillAutomaton([("he", "HE"), ("she", "SHE")]).matches("she")] == ["SHE"]
+
+def test_ambiguous_words_need_a_qualifying_phrase():
+    text = "Wrote a lambda in py for the ml team, uploaded to S3, mentoring on GitHub, like an oracle"
+    assert extract_skills(text) == []
+    assert extract_skills("AWS Lambda, Amazon S3 and ML models on Oracle SQL") == [
+        "AWS", "Machine Learning", "Oracle Database"
+    ]
+
+def test_ambiguous_skill_names_are_not_found_as_everyday_words():
+    text = (
+        "Rust-proof coating, a swift turnaround, bootstrapped a startup, took the helm, "
+        "a spark of interest, off the rails, a flask of coffee, a snowflake and a dart board"
+    )
+    assert extract_skills(text) == []
+    assert extract_skills("Built SwiftUI apps, Rust programming, Helm charts, PySpark jobs and Ruby on Rails APIs") == [
+        "Swift", "Rust", "Helm", "Apache Spark", "Ruby on Rails"
+    ]
+    # A query names skills explicitly, so the bare words still resolve there
+    lookup = skill_lookup()
+    assert lookup["spark"] == "Apache Spark" and lookup["rails"] == "Ruby on Rails" and lookup["flask"] == "Flask"
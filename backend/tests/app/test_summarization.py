@@ -0,0 +1,64 @@
+from app.summarization import (
+    MapReduceSummarizer, approximate_token_count, chunk_text, split_sections
+)
+
+RESUME = "\n".join([
+    "Jane Doe",
+    "Experience",
+    *[f"Built service number {i} in Python on AWS for the payments team" for i in range(120)],
+    "Education",
+    "B.Sc. Computer Science",
+    "Skills",
+    "Python, Go, Kubernetes",
+])
+
+def test_split_sections_keeps_headings_with_their_body():
+    sections = split_sections(RESUME)
+    assert sections[0] == "Jane Doe"
+    assert sections[1].startswith("Experience")
+    assert sections[-1] == "Skills\nPython, Go, Kubernetes"
+
+def test_chunks_respect_token_limit():
+    chunks = chunk_text(RESUME, approximate_token_count, 200)
+    assert len(chunks) > 1
+    assert all(approximate_token_count(chunk) <= 200 for chunk in chunks)
+    # Every line of the resume ends up in exactly one chunk
+    assert sum(chunk.count("Built service") for chunk in chunks) == 120
+
+def test_map_reduce_batches_and_caches_chunk_summaries():
+    batches = []
+
+    def summarize_batch(chunks):
+        batches.append(len(chunks))
+        return [f"summary of {len(chunk)} chars" for chunk in chunks]
+
+    summarizer = MapReduceSummarizer(summarize_batch, approximate_token_count, 200)
+    first = summarizer.summarize(RESUME)
+    assert first.startswith("summary of")
+    # One batched call for all chunks, then one reduce call
+    assert len(batches) == 2 and batches[0] > 1 and batches[1] == 1
+
+    # Editing one section only re-summarizes that section
+    batches.clear()
+    summarizer.summarize(RESUME.replace("B.Sc. Computer Science", "M.Sc. Computer Science"))
+    assert batches[0] == 1
+
+def test_final_reduce_keeps_every_partial_summary_at_max_depth(caplog):
+    reduced = []
+
+    def echo(chunks):
+        # Summaries as long as their input never converge
+        return chunks
+
+    def reduce_batch(chunks):
+        reduced.extend(chunks)
+        return ["final"]
+
+    summarizer = MapReduceSummarizer(echo, approximate_token_count, 200, reduce_batch=reduce_batch, max_depth=2)
+    with caplog.at_level("WARNING", logger="app.summarization"):
+        assert summarizer.summarize(RESUME) == "final"
+    assert len(reduced) == 1
+    assert approximate_token_count(reduced[0]) <= 200
+    # The start of every section survives, not only the first chunk
+    assert reduced[0].startswith("Jane Doe") and "B.Sc. Computer Science" in reduced[0]
+    assert "truncating" in caplog.text
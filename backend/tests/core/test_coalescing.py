@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from prometheus_client import REGISTRY
+from core.coalescing import RequestCoalescer
+
+def collapsed(route: str) -> float:
+    return REGISTRY.get_sample_value("coalesced_requests_total", {"route": route}) or 0.0
+
+def make_fetch(calls, result="job", delay=0.01):
+    async def fetch():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return {"title": result}
+    return fetch
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_fetch():
+    coalescer = RequestCoalescer()
+    calls = []
+    before = collapsed("test.same")
+    results = await asyncio.gather(*(
+        coalescer.run("test.same", {"job_id": "1", "fields": None}, make_fetch(calls)) for _ in range(50)
+    ))
+    assert calls == ["job"]
+    assert all(result is results[0] for result in results)
+    assert collapsed("test.same") - before == 49
+    assert coalescer.in_flight == {}
+
+    # Completed fetches are not reused
+    await coalescer.run("test.same", {"job_id": "1", "fields": None}, make_fetch(calls))
+    assert calls == ["job", "job"]
+
+@pytest.mark.asyncio
+async def test_different_routes_and_parameters_are_fetched_separately():
+    coalescer = RequestCoalescer()
+    calls = []
+    await asyncio.gather(
+        coalescer.run("test.a", {"job_id": "1"}, make_fetch(calls, "a1")),
+        coalescer.run("test.a", {"job_id": "2"}, make_fetch(calls, "a2")),
+        coalescer.run("test.b", {"job_id": "1"}, make_fetch(calls, "b1")),
+    )
+    assert sorted(calls) == ["a1", "a2", "b1"]
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise LookupError("Job not found")
+
+    results = await asyncio.gather(*(coalescer.run("test.error", {}, fetch) for _ in range(3)), return_exceptions=True)
+    assert calls == [1]
+    assert all(isinstance(result, LookupError) for result in results)
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    coalescer = RequestCoalescer()
+    calls = []
+    first = asyncio.ensure_future(coalescer.run("test.cancel", {}, make_fetch(calls, delay=0.05)))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(coalescer.run("test.cancel", {}, make_fetch(calls, delay=0.05)))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == {"title": "job"}
+    assert calls == ["job"]
+
+@pytest.mark.asyncio
+async def test_disabled_coalescer_fetches_every_time():
+    coalescer = RequestCoalescer(enabled=False)
+    calls = []
+    await asyncio.gather(*(coalescer.run("test.disabled", {}, make_fetch(calls)) for _ in range(3)))
+    assert calls == ["job"] * 3
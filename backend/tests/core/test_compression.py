@@ -0,0 +1,85 @@
+import gzip
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+from core.compression import CompressionMiddleware, Compressor, compressible
+
+LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+BODY = '{"jobs": [' + ", ".join('{"title": "Python developer"}' for _ in range(100)) + "]}"
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, compressor=Compressor(LEVELS, min_size=1000))
+
+    @app.get("/jobs")
+    async def jobs():
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/resume")
+    async def resume():
+        return Response(b"%PDF-1.4" + b"x" * 5000, media_type="application/pdf")
+
+    @app.get("/events")
+    async def events():
+        async def lines():
+            for i in range(3):
+                yield f'{{"event": {i}}}\n'.encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/precompressed")
+    async def precompressed():
+        return Response(gzip.compress(BODY.encode()), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+def test_negotiate_prefers_highest_weight_then_server_order():
+    compressor = Compressor(LEVELS)
+    assert compressor.negotiate("gzip, deflate, br, zstd") == "br"
+    assert compressor.negotiate("gzip, zstd") == "zstd"
+    assert compressor.negotiate("br;q=0.5, gzip;q=0.9") == "gzip"
+    assert compressor.negotiate("*;q=0.1, br;q=0") == "zstd"
+    assert compressor.negotiate("identity") is None
+    assert compressor.negotiate(None) is None
+    assert Compressor({"gzip": 6}).negotiate("br, gzip") == "gzip"
+
+def test_compressible_types():
+    assert compressible("application/json")
+    assert compressible("text/plain; charset=utf-8")
+    assert compressible("application/problem+json")
+    assert not compressible("application/pdf")
+    assert not compressible(None)
+
+@pytest.mark.parametrize("encoding, decompress", [
+    ("br", brotli.decompress),
+    ("zstd", lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)),
+    ("gzip", gzip.decompress),
+])
+def test_responses_are_compressed_with_the_negotiated_coding(client, encoding, decompress):
+    with client.stream("GET", "/jobs", headers={"Accept-Encoding": encoding}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw) < len(BODY)
+    assert decompress(raw) == BODY.encode()
+
+def test_small_binary_and_encoded_bodies_pass_through(client):
+    for path in ("/small", "/resume"):
+        response = client.get(path, headers={"Accept-Encoding": "br"})
+        assert "content-encoding" not in response.headers
+    response = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+def test_streams_are_compressed_chunk_by_chunk(client):
+    with client.stream("GET", "/events", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(b"".join(response.iter_raw())) == b'{"event": 0}\n{"event": 1}\n{"event": 2}\n'
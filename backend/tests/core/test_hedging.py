@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from core import hedging
+from core.config import settings
+
+def make_backend(result, delay, calls):
+    async def backend():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return backend
+
+@pytest.fixture
+def hedging_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "AI_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_HEDGE_BUDGETS", {
+        "default": {"min_delay": 0.01, "max_delay": 0.05, "timeout": 1.0}
+    })
+    hedging._trackers.clear()
+
+def test_latency_tracker_percentile():
+    tracker = hedging.LatencyTracker(window_size=100)
+    assert tracker.percentile(95) is None
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.percentile(95) == pytest.approx(0.95, abs=0.01)
+
+@pytest.mark.asyncio
+async def test_sequential_fallback_when_hedging_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "AI_HEDGING_ENABLED", False)
+    calls = []
+    result = await hedging.hedged_call(
+        "test",
+        make_backend("", 0, calls),
+        make_backend("secondary", 0, calls)
+    )
+    assert result == "secondary"
+    assert calls == ["", "secondary"]
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(hedging_enabled):
+    calls = []
+    result = await hedging.hedged_call(
+        "test",
+        make_backend("primary", 0, calls),
+        make_backend("secondary", 0, calls)
+    )
+    assert result == "primary"
+    assert calls == ["primary"]
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_to_secondary(hedging_enabled):
+    calls = []
+    result = await hedging.hedged_call(
+        "test",
+        make_backend("primary", 0.5, calls),
+        make_backend("secondary", 0, calls)
+    )
+    assert result == "secondary"
+    assert calls == ["primary", "secondary"]
@@ -0,0 +1,154 @@
+from datetime import datetime
+from typing import Optional
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from core.compression import Compressor
+from core.http_cache import InMemoryCacheBackend, RedisCacheBackend, ResponseCache, cache_key, etag_matches
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.state.cache = ResponseCache(InMemoryCacheBackend(), ttl=60, max_age=30)
+    app.state.builds = 0
+    app.state.jobs = [{"title": "Python developer", "created_at": datetime(2024, 1, 1)}]
+
+    @app.get("/jobs")
+    async def jobs(request: Request, search: Optional[str] = None, limit: int = 10):
+        async def build():
+            app.state.builds += 1
+            return {"jobs": app.state.jobs[:limit]}
+        return await app.state.cache.respond(request, "jobs", {"search": search, "limit": limit}, build)
+
+    @app.post("/jobs")
+    async def create(job: dict):
+        app.state.jobs.append(job)
+        await app.state.cache.invalidate("jobs")
+        return job
+
+    return app
+
+def test_cache_key_normalizes_parameters():
+    assert cache_key("jobs", {"limit": 10, "search": " python "}) == cache_key("jobs", {"search": "python", "limit": 10})
+    assert cache_key("jobs", {"limit": 10, "search": None}) == cache_key("jobs", {"limit": 10})
+    assert cache_key("jobs", {"limit": 10}) != cache_key("jobs", {"limit": 20})
+
+def test_etag_matches_weak_and_listed_tags():
+    assert etag_matches('"a", W/"jobs-1-x"', '"jobs-1-x"')
+    assert not etag_matches("*", '"jobs-1-x"')
+    assert not etag_matches('"jobs-0-x"', '"jobs-1-x"')
+    assert not etag_matches(None, '"jobs-1-x"')
+
+def test_hits_are_served_without_rebuilding(app):
+    client = TestClient(app)
+    first = client.get("/jobs", params={"search": "python"})
+    assert first.status_code == 200 and first.headers["x-cache"] == "MISS"
+    assert first.json() == {"jobs": [{"title": "Python developer", "created_at": "2024-01-01T00:00:00"}]}
+    assert first.headers["cache-control"] == "public, max-age=30"
+
+    second = client.get("/jobs", params={"search": " python"})
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert app.state.builds == 1
+
+def test_conditional_get_returns_304_until_a_write(app):
+    client = TestClient(app)
+    etag = client.get("/jobs").headers["etag"]
+    response = client.get("/jobs", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert app.state.builds == 1
+
+    client.post("/jobs", json={"title": "Go developer"})
+    response = client.get("/jobs", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()["jobs"]) == 2
+    assert app.state.builds == 2
+
+def test_lookup_failures_fall_back_to_uncached_responses(app):
+    class BrokenBackend(InMemoryCacheBackend):
+        async def lookup(self, namespace, key):
+            raise ConnectionError("cache down")
+
+    app.state.cache.backend = BrokenBackend()
+    response = TestClient(app).get("/jobs")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert response.json()["jobs"][0]["title"] == "Python developer"
+
+@pytest.mark.asyncio
+async def test_cached_values_are_invalidated_with_their_namespace():
+    cache = ResponseCache(InMemoryCacheBackend())
+    version, value = await cache.get_value("jobs", {"facets_for": {"search": "python"}})
+    assert value is None
+    await cache.set_value("jobs", {"facets_for": {"search": "python"}}, version, {"total": 3})
+    assert await cache.get_value("jobs", {"facets_for": {"search": "python"}}) == (version, {"total": 3})
+
+    await cache.invalidate("jobs")
+    assert (await cache.get_value("jobs", {"facets_for": {"search": "python"}}))[1] is None
+
+def test_compressed_variants_are_cached_per_coding(app):
+    app.state.cache.compressor = Compressor({"br": 11, "gzip": 9}, min_size=10)
+    client = TestClient(app)
+    first = client.get("/jobs", headers={"Accept-Encoding": "br"})
+    assert first.headers["x-cache"] == "MISS"
+    assert first.headers["content-encoding"] == "br"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert first.json()["jobs"][0]["title"] == "Python developer"
+
+    second = client.get("/jobs", headers={"Accept-Encoding": "br"})
+    assert second.headers["x-cache"] == "HIT" and second.headers["content-encoding"] == "br"
+    gzipped = client.get("/jobs", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["x-cache"] == "HIT" and gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] != second.headers["etag"]
+    plain = client.get("/jobs", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == gzipped.content
+    assert app.state.builds == 1
+
+    response = client.get("/jobs", headers={"Accept-Encoding": "br", "If-None-Match": second.headers["etag"]})
+    assert response.status_code == 304
+
+class FakeRedis:
+    """The few commands RedisCacheBackend uses"""
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+@pytest.mark.asyncio
+async def test_versions_start_from_a_random_epoch():
+    # Workers with their own in-memory counters do not issue the same versions
+    first, second = InMemoryCacheBackend(), InMemoryCacheBackend()
+    assert (await first.lookup("jobs", "k"))[0] != (await second.lookup("jobs", "k"))[0]
+    version = (await first.lookup("jobs", "k"))[0]
+    assert await first.bump("jobs") == version + 1
+
+    redis = FakeRedis()
+    backend = RedisCacheBackend(redis)
+    version = (await backend.lookup("jobs", "k"))[0]
+    assert (await RedisCacheBackend(redis).lookup("jobs", "k"))[0] == version
+    assert await backend.bump("jobs") == version + 1
+
+    # A flushed Redis does not reissue old versions (and with them old ETags)
+    redis.data.clear()
+    assert (await backend.lookup("jobs", "k"))[0] not in (version, version + 1)
+    redis.data.clear()
+    assert await backend.bump("jobs") not in (version + 1, 1)
@@ -0,0 +1,71 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from core import middleware
+from core.middleware import ErrorHandlingMiddleware, RateLimitMiddleware, RequestLoggingMiddleware
+from core.rate_limit import RateLimiter
+
+class FakeLimiter(RateLimiter):
+    def __init__(self, allowed: bool):
+        super().__init__(key_prefix="test")
+        self.allowed = allowed
+        self.keys = []
+
+    def _check_rate_limit(self, key):
+        self.keys.append(key)
+        return (True, None) if self.allowed else (False, 12.5)
+
+@pytest.fixture
+def logged(monkeypatch):
+    calls = []
+    monkeypatch.setattr(middleware, "log_request", lambda request, **kwargs: calls.append((request.url.path, kwargs)))
+    return calls
+
+def make_app(limiter: RateLimiter) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(ErrorHandlingMiddleware)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk {i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+def test_requests_pass_through_and_are_logged(logged):
+    limiter = FakeLimiter(allowed=True)
+    client = TestClient(make_app(limiter))
+    assert client.get("/health").json() == {"status": "healthy"}
+    assert limiter.keys == ["test:testclient"]
+    path, fields = logged[0]
+    assert path == "/health" and fields["status_code"] == 200 and fields["response_time"] > 0
+
+def test_streaming_responses_are_not_buffered(logged):
+    response = TestClient(make_app(FakeLimiter(allowed=True))).get("/stream")
+    assert response.text == "chunk 0\nchunk 1\nchunk 2\n"
+    assert logged[0][1]["status_code"] == 200
+
+def test_limited_requests_get_429(logged):
+    response = TestClient(make_app(FakeLimiter(allowed=False))).get("/health")
+    assert response.status_code == 429
+    assert response.json() == {"error": "Too many requests", "retry_after": 12}
+    assert logged[0][1]["status_code"] == 429
+
+def test_unhandled_errors_become_json_500(logged):
+    response = TestClient(make_app(FakeLimiter(allowed=True))).get("/boom")
+    assert response.status_code == 500
+    assert response.json() == {"error": "Internal server error"}
+    assert isinstance(logged[0][1]["error"], RuntimeError)
@@ -0,0 +1,20 @@
+import pytest
+from core.projection import parse_fields
+from fastapi import HTTPException
+
+ALLOWED = ("title", "company", "description", "skills")
+DEFAULT = ("title", "company")
+
+def test_default_fieldset():
+    assert parse_fields(None, ALLOWED, DEFAULT) == {"company": 1, "title": 1}
+    assert parse_fields(" , ", ALLOWED, DEFAULT) == {"company": 1, "title": 1}
+
+def test_requested_fields_are_normalized():
+    assert parse_fields("skills, title,skills,id", ALLOWED, DEFAULT) == {"skills": 1, "title": 1}
+    assert list(parse_fields("title,skills", ALLOWED, DEFAULT)) == list(parse_fields("skills,title", ALLOWED, DEFAULT))
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        parse_fields("title,hashed_password", ALLOWED, DEFAULT)
+    assert excinfo.value.status_code == 400
+    assert "hashed_password" in excinfo.value.detail
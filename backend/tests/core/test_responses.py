@@ -0,0 +1,51 @@
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+import orjson
+import pytest
+from bson import Decimal128, ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from core.responses import MongoJSONResponse, dumps
+
+def test_mongo_types_are_encoded():
+    job_id = ObjectId()
+    document = {
+        "_id": job_id,
+        "created_at": datetime(2024, 1, 1, 9, 30),
+        "salary": Decimal128("85000.50"),
+        "scores": np.array([0.5, 0.25]),
+        "applications": [{"job_id": job_id, "skills": {"python"}}],
+    }
+    assert orjson.loads(dumps(document)) == {
+        "_id": str(job_id),
+        "created_at": "2024-01-01T09:30:00",
+        "salary": "85000.50",
+        "scores": [0.5, 0.25],
+        "applications": [{"job_id": str(job_id), "skills": ["python"]}],
+    }
+    assert orjson.loads(dumps({"rate": Decimal("1.5")})) == {"rate": "1.5"}
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+def test_serialized_bytes_are_passed_through():
+    body = b'{"total":0,"jobs":[]}'
+    assert MongoJSONResponse(body).body == body
+
+def test_handlers_can_return_raw_documents():
+    app = FastAPI(default_response_class=MongoJSONResponse)
+    job_id = ObjectId()
+
+    @app.get("/direct")
+    async def direct():
+        return MongoJSONResponse([{"_id": job_id, "created_at": datetime(2024, 1, 1)}])
+
+    @app.get("/encoded")
+    async def encoded():
+        return {"_id": job_id}
+
+    client = TestClient(app)
+    assert client.get("/direct").json() == [{"_id": str(job_id), "created_at": "2024-01-01T00:00:00"}]
+    assert client.get("/encoded").json() == {"_id": str(job_id)}
@@ -0,0 +1,145 @@
+import os
+import pytest
+from core.storage import LocalStorage, ObjectNotFound, PresignedUrlCache, S3Storage, iterate_bytes
+
+MB = 1024 * 1024
+
+async def chunked(data: bytes, size: int = 64 * 1024):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+@pytest.mark.asyncio
+async def test_local_storage_round_trip(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    stored = await storage.put("resumes/1_cv.pdf", chunked(b"a" * 200000))
+    assert stored.size == 200000
+    assert await storage.exists("resumes/1_cv.pdf")
+    assert await storage.get_bytes("resumes/1_cv.pdf") == b"a" * 200000
+    assert os.listdir(tmp_path / "resumes") == ["1_cv.pdf"]
+    assert await storage.url("resumes/1_cv.pdf") is None
+
+    await storage.delete("resumes/1_cv.pdf")
+    assert not await storage.exists("resumes/1_cv.pdf")
+    with pytest.raises(ObjectNotFound):
+        await storage.get_bytes("resumes/1_cv.pdf")
+
+@pytest.mark.asyncio
+async def test_local_storage_resolves_legacy_paths_and_rejects_escapes(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    await storage.put_bytes("resumes/old.pdf", b"%PDF-")
+    assert await storage.get_bytes(f"{tmp_path}/resumes/old.pdf") == b"%PDF-"
+    with pytest.raises(ValueError):
+        storage.path("../outside.pdf")
+
+@pytest.mark.asyncio
+async def test_local_storage_discards_partial_files(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+
+    async def failing():
+        yield b"partial"
+        raise RuntimeError("client went away")
+
+    with pytest.raises(RuntimeError):
+        await storage.put("resumes/cv.pdf", failing())
+    assert os.listdir(tmp_path / "resumes") == []
+
+moto = pytest.importorskip("moto")
+
+@pytest.fixture
+def s3(monkeypatch):
+    import boto3
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    with moto.mock_s3():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="resumes")
+        yield client
+
+@pytest.mark.asyncio
+async def test_s3_small_objects_use_a_single_put(s3):
+    storage = S3Storage("resumes", client=s3, part_size=5 * MB)
+    stored = await storage.put("resumes/1_cv.pdf", iterate_bytes(b"%PDF-1.4"), "application/pdf")
+    assert stored.size == 8
+    assert s3.head_object(Bucket="resumes", Key="resumes/1_cv.pdf")["ContentType"] == "application/pdf"
+    assert await storage.get_bytes("resumes/1_cv.pdf") == b"%PDF-1.4"
+    assert s3.list_multipart_uploads(Bucket="resumes").get("Uploads", []) == []
+
+@pytest.mark.asyncio
+async def test_s3_large_objects_upload_in_concurrent_parts(s3):
+    storage = S3Storage("resumes", client=s3, part_size=5 * MB, max_concurrency=2)
+    data = os.urandom(12 * MB + 123)
+    stored = await storage.put("bulk/archive.zip", chunked(data, MB))
+    assert stored.size == len(data)
+
+    head = s3.head_object(Bucket="resumes", Key="bulk/archive.zip")
+    assert head["ContentLength"] == len(data)
+    # Multipart ETags end in the part count
+    assert head["ETag"].strip('"').endswith("-3")
+    assert await storage.get_bytes("bulk/archive.zip") == data
+
+@pytest.mark.asyncio
+async def test_s3_failed_multipart_upload_is_aborted(s3):
+    storage = S3Storage("resumes", client=s3, part_size=5 * MB)
+
+    async def failing():
+        yield os.urandom(6 * MB)
+        raise RuntimeError("client went away")
+
+    with pytest.raises(RuntimeError):
+        await storage.put("bulk/archive.zip", failing())
+    assert s3.list_multipart_uploads(Bucket="resumes").get("Uploads", []) == []
+    assert not await storage.exists("bulk/archive.zip")
+
+@pytest.mark.asyncio
+async def test_s3_missing_objects_and_presigned_urls(s3):
+    storage = S3Storage("resumes", client=s3, part_size=5 * MB)
+    with pytest.raises(ObjectNotFound):
+        await storage.get_bytes("resumes/missing.pdf")
+    assert not await storage.exists("resumes/missing.pdf")
+
+    await storage.put_bytes("resumes/1_cv.pdf", b"%PDF-1.4")
+    url = await storage.url("resumes/1_cv.pdf", expires_in=60)
+    assert "resumes/1_cv.pdf" in url and "Expires=" in url
+    await storage.delete("resumes/1_cv.pdf")
+    assert not await storage.exists("resumes/1_cv.pdf")
+
+def test_presigned_url_cache_reuses_urls_until_close_to_expiry():
+    now = [1000.0]
+    cache = PresignedUrlCache(max_entries=2, clock=lambda: now[0])
+    cache.put("a.pdf", 3600, "url-a", signed_at=now[0])
+    assert cache.get("a.pdf", 3600) == "url-a"
+    # Different lifetimes are different entries
+    assert cache.get("a.pdf", 60) is None
+
+    now[0] += 2700  # 900s left: exactly the refresh point
+    assert cache.get("a.pdf", 3600) is None
+
+    cache.put("a.pdf", 3600, "url-a", signed_at=now[0])
+    cache.put("b.pdf", 3600, "url-b", signed_at=now[0])
+    cache.put("c.pdf", 3600, "url-c", signed_at=now[0])
+    assert cache.get("a.pdf", 3600) is None
+    assert cache.get("c.pdf", 3600) == "url-c"
+
+@pytest.mark.asyncio
+async def test_s3_batch_urls_are_signed_once(s3):
+    storage = S3Storage("resumes", client=s3, part_size=5 * MB)
+    signed = []
+    sign = storage._sign
+    storage._sign = lambda keys, expires_in: signed.append(list(keys)) or sign(keys, expires_in)
+
+    keys = [f"resumes/{i}_cv.pdf" for i in range(100)]
+    first = await storage.urls(keys + keys[:10])
+    assert len(first) == 100 and all(first[key] for key in keys)
+    assert signed == [keys]
+
+    second = await storage.urls(keys[:50] + ["resumes/new.pdf"])
+    assert signed[1:] == [["resumes/new.pdf"]]
+    assert all(second[key] == first[key] for key in keys[:50])
+
+    await storage.delete(keys[0])
+    await storage.url(keys[0])
+    assert signed[2:] == [[keys[0]]]
+
+def test_s3_rejects_parts_below_the_minimum():
+    with pytest.raises(ValueError):
+        S3Storage("resumes", client=object(), part_size=MB)
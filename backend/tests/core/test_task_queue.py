@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from core.task_queue import InMemoryTaskBackend, TaskQueue, TaskWorker
+from models.task import TaskPriority, TaskStatus
+
+@pytest.fixture
+def queue():
+    return TaskQueue(InMemoryTaskBackend())
+
+@pytest.mark.asyncio
+async def test_identical_payloads_are_deduplicated(queue):
+    first = await queue.enqueue("resume_analysis", {"resume_text": "python developer"})
+    second = await queue.enqueue("resume_analysis", {"resume_text": "python developer"})
+    other = await queue.enqueue("resume_analysis", {"resume_text": "java developer"})
+    assert first["_id"] == second["_id"]
+    assert other["_id"] != first["_id"]
+
+@pytest.mark.asyncio
+async def test_worker_runs_highest_priority_first(queue):
+    order = []
+
+    async def handler(payload, db):
+        order.append(payload["name"])
+        return {"ok": True}
+
+    await queue.enqueue("job", {"name": "low"}, priority=TaskPriority.LOW)
+    high = await queue.enqueue("job", {"name": "high"}, priority=TaskPriority.HIGH)
+    worker = TaskWorker(queue.backend, db=None, handlers={"job": handler})
+    while await worker.run_once():
+        pass
+
+    assert order == ["high", "low"]
+    task = await queue.get(high["_id"])
+    assert task["status"] == TaskStatus.COMPLETED
+    assert task["result"] == {"ok": True}
+
+@pytest.mark.asyncio
+async def test_failed_task_is_retried_then_marked_failed(queue):
+    async def handler(payload, db):
+        raise RuntimeError("model unavailable")
+
+    task = await queue.enqueue("job", {}, max_attempts=2)
+    worker = TaskWorker(queue.backend, db=None, handlers={"job": handler})
+    assert await worker.run_once()
+
+    stored = await queue.get(task["_id"])
+    assert stored["status"] == TaskStatus.PENDING
+    assert stored["error"] == "model unavailable"
+
+    # Make the retry runnable immediately
+    queue.backend.tasks[task["_id"]]["run_at"] = stored["created_at"]
+    assert await worker.run_once()
+    stored = await queue.get(task["_id"])
+    assert stored["status"] == TaskStatus.FAILED
+    assert stored["attempts"] == 2
+
+def expire_lease(queue, task_id):
+    stored = queue.backend.tasks[task_id]
+    stored["lease_expires_at"] = stored["created_at"]
+
+@pytest.mark.asyncio
+async def test_tasks_that_kill_their_worker_are_not_retried_forever(queue):
+    task = await queue.enqueue("job", {}, max_attempts=2)
+    for attempt in (1, 2):
+        claimed = await queue.backend.claim(["job"], f"worker-{attempt}")
+        assert claimed["attempts"] == attempt
+        # The worker dies mid-run and its lease runs out
+        expire_lease(queue, task["_id"])
+
+    assert await queue.backend.claim(["job"], "worker-3") is None
+    stored = await queue.get(task["_id"])
+    assert stored["status"] == TaskStatus.FAILED
+    assert stored["active"] is False
+
+@pytest.mark.asyncio
+async def test_a_worker_that_lost_its_lease_cannot_overwrite_the_result(queue):
+    task = await queue.enqueue("job", {})
+    stale = await queue.backend.claim(["job"], "slow-worker")
+    expire_lease(queue, task["_id"])
+    current = await queue.backend.claim(["job"], "other-worker")
+
+    assert await queue.backend.complete(current, {"from": "other-worker"})
+    assert not await queue.backend.complete(stale, {"from": "slow-worker"})
+    assert not await queue.backend.fail(stale, "timed out")
+    assert not await queue.backend.renew(stale)
+    stored = await queue.get(task["_id"])
+    assert stored["status"] == TaskStatus.COMPLETED
+    assert stored["result"] == {"from": "other-worker"}
+
+@pytest.mark.asyncio
+async def test_long_running_handlers_keep_renewing_their_lease(queue):
+    leases = []
+
+    async def handler(payload, db):
+        for _ in range(3):
+            await asyncio.sleep(0.02)
+            leases.append(queue.backend.tasks[task["_id"]]["lease_expires_at"])
+        return {"ok": True}
+
+    task = await queue.enqueue("job", {})
+    worker = TaskWorker(queue.backend, db=None, handlers={"job": handler}, heartbeat_interval=0.01)
+    assert await worker.run_once()
+    assert leases[0] < leases[-1]
+    assert (await queue.get(task["_id"]))["status"] == TaskStatus.COMPLETED
+
+def test_importing_the_queue_opens_no_backend():
+    from core.task_queue import task_queue
+    assert task_queue._backend is None
@@ -0,0 +1,144 @@
+import hashlib
+import io
+import os
+import zipfile
+import pytest
+from typing import List
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from core import storage, uploads
+from core.config import settings
+
+PDF = b"%PDF-1.4\n" + b"x" * 200000
+DOCX = b"PK\x03\x04" + b"\x00" * 26 + b"[Content_Types].xml" + b"y" * 1000
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_storage", None)
+    return tmp_path
+
+def make_upload(content: bytes, filename: str) -> StarletteUploadFile:
+    return StarletteUploadFile(io.BytesIO(content), filename=filename)
+
+def test_sniff_document_type():
+    assert uploads.sniff_document_type(PDF[:64]) == "pdf"
+    assert uploads.sniff_document_type(DOCX[:64]) == "docx"
+    assert uploads.sniff_document_type(b"PK\x03\x04" + b"\x00" * 26 + b"xl/workbook.xml") is None
+    assert uploads.sniff_document_type(b"<html>") is None
+
+def test_safe_filename_strips_directories():
+    assert uploads.safe_filename("../../etc/passwd") == "passwd"
+    assert uploads.safe_filename("C:\\Users\\me\\My CV.pdf") == "My_CV.pdf"
+    assert uploads.safe_filename(None) == "upload"
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_hashes_and_names_by_content(upload_dir):
+    # Declared as .docx but really a PDF: stored with the sniffed extension
+    stored = await uploads.save_upload(make_upload(PDF, "../cv.docx"), "resumes", "42")
+    assert stored.kind == "pdf"
+    assert stored.key == "resumes/42_cv.pdf"
+    assert stored.size == len(PDF)
+    assert stored.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert (upload_dir / "resumes" / "42_cv.pdf").read_bytes() == PDF
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_unsupported_types(upload_dir):
+    with pytest.raises(uploads.HTTPException) as excinfo:
+        await uploads.save_upload(make_upload(b"MZ\x90\x00", "cv.pdf"), "resumes", "42")
+    assert excinfo.value.status_code == 415
+
+@pytest.mark.asyncio
+async def test_save_upload_enforces_max_size_and_cleans_up(upload_dir):
+    with pytest.raises(uploads.HTTPException) as excinfo:
+        await uploads.save_upload(make_upload(PDF, "cv.pdf"), "resumes", "42", max_bytes=100000)
+    assert excinfo.value.status_code == 413
+    assert os.listdir(upload_dir / "resumes") == []
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        stored = await uploads.save_upload(file, "resumes", "test")
+        return {"size": stored.size}
+
+    @app.post("/bulk-ingest")
+    async def bulk(files: List[UploadFile] = File(...)):
+        return {"files": len(files)}
+
+    app.add_middleware(uploads.BodySizeLimitMiddleware, max_body_size=100000, path_limits={r"/bulk-ingest$": 1000000})
+    return TestClient(app)
+
+def test_middleware_accepts_bodies_under_the_limit(client):
+    response = client.post("/upload", files={"file": ("cv.docx", DOCX)})
+    assert response.status_code == 200
+    assert response.json() == {"size": len(DOCX)}
+
+def test_middleware_rejects_declared_oversized_bodies(client):
+    response = client.post("/upload", files={"file": ("cv.pdf", PDF)})
+    assert response.status_code == 413
+
+def test_middleware_rejects_oversized_chunked_bodies(client):
+    def chunks():
+        yield b"--boundary\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.pdf\"\r\n\r\n"
+        for _ in range(20):
+            yield PDF[:10000]
+        yield b"\r\n--boundary--\r\n"
+
+    response = client.post(
+        "/upload",
+        content=chunks(),
+        headers={"content-type": "multipart/form-data; boundary=boundary"}
+    )
+    assert response.status_code == 413
+
+def test_middleware_applies_path_limits(client):
+    response = client.post("/bulk-ingest", files=[("files", ("a.pdf", PDF)), ("files", ("b.pdf", PDF))])
+    assert response.status_code == 200
+    assert response.json() == {"files": 2}
+    response = client.post("/bulk-ingest", files=[("files", (f"{i}.pdf", PDF)) for i in range(6)])
+    assert response.status_code == 413
+
+def make_zip(members, compression=zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+@pytest.mark.asyncio
+async def test_iter_documents_expands_archives():
+    docx = make_zip([("[Content_Types].xml", "<Types/>"), ("word/document.xml", "<w:document/>")])
+    archive = make_zip([
+        ("cvs/", b""),
+        ("cvs/alice.pdf", PDF),
+        ("cvs/bob.docx", docx),
+        ("cvs/notes.txt", b"hello"),
+        ("cvs/huge.pdf", b"%PDF-" + b"0" * 300000),
+        ("__MACOSX/cvs/._alice.pdf", b"junk"),
+    ], compression=zipfile.ZIP_STORED)
+    documents = [
+        document async for document in uploads.iter_documents(
+            [make_upload(archive, "batch.zip"), make_upload(docx, "carol.docx")], max_bytes=250000
+        )
+    ]
+    assert [(d.filename, d.kind, d.error is None) for d in documents] == [
+        ("batch.zip/cvs/alice.pdf", "pdf", True),
+        ("batch.zip/cvs/bob.docx", "docx", True),
+        ("batch.zip/cvs/notes.txt", None, False),
+        ("batch.zip/cvs/huge.pdf", None, False),
+        ("carol.docx", "docx", True),
+    ]
+    assert documents[0].data == PDF
+    assert documents[4].data == docx
+
+@pytest.mark.asyncio
+async def test_iter_documents_limits_file_count():
+    archive = make_zip([(f"{i}.pdf", PDF) for i in range(3)])
+    with pytest.raises(uploads.HTTPException) as excinfo:
+        async for _ in uploads.iter_documents([make_upload(archive, "batch.zip")], max_files=2):
+            pass
+    assert excinfo.value.status_code == 413
@@ -0,0 +1,84 @@
+"""
+Background worker for AI tasks (resume analysis, interview question generation).
+
+Run one or more of these next to the API server:
+    python worker.py --processes 2 --concurrency 1
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent
+sys.path.append(str(backend_dir))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.matching import ensure_matching_engine, maintain_matching_index
+from core.config import settings
+from core.logging import setup_logger
+from core.task_queue import TASK_HANDLERS, TaskWorker, create_task_backend
+
+logger = setup_logger("worker")
+
+def load_handlers() -> None:
+    # Importing the routers registers their task handlers
+    import routers.ai  # noqa: F401
+    import routers.recruiter  # noqa: F401
+
+async def run_workers(concurrency: int) -> None:
+    load_handlers()
+    from routers.ai import load_resume_text
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.MONGODB_DB_NAME]
+    # Resume scoring uses the corpus IDF weights: load the latest snapshot before
+    # taking tasks and follow the ones the API's leader process writes after that
+    index_dir = Path(settings.MATCHING_INDEX_DIR)
+    await ensure_matching_engine(db, load_resume_text, index_dir)
+    matching_index_task = asyncio.create_task(maintain_matching_index(
+        db,
+        load_resume_text,
+        index_dir,
+        settings.MATCHING_COMPACTION_INTERVAL
+    ))
+    # Built here, in the (possibly forked) worker process, on its own client
+    backend = create_task_backend(db)
+    workers = [
+        TaskWorker(backend, db, poll_interval=settings.TASK_POLL_INTERVAL)
+        for _ in range(concurrency)
+    ]
+    logger.info(f"Worker started with handlers: {', '.join(sorted(TASK_HANDLERS))}")
+    try:
+        await asyncio.gather(*(worker.run() for worker in workers))
+    finally:
+        matching_index_task.cancel()
+        client.close()
+
+def run_process(concurrency: int) -> None:
+    asyncio.run(run_workers(concurrency))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background AI task workers")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent tasks per process")
+    args = parser.parse_args()
+
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        sys.exit("The memory task queue backend is process-local; use TASK_QUEUE_BACKEND=mongo for workers")
+
+    if args.processes == 1:
+        run_process(args.concurrency)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_process, args=(args.concurrency,))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main()